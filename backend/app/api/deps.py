@@ -8,7 +8,8 @@ from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, read_session
+from app.models.athlete_coach import AthleteCoach, CoachingStatus
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
@@ -23,11 +24,8 @@ def get_db() -> Generator:
         db.close()
 
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """Get current user from JWT token."""
+def get_token_subject(token: str = Depends(oauth2_scheme)) -> str:
+    """Get the user ID from the JWT token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,21 +44,89 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    return user_id
+
+
+def _load_user(db: Session, user_id: str) -> User:
     user = db.query(User).filter(User.id == user_id).first()
 
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return user
+
 
+def _require_coach(user: User) -> User:
+    if user.role not in ["coach", "both"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is not a coach"
+        )
     return user
 
 
+async def get_current_user(
+    db: Session = Depends(get_db),
+    user_id: str = Depends(get_token_subject)
+) -> User:
+    """Get current user from JWT token."""
+    return _load_user(db, user_id)
+
+
+def get_read_db(user_id: str = Depends(get_token_subject)) -> Generator:
+    """Get a read-only session, on a replica unless the user was just pinned to the primary.
+
+    Only for endpoints that never write and whose responses are not tied
+    to collection versions (ETags, delta sync): replica lag could pair a
+    new version with old rows. Pair with ``get_current_read_user`` so the
+    request never touches the primary.
+    """
+    db = read_session(user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_current_read_user(
+    db: Session = Depends(get_read_db),
+    user_id: str = Depends(get_token_subject)
+) -> User:
+    """Get current user from JWT token, loaded through the read session."""
+    return _load_user(db, user_id)
+
+
+async def get_current_read_coach(
+    current_user: User = Depends(get_current_read_user)
+) -> User:
+    """Verify that current user is a coach, loaded through the read session."""
+    return _require_coach(current_user)
+
+
 async def get_current_coach(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """Verify that current user is a coach."""
-    if current_user.role not in ["coach", "both"]:
+    return _require_coach(current_user)
+
+
+def ensure_athlete_access(db: Session, current_user: User, athlete_id: str) -> None:
+    """Allow the athlete themself or one of their active coaches."""
+    if athlete_id == current_user.id:
+        return
+
+    is_coach = db.query(AthleteCoach.id).filter(
+        AthleteCoach.athlete_id == athlete_id,
+        AthleteCoach.coach_id == current_user.id,
+        AthleteCoach.status == CoachingStatus.ACTIVE
+    ).first()
+
+    if not is_coach:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is not a coach"
+            detail="Not authorized to view this athlete"
         )
-    return current_user
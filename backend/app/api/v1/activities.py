@@ -1,34 +1,55 @@
 """Activity endpoints."""
 
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user, get_current_read_user, ensure_athlete_access
+from app.core.etag import if_none_match, make_etag, not_modified, set_etag
+from app.core.storage import storage_url
 from app.models.user import User
 from app.models.activity import Activity, ActivityType
+from app.models.activity_curve import ActivityCurve, AthleteCurve
+from app.models.activity_route import ActivityRoute
+from app.models.activity_zones import ActivityZones
+from app.models.best_effort import BestEffort
+from app.services.analytics.best_efforts import STANDARD_EFFORTS
+from app.services.analytics.curves import KIND_POWER, KIND_SPEED, PERIOD_ALL, curve_points, decode
+from app.services.analytics import zones as zone_analytics
+from app.services.analytics.stream_codec import MEDIA_TYPE as STREAMS_MEDIA_TYPE, encode_stream_parts
+from app.services.analytics.streams import CHANNEL_DTYPES, get_chart_streams
+from app.services import collection_versions
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_activities(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
-    activity_type: Optional[ActivityType] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Get user's activities."""
-    query = db.query(Activity).filter(Activity.user_id == current_user.id)
+def build_activities_query(db: Session, user_id: str, activity_type: Optional[ActivityType] = None):
+    """Build the activity list query.
+
+    Served by idx_activities_user_start_date, or idx_activities_user_type_start_date
+    when filtering by type, so no sort step is needed. Both are partial indexes
+    over canonical activities, so cross-provider duplicates are never read.
+    """
+    query = db.query(Activity).filter(Activity.user_id == user_id, Activity.duplicate_of_id.is_(None))
 
     if activity_type:
         query = query.filter(Activity.activity_type == activity_type)
 
-    query = query.order_by(Activity.start_date.desc())
-    activities = query.offset(skip).limit(limit).all()
+    return query.order_by(Activity.start_date.desc())
+
+
+def activity_summaries(db: Session, activities: List[Activity]) -> List[dict]:
+    """List items for activities, with their route thumbnails."""
+    # Only the summary polyline and thumbnail key: a few hundred bytes per map
+    routes = {
+        r.activity_id: r
+        for r in db.query(
+            ActivityRoute.activity_id, ActivityRoute.summary_polyline, ActivityRoute.thumbnail_key
+        ).filter(ActivityRoute.activity_id.in_([a.id for a in activities]))
+    } if activities else {}
 
     return [
         {
@@ -39,33 +60,262 @@ async def get_activities(
             "duration_seconds": a.duration_seconds,
             "distance_meters": a.distance_meters,
             "provider": a.provider,
+            "summary_polyline": routes[a.id].summary_polyline if a.id in routes else None,
+            "thumbnail_url": storage_url(routes[a.id].thumbnail_key) if a.id in routes else None,
         }
         for a in activities
     ]
 
 
+@router.get("/")
+async def get_activities(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    activity_type: Optional[ActivityType] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get user's activities.
+
+    The ETag comes from the user's activities collection version. It is
+    read before the query, so a write landing in between can only make
+    the ETag older than the body, never newer.
+    """
+    version = collection_versions.validator(db, collection_versions.ACTIVITIES, current_user.id)
+    etag = make_etag("activities", current_user.id, version, skip, limit, activity_type)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    query = build_activities_query(db, current_user.id, activity_type)
+    activities = query.offset(skip).limit(limit).all()
+    return activity_summaries(db, activities)
+
+
+@router.get("/curves")
+async def get_athlete_curve(
+    sport: ActivityType,
+    kind: str = Query(KIND_POWER, pattern=f"^({KIND_POWER}|{KIND_SPEED})$"),
+    period: str = PERIOD_ALL,
+    athlete_id: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get an athlete's mean-maximal curve for a sport and period ("all" or a year)."""
+    athlete_id = athlete_id or current_user.id
+    ensure_athlete_access(db, current_user, athlete_id)
+
+    curve = db.query(AthleteCurve).filter(
+        AthleteCurve.user_id == athlete_id,
+        AthleteCurve.sport == sport.value,
+        AthleteCurve.kind == kind,
+        AthleteCurve.period == period
+    ).first()
+
+    return {
+        "athlete_id": athlete_id,
+        "sport": sport,
+        "kind": kind,
+        "period": period,
+        "activity_count": curve.activity_count if curve else 0,
+        "points": curve_points(decode(curve.data)) if curve else [],
+    }
+
+
+@router.get("/records")
+async def get_best_efforts(
+    athlete_id: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get an athlete's fastest efforts over standard distances."""
+    athlete_id = athlete_id or current_user.id
+    ensure_athlete_access(db, current_user, athlete_id)
+
+    records = db.query(BestEffort).filter(BestEffort.user_id == athlete_id)
+    order = list(STANDARD_EFFORTS)
+
+    return [
+        {
+            "effort": r.effort,
+            "distance_meters": r.distance_meters,
+            "elapsed_seconds": r.elapsed_seconds,
+            "activity_id": r.activity_id,
+            "start_offset_seconds": r.start_offset_seconds,
+            "achieved_at": r.achieved_at,
+        }
+        for r in sorted(records, key=lambda r: order.index(r.effort) if r.effort in order else len(order))
+    ]
+
+
+@router.get("/zones/weekly")
+async def get_weekly_zones(
+    kind: str = Query("heartrate", pattern="^(power|heartrate|pace)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    athlete_id: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get weekly time-in-zone totals (defaults to the last 12 weeks)."""
+    athlete_id = athlete_id or current_user.id
+    ensure_athlete_access(db, current_user, athlete_id)
+
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or zone_analytics.week_start(end_date - timedelta(weeks=11))
+
+    return {
+        "athlete_id": athlete_id,
+        "kind": kind,
+        "weeks": zone_analytics.weekly_distribution(db, athlete_id, kind, start_date, end_date),
+    }
+
+
+@router.get("/{activity_id}/zones")
+async def get_activity_zones(
+    activity_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get an activity's time in zones."""
+    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+
+    if not activity:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    ensure_athlete_access(db, current_user, activity.user_id)
+
+    zones = db.query(ActivityZones).filter(ActivityZones.activity_id == activity_id)
+    return {
+        z.kind: {
+            "threshold": z.threshold,
+            "edges": zone_analytics.zone_edges(z.kind, z.threshold).round(2).tolist(),
+            "seconds": zone_analytics.decode(z.seconds).tolist(),
+        }
+        for z in zones
+    }
+
+
+@router.get("/{activity_id}/streams")
+async def get_activity_streams(
+    activity_id: str,
+    request: Request,
+    response: Response,
+    points: int = Query(500, ge=10, le=20000),
+    channels: Optional[str] = Query(None, description="Comma-separated channel names"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get activity streams downsampled for charts.
+
+    Send ``Accept: application/vnd.trainlytics.streams`` for typed arrays
+    (see app.services.analytics.stream_codec) instead of JSON.
+    """
+    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+
+    if not activity:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    ensure_athlete_access(db, current_user, activity.user_id)
+
+    requested = [c.strip() for c in channels.split(",") if c.strip()] if channels else None
+    if requested:
+        unknown = [c for c in requested if c not in CHANNEL_DTYPES]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown channels: {', '.join(unknown)}"
+            )
+
+    streams = await get_chart_streams(db, activity_id, points, requested)
+    if not streams:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity has no streams"
+        )
+
+    if STREAMS_MEDIA_TYPE in request.headers.get("accept", ""):
+        # Sent buffer by buffer so the channel arrays are never copied into one body
+        parts = encode_stream_parts(streams)
+        return StreamingResponse(
+            iter(parts),
+            media_type=STREAMS_MEDIA_TYPE,
+            headers={"Vary": "Accept", "Content-Length": str(sum(len(part) for part in parts))}
+        )
+
+    response.headers["Vary"] = "Accept"
+    return {
+        "activity_id": activity_id,
+        "points": len(streams["time"]),
+        "channels": {channel: array.tolist() for channel, array in streams.items()},
+    }
+
+
+@router.get("/{activity_id}/curves")
+async def get_activity_curves(
+    activity_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get an activity's mean-maximal curves."""
+    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+
+    if not activity:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity not found"
+        )
+
+    ensure_athlete_access(db, current_user, activity.user_id)
+
+    curves = db.query(ActivityCurve).filter(ActivityCurve.activity_id == activity_id)
+    return {c.kind: curve_points(decode(c.data)) for c in curves}
+
+
 @router.get("/{activity_id}")
 async def get_activity(
     activity_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get activity details."""
-    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+    # Validator by primary key; the full row is loaded only on a miss
+    stamp = db.query(
+        Activity.user_id, Activity.updated_at, ActivityRoute.updated_at.label("route_updated_at")
+    ).outerjoin(
+        ActivityRoute, ActivityRoute.activity_id == Activity.id
+    ).filter(Activity.id == activity_id).first()
 
-    if not activity:
+    if not stamp:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Activity not found"
         )
 
     # Check permissions
-    if activity.user_id != current_user.id:
+    if stamp.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this activity"
         )
 
+    etag = make_etag("activity", activity_id, stamp.updated_at, stamp.route_updated_at)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    activity = db.query(Activity).filter(Activity.id == activity_id).first()
+
     return {
         "id": activity.id,
         "name": activity.name,
@@ -81,5 +331,10 @@ async def get_activity(
         "avg_speed_mps": activity.avg_speed_mps,
         "calories": activity.calories,
         "provider": activity.provider,
+        "best_efforts": (activity.processed_data or {}).get("best_efforts"),
+        "route": {
+            "polyline": activity.route.detail_polyline,
+            "bounds": activity.route.bounds,
+        } if activity.route else None,
         "created_at": activity.created_at
     }
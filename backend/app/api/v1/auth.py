@@ -8,6 +8,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.db.session import pin_primary
 from app.core.security import verify_password, create_access_token, create_refresh_token, get_password_hash
 from app.models.user import User
 
@@ -37,6 +38,7 @@ async def login(
     # Update last login
     user.last_login_at = datetime.utcnow()
     db.commit()
+    pin_primary(user.id)
 
     return {
         "access_token": access_token,
@@ -0,0 +1,67 @@
+"""Delta sync endpoint."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user
+from app.api.v1.activities import activity_summaries
+from app.api.v1.notifications import notification_item
+from app.api.v1.workouts import workout_summary
+from app.models.comment import Comment
+from app.models.user import User
+from app.services import delta_sync
+
+router = APIRouter()
+
+
+def comment_item(c: Comment) -> dict:
+    """Feed item for a comment."""
+    return {
+        "id": c.id,
+        "author_id": c.author_id,
+        "activity_id": c.activity_id,
+        "workout_id": c.workout_id,
+        "content": c.content,
+        "created_at": c.created_at,
+    }
+
+
+@router.get("/")
+async def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get changes to the user's activities, workouts, comments and notifications.
+
+    Without ``since`` everything is returned (bootstrap). Pass the returned
+    ``token`` as ``since`` on the next call, immediately again while
+    ``has_more`` is true. Clients upsert ``updated`` items and drop
+    ``deleted`` ids by id; on ``reset`` they discard their copy first.
+    """
+    try:
+        changes = delta_sync.changes_since(db, current_user.id, since, limit)
+    except delta_sync.InvalidToken:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+    serializers = {
+        delta_sync.ACTIVITIES: lambda rows: activity_summaries(db, rows),
+        delta_sync.WORKOUTS: lambda rows: [workout_summary(w) for w in rows],
+        delta_sync.COMMENTS: lambda rows: [comment_item(c) for c in rows],
+        delta_sync.NOTIFICATIONS: lambda rows: [notification_item(n) for n in rows],
+    }
+
+    body = {"token": changes["token"], "has_more": changes["has_more"], "reset": changes["reset"]}
+    for name, serialize in serializers.items():
+        rows = changes[name]["updated"]
+        items = serialize(rows)
+        for item, row in zip(items, rows):
+            item["updated_at"] = row.updated_at
+        body[name] = {"updated": items, "deleted": changes[name]["deleted"]}
+    return body
@@ -0,0 +1,78 @@
+"""Server-Sent Events endpoint.
+
+``EventSource`` cannot send an Authorization header, and an access token
+in the URL ends up in access and proxy logs. Clients instead POST to
+``/ticket`` with their bearer token and open the stream with the returned
+ticket, which is valid for SSE_TICKET_TTL_SECONDS and for one connection.
+"""
+
+import asyncio
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_user
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.user import User
+from app.services.events import broker, format_sse
+
+router = APIRouter()
+
+# Comment frames keep proxies from closing idle connections
+HEARTBEAT_SECONDS = 15
+
+# Client reconnect delay sent in the stream preamble
+RETRY_MILLISECONDS = 5000
+
+
+def _ticket_key(ticket: str) -> str:
+    return f"sse_ticket:{ticket}"
+
+
+@router.post("/ticket")
+async def create_stream_ticket(current_user: User = Depends(get_current_user)):
+    """Issue a short-lived, single-use ticket for opening the event stream."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), current_user.id, ttl=settings.SSE_TICKET_TTL_SECONDS)
+    return {"ticket": ticket, "expires_in": settings.SSE_TICKET_TTL_SECONDS}
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    ticket: str = Query(..., description="Ticket from POST /events/ticket")
+):
+    """Stream sync progress and new notifications to the ticket's user."""
+    # Redeeming deletes the ticket, so a logged URL cannot be replayed
+    user_id = cache.pop(_ticket_key(ticket))
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream ticket"
+        )
+
+    async def event_stream():
+        async with broker.subscribe(user_id) as queue:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield format_sse(message)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
@@ -0,0 +1,121 @@
+"""Notification endpoints."""
+
+from typing import Optional
+from datetime import datetime
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, get_current_user, get_current_coach
+from app.models.user import User
+from app.models.notification import Notification, NotificationType
+from app.services import notification_service
+
+router = APIRouter()
+
+
+def notification_item(n: Notification) -> dict:
+    """Feed item for a notification."""
+    return {
+        "id": n.id,
+        "type": n.type,
+        "title": n.title,
+        "message": n.message,
+        "action_url": n.action_url,
+        "is_read": n.is_read,
+        "created_at": n.created_at,
+    }
+
+
+@router.get("/")
+async def get_notifications(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    unread_only: bool = False,
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get user's notifications, newest first.
+
+    Pass the last item's ``created_at`` and ``id`` as ``before`` and
+    ``before_id`` to page without OFFSET.
+    """
+    query = notification_service.build_notifications_query(
+        db, current_user.id, unread_only, before=before, before_id=before_id
+    )
+
+    notifications = query.offset(skip).limit(limit).all()
+
+    return {
+        "items": [notification_item(n) for n in notifications],
+        "unread_count": notification_service.get_unread_count(db, current_user.id),
+    }
+
+
+@router.get("/unread-count")
+async def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the unread badge count."""
+    return {"unread_count": notification_service.get_unread_count(db, current_user.id)}
+
+
+@router.post("/{notification_id}/read")
+async def mark_notification_read(
+    notification_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark a notification as read."""
+    exists = db.query(Notification.id).filter(
+        Notification.id == notification_id,
+        Notification.user_id == current_user.id
+    ).first()
+
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+
+    notification_service.mark_read(db, current_user.id, [notification_id])
+    return {"unread_count": notification_service.get_unread_count(db, current_user.id)}
+
+
+@router.post("/read-all")
+async def mark_all_notifications_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark all notifications as read."""
+    updated = notification_service.mark_all_read(db, current_user.id)
+    return {"updated": updated, "unread_count": 0}
+
+
+@router.post("/broadcast")
+async def broadcast_notification(
+    title: str = Body(...),
+    message: str = Body(...),
+    action_url: Optional[str] = Body(None),
+    db: Session = Depends(get_db),
+    current_coach: User = Depends(get_current_coach)
+):
+    """Send a notification to all of the coach's active athletes."""
+    if not title or not message:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Title and message are required"
+        )
+
+    created = notification_service.broadcast_to_athletes(
+        db,
+        current_coach.id,
+        NotificationType.COACH_MESSAGE,
+        title,
+        message,
+        action_url
+    )
+    return {"recipients": len(created)}
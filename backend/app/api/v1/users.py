@@ -1,10 +1,14 @@
 """User endpoints."""
 
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
+from app.models.athlete_threshold import AthleteThreshold, ThresholdMetric
 from app.models.user import User
+from app.services.threshold_service import delete_threshold, pending_count, set_threshold, submit_recompute
 
 router = APIRouter()
 
@@ -24,3 +28,64 @@ async def get_current_user_info(
         "created_at": current_user.created_at,
         "last_login_at": current_user.last_login_at
     }
+
+
+def _threshold_dict(threshold: AthleteThreshold) -> dict:
+    return {
+        "id": threshold.id,
+        "metric": threshold.metric,
+        "value": threshold.value,
+        "effective_from": threshold.effective_from,
+    }
+
+
+@router.get("/me/thresholds")
+async def get_thresholds(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's threshold history."""
+    thresholds = db.query(AthleteThreshold).filter(
+        AthleteThreshold.user_id == current_user.id
+    ).order_by(AthleteThreshold.metric, AthleteThreshold.effective_from.desc())
+
+    return [_threshold_dict(t) for t in thresholds]
+
+
+@router.post("/me/thresholds", status_code=status.HTTP_201_CREATED)
+async def create_threshold(
+    metric: ThresholdMetric,
+    value: float = Query(..., gt=0),
+    effective_from: datetime = Query(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Record a threshold (W, bpm or s/km); affected zones are recomputed in the background."""
+    threshold, job = set_threshold(db, current_user.id, metric, value, effective_from)
+    pending = pending_count(db, job)
+    submit_recompute(job)
+    return {**_threshold_dict(threshold), "pending_activities": pending}
+
+
+@router.delete("/me/thresholds/{threshold_id}")
+async def remove_threshold(
+    threshold_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a threshold; affected zones are recomputed in the background."""
+    threshold = db.query(AthleteThreshold).filter(
+        AthleteThreshold.id == threshold_id,
+        AthleteThreshold.user_id == current_user.id
+    ).first()
+
+    if not threshold:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Threshold not found"
+        )
+
+    job = delete_threshold(db, threshold)
+    pending = pending_count(db, job)
+    submit_recompute(job)
+    return {"pending_activities": pending}
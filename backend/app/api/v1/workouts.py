@@ -3,18 +3,51 @@
 from typing import List, Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_read_db, get_current_user, get_current_read_user, get_current_read_coach
+from app.core.etag import if_none_match, make_etag, not_modified, set_etag
 from app.models.user import User
 from app.models.workout import Workout, WorkoutStatus
+from app.services import collection_versions
+from app.services.analytics.compliance import completed_workouts_query, score_workouts
+from app.services.analytics.workout_compiler import compile_workout
 
 router = APIRouter()
 
 
+def build_workouts_query(db: Session, athlete_id: str, status_filter: Optional[WorkoutStatus] = None):
+    """Build the workout list query.
+
+    Served by idx_workouts_athlete_scheduled_date, or
+    idx_workouts_athlete_status_scheduled_date when filtering by status.
+    """
+    query = db.query(Workout).filter(Workout.athlete_id == athlete_id)
+
+    if status_filter:
+        query = query.filter(Workout.status == status_filter)
+
+    return query.order_by(Workout.scheduled_date.desc())
+
+
+def workout_summary(w: Workout) -> dict:
+    """List item for a workout."""
+    return {
+        "id": w.id,
+        "title": w.title,
+        "workout_type": w.workout_type,
+        "scheduled_date": w.scheduled_date,
+        "status": w.status,
+        "target_duration": w.target_duration,
+        "target_distance": w.target_distance,
+    }
+
+
 @router.get("/")
 async def get_workouts(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     status_filter: Optional[WorkoutStatus] = None,
@@ -22,50 +55,124 @@ async def get_workouts(
     current_user: User = Depends(get_current_user)
 ):
     """Get user's workouts."""
-    query = db.query(Workout).filter(Workout.athlete_id == current_user.id)
+    version = collection_versions.validator(db, collection_versions.WORKOUTS, current_user.id)
+    etag = make_etag("workouts", current_user.id, version, skip, limit, status_filter)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
-    if status_filter:
-        query = query.filter(Workout.status == status_filter)
-
-    query = query.order_by(Workout.scheduled_date.desc())
+    query = build_workouts_query(db, current_user.id, status_filter)
     workouts = query.offset(skip).limit(limit).all()
+    return [workout_summary(w) for w in workouts]
+
+
+@router.get("/compliance")
+async def get_roster_compliance(
+    athlete_id: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_coach: User = Depends(get_current_read_coach)
+):
+    """Get compliance for completed workouts the coach prescribed."""
+    query = completed_workouts_query(db).filter(Workout.created_by == current_coach.id)
+
+    if athlete_id:
+        query = query.filter(Workout.athlete_id == athlete_id)
+    if start_date:
+        query = query.filter(Workout.scheduled_date >= start_date)
+    if end_date:
+        query = query.filter(Workout.scheduled_date < end_date)
+
+    workouts = query.order_by(Workout.scheduled_date.desc()).limit(limit).all()
+    scores = await score_workouts(db, workouts)
 
     return [
         {
-            "id": w.id,
+            "workout_id": w.id,
+            "athlete_id": w.athlete_id,
             "title": w.title,
-            "workout_type": w.workout_type,
             "scheduled_date": w.scheduled_date,
-            "status": w.status,
-            "target_duration": w.target_duration,
-            "target_distance": w.target_distance,
+            "overall": scores[w.id]["overall"],
+            "duration_ratio": scores[w.id]["duration_ratio"],
         }
         for w in workouts
+        if w.id in scores
     ]
 
 
+@router.get("/{workout_id}/compliance")
+async def get_workout_compliance(
+    workout_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user)
+):
+    """Get per-step compliance of a completed workout."""
+    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+
+    if not workout:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workout not found"
+        )
+
+    if workout.athlete_id != current_user.id and workout.created_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this workout"
+        )
+
+    if not workout.activity_id or not workout.structure:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Workout has no structure or linked activity"
+        )
+
+    try:
+        compile_workout(workout)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc)
+        )
+
+    return {"workout_id": workout.id, **(await score_workouts(db, [workout]))[workout.id]}
+
+
 @router.get("/{workout_id}")
 async def get_workout(
     workout_id: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get workout details."""
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    stamp = db.query(Workout.athlete_id, Workout.created_by, Workout.updated_at).filter(
+        Workout.id == workout_id
+    ).first()
 
-    if not workout:
+    if not stamp:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workout not found"
         )
 
     # Check permissions (athlete or coach)
-    if workout.athlete_id != current_user.id and workout.created_by != current_user.id:
+    if current_user.id not in (stamp.athlete_id, stamp.created_by):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this workout"
         )
 
+    etag = make_etag("workout", workout_id, stamp.updated_at)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+
     return {
         "id": workout.id,
         "title": workout.title,
@@ -0,0 +1,216 @@
+"""Key-value cache backed by Redis, with an in-process fallback."""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Increment only when the key is present, so an evicted counter is rebuilt
+# from the database instead of restarting from zero.
+_INCR_IF_EXISTS = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+class _LocalBackend:
+    """Thread-safe in-process store used when Redis is not configured or reachable."""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (str(value), expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._get(key)
+            self._data.pop(key, None)
+            return value
+
+    def incr(self, key: str, amount: int = 1, only_if_exists: bool = False) -> Optional[int]:
+        with self._lock:
+            current = self._get(key)
+            if current is None and only_if_exists:
+                return None
+            value = int(current or 0) + amount
+            expires_at = self._data[key][1] if current is not None else None
+            self._data[key] = (str(value), expires_at)
+            return value
+
+    def incr_many(self, amounts: Dict[str, int], only_if_exists: bool = False) -> None:
+        for key, amount in amounts.items():
+            self.incr(key, amount, only_if_exists=only_if_exists)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _RedisBackend:
+    """Redis store. Errors are logged and treated as cache misses."""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._incr_if_exists = client.register_script(_INCR_IF_EXISTS)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning("cache_get_failed", key=key, error=str(e))
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        try:
+            self.client.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning("cache_set_failed", key=key, error=str(e))
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.delete(key)
+        except redis.RedisError as e:
+            logger.warning("cache_delete_failed", key=key, error=str(e))
+
+    def pop(self, key: str) -> Optional[str]:
+        try:
+            return self.client.getdel(key)
+        except redis.RedisError as e:
+            logger.warning("cache_pop_failed", key=key, error=str(e))
+            return None
+
+    def incr(self, key: str, amount: int = 1, only_if_exists: bool = False) -> Optional[int]:
+        try:
+            if only_if_exists:
+                value = self._incr_if_exists(keys=[key], args=[amount])
+                return int(value) if value is not None else None
+            return self.client.incrby(key, amount)
+        except redis.RedisError as e:
+            logger.warning("cache_incr_failed", key=key, error=str(e))
+            # The counter may now be wrong; drop it so the next read rebuilds it.
+            self.delete(key)
+            return None
+
+    def incr_many(self, amounts: Dict[str, int], only_if_exists: bool = False) -> None:
+        if not amounts:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, amount in amounts.items():
+                if only_if_exists:
+                    self._incr_if_exists(keys=[key], args=[amount], client=pipe)
+                else:
+                    pipe.incrby(key, amount)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("cache_incr_many_failed", keys=len(amounts), error=str(e))
+            for key in amounts:
+                self.delete(key)
+
+    def clear(self) -> None:
+        """No-op: a shared Redis database is never flushed from here."""
+        logger.warning("cache_clear_skipped", reason="shared_backend")
+
+
+class Cache:
+    """Cache facade.
+
+    Uses Redis when ``REDIS_URL`` is set and reachable at first use, otherwise
+    an in-process store (development, tests, single-process deployments).
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = settings.REDIS_URL if url is None else url
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = self._connect()
+        return self._backend
+
+    @property
+    def is_shared(self) -> bool:
+        """Whether the cache is shared across processes (Redis)."""
+        return isinstance(self.backend, _RedisBackend)
+
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Underlying Redis client, or None when running in-process."""
+        return self.backend.client if self.is_shared else None
+
+    def _connect(self):
+        if not self.url:
+            return _LocalBackend()
+        try:
+            client = redis.Redis.from_url(
+                self.url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+            client.ping()
+            logger.info("cache_backend_redis")
+            return _RedisBackend(client)
+        except redis.RedisError as e:
+            logger.warning("cache_backend_local", reason=str(e))
+            return _LocalBackend()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value, ttl: Optional[int] = None) -> None:
+        self.backend.set(key, str(value), ttl)
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def pop(self, key: str) -> Optional[str]:
+        """Get and delete a key atomically."""
+        return self.backend.pop(key)
+
+    def incr(self, key: str, amount: int = 1, only_if_exists: bool = False) -> Optional[int]:
+        return self.backend.incr(key, amount, only_if_exists=only_if_exists)
+
+    def incr_many(self, amounts: Dict[str, int], only_if_exists: bool = False) -> None:
+        self.backend.incr_many(amounts, only_if_exists=only_if_exists)
+
+    def clear(self) -> None:
+        """Drop every key of the in-process store; does nothing on Redis."""
+        self.backend.clear()
+
+
+cache = Cache()
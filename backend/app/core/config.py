@@ -23,6 +23,16 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     DATABASE_ECHO: bool = False
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+
+    # Read replicas (empty: all reads on the primary)
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_POOL_SIZE: int = 10
+    DATABASE_REPLICA_MAX_OVERFLOW: int = 20
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: float = 10.0
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 60  # primary-only reads after login/sync
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -64,6 +74,38 @@ class Settings(BaseSettings):
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
     S3_BUCKET: str = "trainlytics"
+    S3_PUBLIC_URL: str = ""
+    MEDIA_ROOT: str = "media"  # local storage when S3_ENDPOINT is not set
+    MEDIA_URL: str = "/media"
+
+    # Provider API resilience
+    CONNECTOR_TIMEOUT_SECONDS: float = 30.0
+    CONNECTOR_MAX_ATTEMPTS: int = 4
+    CONNECTOR_RETRY_BASE_SECONDS: float = 0.5
+    CONNECTOR_RETRY_MAX_SECONDS: float = 20.0
+    CONNECTOR_BREAKER_FAILURE_THRESHOLD: int = 5
+    CONNECTOR_BREAKER_RECOVERY_SECONDS: float = 30.0
+
+    # Provider OAuth token refresh
+    TOKEN_REFRESH_MARGIN_SECONDS: int = 600
+    TOKEN_REFRESH_BATCH_SIZE: int = 20
+    TOKEN_REFRESH_INTERVAL_SECONDS: int = 60
+    TOKEN_REFRESH_ENABLED: bool = True  # run the refresh loop in the API process
+
+    # Route thumbnails
+    ROUTE_THUMBNAIL_WORKERS: int = 4
+
+    # Process pool for CPU-bound stream analytics (0: run in a thread instead)
+    COMPUTE_WORKERS: int = 2
+    COMPUTE_START_METHOD: str = "forkserver"
+    COMPUTE_SHARED_MEMORY_MIN_BYTES: int = 64 * 1024  # smaller arrays are pickled
+
+    # Server-Sent Events: single-use tickets stand in for the access token in the URL
+    SSE_TICKET_TTL_SECONDS: int = 30
+
+    # Delta sync
+    DELTA_SYNC_OVERLAP_SECONDS: int = 30  # re-read window for late-committing writes
+    TOMBSTONE_RETENTION_DAYS: int = 30
 
     # Monitoring
     SENTRY_DSN: str = ""
@@ -0,0 +1,46 @@
+"""HTTP conditional GET helpers (ETag / If-None-Match)."""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Clients may store responses but must revalidate before reuse
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak validator from the parts that determine a response body.
+
+    Weak, because responses may be re-encoded (gzip) on the way out.
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches ``etag`` (weak comparison)."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(tag) == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,95 @@
+"""Object storage: S3-compatible when configured, local files otherwise."""
+
+import os
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LocalStorage:
+    """Files under MEDIA_ROOT, served at MEDIA_URL."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage:
+    """S3-compatible bucket. boto3 is only needed when S3 is configured."""
+
+    def __init__(self, endpoint: str, access_key: str, secret_key: str, bucket: str, public_url: str = ""):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("S3_ENDPOINT is set but boto3 is not installed") from e
+
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
+        self.bucket = bucket
+        self.base_url = (public_url or f"{endpoint.rstrip('/')}/{bucket}").rstrip("/")
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+_storage = None
+_lock = threading.Lock()
+
+
+def get_storage():
+    """Shared storage backend, created on first use."""
+    global _storage
+    if _storage is None:
+        with _lock:
+            if _storage is None:
+                if settings.S3_ENDPOINT:
+                    _storage = S3Storage(
+                        settings.S3_ENDPOINT,
+                        settings.S3_ACCESS_KEY,
+                        settings.S3_SECRET_KEY,
+                        settings.S3_BUCKET,
+                        settings.S3_PUBLIC_URL,
+                    )
+                else:
+                    _storage = LocalStorage(settings.MEDIA_ROOT, settings.MEDIA_URL)
+                logger.info("storage_backend", backend=type(_storage).__name__)
+    return _storage
+
+
+def storage_url(key: Optional[str]) -> Optional[str]:
+    """Public URL for a stored object; None if there is none or storage is unavailable."""
+    if not key:
+        return None
+    try:
+        return get_storage().url(key)
+    except RuntimeError as e:
+        logger.warning("storage_unavailable", key=key, error=str(e))
+        return None
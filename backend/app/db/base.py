@@ -10,7 +10,15 @@ from app.models.coach_profile import CoachProfile  # noqa
 from app.models.athlete_coach import AthleteCoach  # noqa
 from app.models.connected_account import ConnectedAccount  # noqa
 from app.models.activity import Activity  # noqa
+from app.models.activity_stream import ActivityStream  # noqa
+from app.models.activity_payload import ActivityPayload  # noqa
+from app.models.activity_curve import ActivityCurve, AthleteCurve  # noqa
+from app.models.activity_route import ActivityRoute  # noqa
+from app.models.best_effort import BestEffort  # noqa
+from app.models.athlete_threshold import AthleteThreshold  # noqa
+from app.models.activity_zones import ActivityZones  # noqa
 from app.models.workout import Workout  # noqa
 from app.models.training_plan import TrainingPlan  # noqa
 from app.models.comment import Comment  # noqa
 from app.models.notification import Notification  # noqa
+from app.models.tombstone import Tombstone  # noqa
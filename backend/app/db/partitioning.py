@@ -0,0 +1,335 @@
+"""Yearly range partitioning of ``activities`` by ``start_date`` (PostgreSQL).
+
+Every activity query is scoped by user and date, so partitioning by
+``start_date`` keeps each partition's indexes bounded and lets the
+planner skip years a query cannot touch. Old years can be detached and
+archived without a bulk DELETE.
+
+Prisma cannot express partitioned tables, so this runs after migrations:
+
+    python -m app.db.partitioning convert        # once, in a maintenance window
+    python -m app.db.partitioning ensure         # on deploy: next year's partition, dependents trigger
+    python -m app.db.partitioning detach --before 2018
+
+PostgreSQL requires unique indexes of a partitioned table to include the
+partition key, which has two consequences:
+
+* The primary key becomes ``(id, start_date)`` and the provider-ID
+  unique index becomes ``(user_id, provider_activity_id, start_date)``.
+  Lookups should carry ``start_date`` bounds (see ``upsert_activities``)
+  so they are pruned to the relevant partitions.
+* Foreign keys can no longer reference ``activities.id``. ``convert``
+  drops them and installs a row trigger that applies their ON DELETE
+  actions (CASCADE / SET NULL / RESTRICT) instead. The trigger is built
+  from every ORM ``ForeignKey('activities.id')`` and rebuilt by each
+  ``ensure``. A table added later that references activities must be
+  created without the database constraint, which PostgreSQL rejects
+  (drop the FOREIGN KEY from its migration; ``create_all`` cannot create
+  it either), and keep the ORM ``ForeignKey``: the next ``ensure`` adds
+  it to the trigger.
+
+Rows whose ``start_date`` has no yearly partition land in
+``activities_default``; ``ensure`` keeps partitions a year ahead so only
+implausible dates end up there. On other databases (SQLite in tests) the
+commands are no-ops and the table stays a plain table.
+"""
+
+import argparse
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.core.logging import get_logger
+from app.db.base import Base
+from app.models.activity import Activity
+
+logger = get_logger(__name__)
+
+TABLE = Activity.__tablename__
+KEY = "start_date"
+DEFAULT_PARTITION = f"{TABLE}_default"
+DEPENDENTS_TRIGGER = f"{TABLE}_delete_dependents"
+
+# Unique indexes that must be widened with the partition key
+UNIQUE_INDEXES = {'idx_user_provider_activity'}
+
+# Dependent (table, column, action) for each foreign key to activities.id
+Dependent = Tuple[str, str, str]
+
+# ON DELETE clause -> pg_constraint.confdeltype
+_DELETE_ACTIONS = {'CASCADE': 'c', 'SET NULL': 'n'}
+
+
+def partition_name(year: int) -> str:
+    return f"{TABLE}_y{year}"
+
+
+def year_bounds(year: int) -> Tuple[date, date]:
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def create_partition_sql(year: int) -> str:
+    start, end = year_bounds(year)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def index_sql() -> List[str]:
+    """CREATE INDEX statements for the partitioned parent, from the ORM indexes."""
+    dialect = postgresql.dialect()
+    statements = []
+    for index in sorted(Activity.__table__.indexes, key=lambda i: i.name):
+        if index.name in UNIQUE_INDEXES:
+            columns = ", ".join([c.name for c in index.columns] + [KEY])
+            statements.append(f"CREATE UNIQUE INDEX {index.name} ON {TABLE} ({columns})")
+        else:
+            statements.append(str(CreateIndex(index).compile(dialect=dialect)))
+    return statements
+
+
+def dependents_trigger_sql(dependents: Iterable[Dependent]) -> List[str]:
+    """Trigger applying the ON DELETE actions of foreign keys to ``activities``.
+
+    ``action`` is ``pg_constraint.confdeltype``: 'c' cascade, 'n' set null,
+    anything else refuses the delete while dependents exist.
+    """
+    body = []
+    for table, column, action in sorted(dependents):
+        if action == 'c':
+            body.append(f"DELETE FROM {table} WHERE {column} = OLD.id;")
+        elif action == 'n':
+            body.append(f"UPDATE {table} SET {column} = NULL WHERE {column} = OLD.id;")
+        else:
+            body.append(
+                f"IF EXISTS (SELECT 1 FROM {table} WHERE {column} = OLD.id) THEN "
+                f"RAISE EXCEPTION 'activity % is referenced from {table}', OLD.id "
+                f"USING ERRCODE = 'foreign_key_violation'; END IF;"
+            )
+    statements = "\n    ".join(body)
+    return [
+        f"CREATE OR REPLACE FUNCTION {DEPENDENTS_TRIGGER}() RETURNS trigger AS $$\n"
+        f"BEGIN\n    {statements}\n    RETURN OLD;\nEND\n$$ LANGUAGE plpgsql",
+        f"DROP TRIGGER IF EXISTS {DEPENDENTS_TRIGGER} ON {TABLE}",
+        f"CREATE TRIGGER {DEPENDENTS_TRIGGER} AFTER DELETE ON {TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {DEPENDENTS_TRIGGER}()",
+    ]
+
+
+def orm_dependents() -> List[Dependent]:
+    """(table, column, action) of every ORM foreign key to ``activities.id``."""
+    return sorted(
+        (fk.parent.table.name, fk.parent.name, _DELETE_ACTIONS.get((fk.ondelete or '').upper(), 'a'))
+        for table in Base.metadata.tables.values()
+        for fk in table.foreign_keys
+        if fk.target_fullname == f"{TABLE}.id"
+    )
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"),
+        {"t": TABLE}
+    ).scalar())
+
+
+def existing_partitions(conn: Connection) -> List[str]:
+    return [name for (name,) in conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+    ), {"t": TABLE})]
+
+
+def _dependents(conn: Connection) -> List[Dependent]:
+    return [tuple(row) for row in conn.execute(text(
+        "SELECT con.conrelid::regclass::text, a.attname, con.confdeltype "
+        "FROM pg_constraint con "
+        "JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = con.conkey[1] "
+        "WHERE con.contype = 'f' AND con.confrelid = to_regclass(:t)"
+    ), {"t": TABLE})]
+
+
+def _install_dependents_trigger(conn: Connection) -> List[Dependent]:
+    """(Re)create the trigger for the ORM dependents whose tables exist."""
+    dependents = orm_dependents()
+    existing = {name for (name,) in conn.execute(
+        text("SELECT t FROM unnest(CAST(:tables AS text[])) AS t WHERE to_regclass(t) IS NOT NULL"),
+        {"tables": sorted({table for table, _, _ in dependents})}
+    )}
+    dependents = [d for d in dependents if d[0] in existing]
+    for statement in dependents_trigger_sql(dependents):
+        conn.execute(text(statement))
+    return dependents
+
+
+def _outbound_foreign_keys(conn: Connection) -> List[Tuple[str, str]]:
+    """(name, definition) of foreign keys from ``activities`` to other tables."""
+    return [tuple(row) for row in conn.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid = to_regclass(:t) AND confrelid <> conrelid"
+    ), {"t": TABLE})]
+
+
+def _supported(engine: Engine) -> bool:
+    if engine.dialect.name != "postgresql":
+        logger.info("partitioning_skipped", dialect=engine.dialect.name)
+        return False
+    return True
+
+
+def convert(engine: Engine, years_ahead: int = 1, today: Optional[date] = None) -> List[str]:
+    """
+    Rebuild ``activities`` as a partitioned table, in one transaction.
+
+    Rows are copied, so this holds an exclusive lock for as long as the
+    copy and index builds take.
+
+    Returns:
+        Names of the partitions created
+    """
+    if not _supported(engine):
+        return []
+    today = today or date.today()
+    legacy = f"{TABLE}_unpartitioned"
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            logger.info("partitioning_already_converted", table=TABLE)
+            return []
+
+        conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+        mapped = {(table, column) for table, column, _ in orm_dependents()}
+        unmapped = [d for d in _dependents(conn) if (d[0], d[1]) not in mapped]
+        if unmapped:
+            # Their constraints go with the old table and the trigger won't cover them
+            logger.warning("partitioning_unmapped_dependents", dependents=unmapped)
+        foreign_keys = _outbound_foreign_keys(conn)
+        years = {int(y) for (y,) in conn.execute(text(
+            f"SELECT DISTINCT EXTRACT(YEAR FROM {KEY})::int FROM {TABLE}"
+        ))}
+        years.update(range(today.year, today.year + years_ahead + 1))
+
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {legacy}"))
+        conn.execute(text(
+            f"CREATE TABLE {TABLE} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE) PARTITION BY RANGE ({KEY})"
+        ))
+        created = []
+        for year in sorted(years):
+            conn.execute(text(create_partition_sql(year)))
+            created.append(partition_name(year))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+
+        conn.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {legacy}"))
+        # Takes the foreign keys that referenced it along
+        conn.execute(text(f"DROP TABLE {legacy} CASCADE"))
+
+        conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, {KEY})"))
+        for statement in index_sql():
+            conn.execute(text(statement))
+        for name, definition in foreign_keys:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}"))
+        dependents = _install_dependents_trigger(conn)
+
+    logger.info("partitioning_converted", table=TABLE, partitions=created, dependents=dependents)
+    return created
+
+
+def ensure_partitions(engine: Engine, years_ahead: int = 1, today: Optional[date] = None) -> List[str]:
+    """
+    Create the partitions for this year through ``years_ahead`` years ahead.
+
+    A year whose rows already landed in the default partition is skipped
+    (attaching it would fail); move those rows first. The dependents
+    trigger is rebuilt too, picking up tables added since the last run.
+
+    Returns:
+        Names of the partitions created
+    """
+    if not _supported(engine):
+        return []
+    today = today or date.today()
+
+    created = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            logger.warning("partitioning_not_converted", table=TABLE)
+            return []
+        existing = set(existing_partitions(conn))
+        for year in range(today.year, today.year + years_ahead + 1):
+            if partition_name(year) in existing:
+                continue
+            start, end = year_bounds(year)
+            stranded = conn.execute(text(
+                f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {KEY} >= :start AND {KEY} < :end)"
+            ), {"start": start, "end": end}).scalar()
+            if stranded:
+                logger.warning("partition_skipped_default_rows", partition=partition_name(year))
+                continue
+            conn.execute(text(create_partition_sql(year)))
+            created.append(partition_name(year))
+        dependents = _install_dependents_trigger(conn)
+
+    logger.info("partitions_ensured", table=TABLE, created=created, dependents=dependents)
+    return created
+
+
+def detach_partitions(engine: Engine, before_year: int) -> List[str]:
+    """
+    Detach yearly partitions older than ``before_year`` for archiving.
+
+    Detached partitions stay as plain tables (dump, then drop them).
+    Their streams, curves and routes are not touched.
+
+    Returns:
+        Names of the detached partitions
+    """
+    if not _supported(engine):
+        return []
+
+    detached = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            logger.warning("partitioning_not_converted", table=TABLE)
+            return []
+        for name in existing_partitions(conn):
+            suffix = name[len(f"{TABLE}_y"):]
+            if name.startswith(f"{TABLE}_y") and suffix.isdigit() and int(suffix) < before_year:
+                conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+                detached.append(name)
+
+    logger.info("partitions_detached", table=TABLE, detached=detached)
+    return detached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain start_date partitions of the activities table.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('convert', help="Rebuild activities as a partitioned table")
+    commands.add_parser('ensure', help="Create upcoming partitions")
+    detach = commands.add_parser('detach', help="Detach old partitions for archiving")
+    detach.add_argument('--before', type=int, required=True, help="Detach years before this one")
+    parser.add_argument('--years-ahead', type=int, default=1)
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    if args.command == 'convert':
+        names = convert(engine, years_ahead=args.years_ahead)
+    elif args.command == 'ensure':
+        names = ensure_partitions(engine, years_ahead=args.years_ahead)
+    else:
+        names = detach_partitions(engine, args.before)
+
+    for name in names:
+        print(name)
+
+
+if __name__ == '__main__':
+    main()
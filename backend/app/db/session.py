@@ -1,17 +1,46 @@
-"""Database session configuration."""
+"""Database session configuration.
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+Writes go to the primary (``engine`` / ``SessionLocal``). Read-only
+endpoints may use ``read_session()`` sessions, which are bound to one
+of the ``DATABASE_REPLICA_URLS`` replicas picked by ``replica_router``:
+round-robin over replicas that answered their last health check with a
+replay lag under ``DATABASE_REPLICA_MAX_LAG_SECONDS``, falling back to the
+primary when none qualify. Health checks run off the request path, in the
+background task started by the app lifespan.
 
+Users who just wrote (login, provider sync) are pinned to the primary for
+``DATABASE_READ_YOUR_WRITES_SECONDS`` with ``pin_primary`` so they never
+read their own changes from behind.
+"""
+
+import asyncio
+import itertools
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when fully caught up
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
 
 # Create engine
 engine = create_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW
 )
 
 # Create session factory
@@ -22,6 +51,124 @@ SessionLocal = sessionmaker(
 )
 
 
+def _create_replica_engine(url: str) -> Engine:
+    connect_args = {"connect_timeout": 2} if url.startswith("postgresql") else {}
+    return create_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_pre_ping=True,
+        pool_size=settings.DATABASE_REPLICA_POOL_SIZE,
+        max_overflow=settings.DATABASE_REPLICA_MAX_OVERFLOW,
+        connect_args=connect_args
+    )
+
+
+class ReplicaRouter:
+    """Picks a healthy, caught-up replica engine for read-only sessions.
+
+    ``pick`` only reads the lag recorded by the last ``check``; ``run``
+    re-checks every ``check_interval`` seconds from a background task.
+    Until the first check completes, reads go to the primary.
+    """
+
+    def __init__(self, engines: List[Engine], max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lag: Dict[Engine, Optional[float]] = {}
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(engines)
+
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _measure(self, replica: Engine) -> Optional[float]:
+        """Replay lag in seconds, or None when the replica is unreachable."""
+        try:
+            with replica.connect() as conn:
+                if replica.dialect.name != "postgresql":
+                    conn.execute(text("SELECT 1"))
+                    return 0.0
+                return float(conn.execute(_REPLICA_LAG_SQL).scalar())
+        except Exception as e:
+            logger.warning("replica_check_failed", replica=replica.url.host, error=str(e))
+            return None
+
+    def check(self) -> None:
+        """Re-measure every replica."""
+        lag = {replica: self._measure(replica) for replica in self.engines}
+        with self._lock:
+            self._lag = lag
+
+    async def run(self) -> None:
+        """Health check loop for a background task; runs until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error("replica_check_pass_failed", error=str(e))
+            await asyncio.sleep(self.check_interval)
+
+    def _on_error(self, context) -> None:
+        # Take a replica out of rotation as soon as it drops connections
+        if context.is_disconnect and context.engine is not None:
+            with self._lock:
+                self._lag[context.engine] = None
+
+    def healthy(self, replica: Engine) -> bool:
+        lag = self._lag.get(replica)
+        return lag is not None and lag <= self.max_lag
+
+    def pick(self) -> Optional[Engine]:
+        """Next usable replica, or None to read from the primary."""
+        if not self.engines:
+            return None
+        for _ in range(len(self.engines)):
+            replica = next(self._cycle)
+            if self.healthy(replica):
+                return replica
+        return None
+
+    def status(self) -> List[dict]:
+        return [
+            {"replica": replica.url.host, "lag_seconds": self._lag.get(replica), "healthy": self.healthy(replica)}
+            for replica in self.engines
+        ]
+
+
+replica_router = ReplicaRouter(
+    [_create_replica_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS
+)
+
+
+def _pin_key(user_id: str) -> str:
+    return f"db_primary_pin:{user_id}"
+
+
+def pin_primary(user_id: str) -> None:
+    """Send the user's reads to the primary for the read-your-writes window."""
+    if replica_router.engines:
+        cache.set(_pin_key(user_id), 1, ttl=settings.DATABASE_READ_YOUR_WRITES_SECONDS)
+
+
+def read_session(user_id: Optional[str] = None) -> Session:
+    """Session for read-only work: a replica unless the user is pinned or none is healthy."""
+    replica = None
+    if user_id is None or cache.get(_pin_key(user_id)) is None:
+        replica = replica_router.pick()
+    db = SessionLocal(bind=replica) if replica is not None else SessionLocal()
+    db.info["read_only"] = replica is not None
+    return db
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_replica_writes(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only"):
+        raise RuntimeError("Attempted to write through a read-replica session")
+
+
 def get_db():
     """Get database session."""
     db = SessionLocal()
@@ -0,0 +1,567 @@
+"""Deterministic synthetic dataset for benchmarks.
+
+Bulk-loads users, coach profiles and athlete-coach links, connected
+accounts, years of activities with per-sport metrics, optional packed
+streams, and training plans with workouts (past ones completed against
+the athlete's activities).
+
+Every user's data is drawn from its own RNG seeded with ``(seed, user
+index)``, so a dataset is reproducible whatever the chunk size and users
+can be appended later by raising ``--users``. Rows are built as tuples and
+loaded per chunk of users: with ``COPY ... FROM STDIN`` on PostgreSQL,
+with multi-row INSERTs elsewhere. Derived analytics (curves, zones, best
+efforts, routes) are not computed.
+
+Usage::
+
+    python -m app.db.synthetic_data --users 10000 --years 3 --activities-per-week 6
+"""
+
+import argparse
+import csv
+import enum
+import io
+import json
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.logging import get_logger
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.models.activity import Activity, ActivityType, DataQuality
+from app.models.activity_payload import ActivityPayload
+from app.models.activity_stream import ActivityStream
+from app.models.athlete_coach import AthleteCoach, CoachingStatus
+from app.models.coach_profile import CoachProfile
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.training_plan import PlanStatus, TrainingPlan
+from app.models.user import User, UserRole
+from app.models.workout import Workout, WorkoutStatus
+from app.services.analytics.streams import to_array
+from app.services.deduplication import fingerprint
+from app.services.raw_payloads import CODEC, encode_payload
+
+logger = get_logger(__name__)
+
+EMAIL_DOMAIN = "synthetic.trainlytics.dev"
+PASSWORD = "synthetic"
+
+# Per-sport distributions: median duration (s) and log-sd, median speed (m/s)
+# and log-sd, mean HR, mean cadence, median power (W), elevation gain per km
+SPORTS = {
+    ActivityType.RUN: dict(duration=(2700, 0.35), speed=(3.1, 0.12), hr=148, cadence=84, power=None, climb=8),
+    ActivityType.RIDE: dict(duration=(5400, 0.45), speed=(7.8, 0.15), hr=138, cadence=86, power=185, climb=10),
+    ActivityType.SWIM: dict(duration=(2700, 0.25), speed=(0.9, 0.12), hr=135, cadence=None, power=None, climb=0),
+    ActivityType.WALK: dict(duration=(3000, 0.40), speed=(1.4, 0.10), hr=105, cadence=56, power=None, climb=12),
+    ActivityType.HIKE: dict(duration=(10800, 0.40), speed=(1.1, 0.15), hr=120, cadence=50, power=None, climb=60),
+    ActivityType.WORKOUT: dict(duration=(3000, 0.30), speed=None, hr=125, cadence=None, power=None, climb=0),
+}
+SPORT_ORDER = list(SPORTS)
+
+# Sport mix per kind of athlete (probabilities follow SPORT_ORDER)
+ATHLETE_PROFILES = {
+    'runner': (0.70, 0.10, 0.00, 0.10, 0.00, 0.10),
+    'cyclist': (0.10, 0.70, 0.00, 0.00, 0.10, 0.10),
+    'triathlete': (0.35, 0.35, 0.20, 0.00, 0.00, 0.10),
+    'casual': (0.30, 0.20, 0.05, 0.25, 0.10, 0.10),
+}
+
+SPORT_LABELS = {
+    ActivityType.RUN: ('Run', 'Run'),
+    ActivityType.RIDE: ('Ride', 'Ride'),
+    ActivityType.SWIM: ('Swim', 'Swim'),
+    ActivityType.WALK: ('Walk', 'Walk'),
+    ActivityType.HIKE: ('Hike', 'Hike'),
+    ActivityType.WORKOUT: ('Workout', 'WeightTraining'),
+}
+
+PLAN_WEEKS = 12
+
+# Load order respects foreign keys
+TABLES = (
+    User, CoachProfile, ConnectedAccount, AthleteCoach, Activity, ActivityPayload, ActivityStream, TrainingPlan,
+    Workout,
+)
+
+
+@dataclass
+class SyntheticConfig:
+    """Size and shape of a synthetic dataset."""
+
+    users: int = 1000
+    # Fraction of users who coach, and of athletes who have a coach
+    coach_ratio: float = 0.02
+    coached_ratio: float = 0.3
+    years: float = 3.0
+    activities_per_week: float = 5.0
+    # Fraction of activities with streams, and samples per stream (1 Hz, capped)
+    stream_ratio: float = 0.0
+    max_stream_samples: int = 7200
+    plans_per_athlete: int = 2
+    workouts_per_week: int = 4
+    seed: int = 42
+    end: datetime = datetime(2025, 1, 1)
+    chunk_users: int = 200
+
+
+def _uuid(rng: np.random.Generator) -> str:
+    return _uuids(rng, 1)[0]
+
+
+def _email(index: int) -> str:
+    return f"user{index:08d}@{EMAIL_DOMAIN}"
+
+
+def _user_rng(config: SyntheticConfig, index: int, stream: int = 0) -> np.random.Generator:
+    return np.random.default_rng([config.seed, index, stream])
+
+
+def _user_id(config: SyntheticConfig, index: int) -> str:
+    return _uuid(_user_rng(config, index, stream=1))
+
+
+def coach_count(config: SyntheticConfig) -> int:
+    return max(1, int(config.users * config.coach_ratio)) if config.users > 1 else 0
+
+
+class Dataset:
+    """Rows per table, as tuples in ``COLUMNS`` order."""
+
+    def __init__(self):
+        self.rows: Dict[str, List[Tuple]] = {model.__tablename__: [] for model in TABLES}
+
+    def add(self, model, *rows: Tuple) -> None:
+        self.rows[model.__tablename__].extend(rows)
+
+    def counts(self) -> Dict[str, int]:
+        return {table: len(rows) for table, rows in self.rows.items()}
+
+
+COLUMNS = {
+    User: ('id', 'email', 'hashed_password', 'name', 'role', 'timezone', 'created_at', 'updated_at'),
+    CoachProfile: ('id', 'user_id', 'bio', 'specialties', 'max_athletes', 'accepting_new', 'created_at',
+                   'updated_at'),
+    ConnectedAccount: ('id', 'user_id', 'provider', 'provider_user_id', 'access_token', 'sync_enabled',
+                       'last_sync_at', 'last_sync_status', 'is_active', 'connected_at'),
+    AthleteCoach: ('id', 'athlete_id', 'coach_id', 'status', 'permissions', 'start_date', 'created_at'),
+    Activity: (
+        'id', 'user_id', 'connected_account_id', 'provider', 'provider_activity_id', 'data_quality',
+        'fingerprint', 'name', 'activity_type', 'sport_type', 'start_date', 'end_date', 'timezone',
+        'duration_seconds', 'distance_meters', 'moving_time_seconds', 'elevation_gain_meters',
+        'elevation_loss_meters', 'avg_heart_rate', 'max_heart_rate', 'avg_power', 'max_power',
+        'normalized_power', 'avg_speed_mps', 'max_speed_mps', 'avg_cadence', 'calories', 'start_latlng',
+        'end_latlng', 'is_manual', 'shared_with_coach', 'available_metrics', 'raw_data_hash', 'processed_data',
+        'created_at', 'updated_at', 'synced_at',
+    ),
+    ActivityPayload: ('activity_id', 'codec', 'size', 'data', 'created_at', 'updated_at'),
+    ActivityStream: ('activity_id', 'channel', 'dtype', 'components', 'length', 'data', 'created_at'),
+    TrainingPlan: ('id', 'created_by', 'athlete_id', 'name', 'start_date', 'end_date', 'weeks_count',
+                   'is_template', 'status', 'created_at', 'updated_at'),
+    Workout: ('id', 'training_plan_id', 'created_by', 'athlete_id', 'title', 'workout_type', 'scheduled_date',
+              'target_duration', 'target_distance', 'target_heart_rate', 'target_power', 'structure', 'status',
+              'completed_at', 'activity_id', 'rpe', 'created_at', 'updated_at'),
+}
+
+
+# -- generation ------------------------------------------------------------
+
+def generate_users(config: SyntheticConfig, indexes: Iterable[int], password_hash: str, dataset: Dataset) -> None:
+    """Users (the first ``coach_count`` are coaches with a profile)."""
+    coaches = coach_count(config)
+    joined = config.end - timedelta(days=int(config.years * 365.25))
+    for index in indexes:
+        rng = _user_rng(config, index, stream=2)
+        user_id = _user_id(config, index)
+        created = joined - timedelta(days=int(rng.integers(0, 60)))
+        is_coach = index < coaches
+        dataset.add(User, (
+            user_id, _email(index), password_hash, f"Synthetic User {index}",
+            UserRole.COACH if is_coach else UserRole.ATHLETE, 'UTC', created, created,
+        ))
+        if is_coach:
+            dataset.add(CoachProfile, (
+                _uuid(rng), user_id, "Synthetic coach", "running,cycling,triathlon",
+                max(10, int(math.ceil((config.users - coaches) * config.coached_ratio / max(coaches, 1)))),
+                True, created, created,
+            ))
+
+
+def generate_athlete(config: SyntheticConfig, index: int, dataset: Dataset) -> None:
+    """Connected account, coach link, activities, streams and plans of one user."""
+    rng = _user_rng(config, index)
+    user_id = _user_id(config, index)
+    coaches = coach_count(config)
+    end = config.end
+    start = end - timedelta(days=int(config.years * 365.25))
+
+    account_id = _uuid(rng)
+    dataset.add(ConnectedAccount, (
+        account_id, user_id, Provider.STRAVA, f"{100000 + index}", f"synthetic-{index}",
+        True, end, 'success', True, start,
+    ))
+
+    coach_id = None
+    if index >= coaches and coaches and rng.random() < config.coached_ratio:
+        coach_id = _user_id(config, int(rng.integers(0, coaches)))
+        dataset.add(AthleteCoach, (
+            _uuid(rng), user_id, coach_id, CoachingStatus.ACTIVE,
+            {'view_activities': True, 'create_workouts': True}, start, start,
+        ))
+
+    activities = _generate_activities(config, rng, index, user_id, account_id, start, end, dataset)
+    _generate_plans(config, rng, user_id, coach_id, activities, dataset)
+
+
+def _param(name: str, part: Optional[int] = None) -> np.ndarray:
+    """Per-sport parameter as an array indexed like SPORT_ORDER (NaN when absent)."""
+    values = []
+    for sport in SPORT_ORDER:
+        value = SPORTS[sport][name]
+        if value is not None and part is not None:
+            value = value[part]
+        values.append(np.nan if value is None else value)
+    return np.array(values, dtype=float)
+
+
+_DURATION_MEDIAN, _DURATION_SIGMA = _param('duration', 0), _param('duration', 1)
+_SPEED_MEDIAN, _SPEED_SIGMA = _param('speed', 0), _param('speed', 1)
+_HR, _CADENCE, _POWER, _CLIMB = _param('hr'), _param('cadence'), _param('power'), _param('climb')
+
+
+def _uuids(rng: np.random.Generator, n: int) -> List[str]:
+    """n random version-4 UUID strings."""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    hexed = raw.tobytes().hex()
+    return [
+        f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        for h in (hexed[i:i + 32] for i in range(0, len(hexed), 32))
+    ]
+
+
+def _nullable(values: np.ndarray, decimals: int) -> List[Optional[float]]:
+    return [None if math.isnan(v) else v for v in np.round(values, decimals).tolist()]
+
+
+def _generate_activities(
+    config: SyntheticConfig,
+    rng: np.random.Generator,
+    index: int,
+    user_id: str,
+    account_id: str,
+    start: datetime,
+    end: datetime,
+    dataset: Dataset
+) -> Dict[datetime, Tuple[str, ActivityType, int]]:
+    """Activities (and streams); returns the first activity of each day for workout matching."""
+    days = (end - start).days
+    rate = config.activities_per_week * rng.uniform(0.5, 1.5) / 7
+    n = int(rng.poisson(rate * days))
+    if n == 0:
+        return {}
+
+    # Draw every metric as a vector, then build rows from plain Python lists
+    profile = list(ATHLETE_PROFILES.values())[int(rng.integers(0, len(ATHLETE_PROFILES)))]
+    sports = rng.choice(len(SPORT_ORDER), size=n, p=profile)
+    offsets = np.sort(rng.integers(0, days, size=n)) * 86400 + rng.integers(6 * 3600, 20 * 3600, size=n)
+    fitness = rng.normal(1.0, 0.08)
+
+    duration = np.clip(
+        _DURATION_MEDIAN[sports] * np.exp(_DURATION_SIGMA[sports] * rng.standard_normal(n)), 300, 36000
+    ).astype(int)
+    moving = (duration * rng.uniform(0.88, 1.0, n)).astype(int)
+    speed = _SPEED_MEDIAN[sports] * fitness * np.exp(np.nan_to_num(_SPEED_SIGMA[sports]) * rng.standard_normal(n))
+    distance = speed * moving
+    elevation = _CLIMB[sports] * rng.lognormal(0, 0.6, n) * distance / 1000
+    avg_hr = np.clip(_HR[sports] + rng.normal(0, 7, n), 80, 195).astype(int)
+    max_hr = np.minimum(205, avg_hr + rng.integers(10, 30, n))
+    cadence = _CADENCE[sports] + rng.normal(0, 2.5, n)
+    power = _POWER[sports] * fitness * rng.lognormal(0, 0.18, n)
+    # ~1 kcal per kJ of work on the bike, heart-rate estimate otherwise
+    calories = (duration * np.where(np.isnan(power), avg_hr * 0.0014, power * 0.001)).astype(int)
+    with_streams = (rng.random(n) < config.stream_ratio).tolist()
+    ids = _uuids(rng, n)
+
+    columns = (
+        sports.tolist(), offsets.tolist(), duration.tolist(), moving.tolist(), _nullable(distance, 1),
+        _nullable(elevation, 1), avg_hr.tolist(), max_hr.tolist(), _nullable(power, 1),
+        _nullable(speed, 3), _nullable(cadence, 1), calories.tolist(),
+    )
+    latlng = [round(45.0 + (index % 100) * 0.05, 5), round(7.0 + (index // 100 % 100) * 0.05, 5)]
+
+    by_day: Dict[datetime, Tuple[str, ActivityType, int]] = {}
+    for k, (sport, offset, seconds, moving_seconds, meters, climb, hr, hr_max, watts, mps, rpm, kcal) in enumerate(
+        zip(*columns)
+    ):
+        activity_type = SPORT_ORDER[sport]
+        label, sport_type = SPORT_LABELS[activity_type]
+        started = start + timedelta(seconds=offset)
+        part = 'Morning' if started.hour < 12 else 'Afternoon' if started.hour < 17 else 'Evening'
+        name = f"{part} {label}"
+        gps = meters is not None and activity_type != ActivityType.SWIM
+        provider_activity_id = index * 100000 + k
+
+        digest, size, blob = encode_payload({
+            'id': provider_activity_id, 'name': name, 'type': sport_type,
+            'start_date': started.isoformat() + 'Z', 'elapsed_time': seconds, 'moving_time': moving_seconds,
+            'distance': meters, 'average_heartrate': hr, 'average_watts': watts,
+            'total_elevation_gain': climb,
+        })
+        dataset.add(Activity, (
+            ids[k], user_id, account_id, 'STRAVA', str(provider_activity_id), DataQuality.FULL,
+            fingerprint(SimpleNamespace(start_date=started, duration_seconds=seconds, distance_meters=meters)),
+            name, activity_type, sport_type, started, started + timedelta(seconds=seconds), 'UTC',
+            seconds, meters, moving_seconds, climb, climb, hr, hr_max,
+            watts, round(watts * 2.8, 1) if watts else None, round(watts * 1.06, 1) if watts else None,
+            mps, round(mps * 1.6, 3) if mps else None, rpm, kcal,
+            latlng if gps else None, latlng if gps else None,
+            False, True,
+            {'heartrate': True, 'power': watts is not None, 'cadence': rpm is not None, 'gps': gps},
+            digest, {}, started, started, started,
+        ))
+        dataset.add(ActivityPayload, (ids[k], CODEC, size, blob, started, started))
+        by_day.setdefault(started.replace(hour=0, minute=0, second=0), (ids[k], activity_type, seconds))
+
+        if with_streams[k]:
+            _generate_streams(config, rng, ids[k], started, moving_seconds, meters, hr, watts,
+                              latlng if gps else None, dataset)
+
+    return by_day
+
+
+def _generate_streams(
+    config: SyntheticConfig,
+    rng: np.random.Generator,
+    activity_id: str,
+    started: datetime,
+    seconds: int,
+    distance: Optional[float],
+    avg_hr: int,
+    avg_power: Optional[float],
+    latlng: Optional[List[float]],
+    dataset: Dataset
+) -> None:
+    n = max(2, min(seconds, config.max_stream_samples))
+    t = np.linspace(0, seconds, n)
+    channels = {
+        'time': t,
+        'heartrate': np.clip(avg_hr + 6 * np.sin(t / 480) + rng.normal(0, 2, n), 60, 205),
+        'altitude': 250 + 25 * np.sin(t / 900) + rng.normal(0, 0.4, n),
+    }
+    if distance:
+        speed = np.clip(distance / seconds * (1 + 0.08 * np.sin(t / 300) + rng.normal(0, 0.03, n)), 0.2, None)
+        channels['velocity_smooth'] = speed
+        channels['distance'] = np.concatenate([[0.0], np.cumsum(speed[1:] * np.diff(t))])
+    if avg_power:
+        channels['watts'] = np.clip(avg_power * (1 + rng.normal(0, 0.25, n)), 0, None)
+    if latlng:
+        angle = 2 * np.pi * t / seconds
+        radius = (distance or 1000) / (2 * np.pi) / 111000.0
+        channels['latlng'] = np.column_stack([
+            latlng[0] + radius * np.sin(angle), latlng[1] + radius * (1 - np.cos(angle))
+        ])
+
+    for channel, values in channels.items():
+        array = to_array(channel, values)
+        dataset.add(ActivityStream, (
+            activity_id, channel, array.dtype.str, array.shape[1] if array.ndim == 2 else 1,
+            array.shape[0], array.tobytes(), started,
+        ))
+
+
+def _generate_plans(
+    config: SyntheticConfig,
+    rng: np.random.Generator,
+    user_id: str,
+    coach_id: Optional[str],
+    activities: Dict[datetime, Tuple[str, ActivityType, int]],
+    dataset: Dataset
+) -> None:
+    """Back-to-back plans ending four weeks after the dataset end."""
+    creator = coach_id or user_id
+    plan_end = config.end + timedelta(weeks=4)
+    linked = set()
+
+    for p in range(config.plans_per_athlete):
+        end = plan_end - timedelta(weeks=PLAN_WEEKS * p)
+        start = end - timedelta(weeks=PLAN_WEEKS)
+        plan_id = _uuid(rng)
+        status = PlanStatus.ACTIVE if end > config.end else PlanStatus.COMPLETED
+        dataset.add(TrainingPlan, (
+            plan_id, creator, user_id, f"{PLAN_WEEKS}-week block {config.plans_per_athlete - p}",
+            start, end, PLAN_WEEKS, False, status, start - timedelta(days=7), start - timedelta(days=7),
+        ))
+
+        for week in range(PLAN_WEEKS):
+            days = np.sort(rng.choice(7, size=min(config.workouts_per_week, 7), replace=False))
+            for day in days:
+                scheduled = start + timedelta(weeks=week, days=int(day))
+                activity = activities.get(scheduled)
+                if activity and activity[0] in linked:
+                    activity = None
+                workout_type = activity[1] if activity else SPORT_ORDER[int(rng.integers(0, 2))]
+                target = int(rng.choice([1800, 2700, 3600, 5400]))
+
+                if scheduled >= config.end:
+                    status, completed_at, activity_id, rpe = WorkoutStatus.PLANNED, None, None, None
+                elif activity:
+                    linked.add(activity[0])
+                    status, completed_at, activity_id = WorkoutStatus.COMPLETED, scheduled, activity[0]
+                    rpe = int(rng.integers(3, 9))
+                else:
+                    status, completed_at, activity_id, rpe = WorkoutStatus.SKIPPED, None, None, None
+
+                dataset.add(Workout, (
+                    _uuid(rng), plan_id, creator, user_id, f"{workout_type.value.title()} {target // 60} min",
+                    workout_type.value, scheduled, target, None, int(rng.integers(130, 160)), None,
+                    {'steps': [{'type': 'steady', 'duration': target}]}, status, completed_at, activity_id, rpe,
+                    start, start,
+                ))
+
+
+# -- loading ---------------------------------------------------------------
+
+def _copy_value(value: Any) -> Any:
+    """Text form of a value for COPY (csv); None becomes an unquoted empty field (NULL)."""
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy Enum columns store member names
+        return value.name
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    return value
+
+
+def _copy_rows(connection: Connection, table: Table, columns: Sequence[str], rows: List[Tuple]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(v) for v in row])
+    buffer.seek(0)
+
+    sql = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _insert_rows(connection: Connection, table: Table, columns: Sequence[str], rows: List[Tuple], batch: int = 5000):
+    for offset in range(0, len(rows), batch):
+        connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows[offset:offset + batch]])
+
+
+def load(engine: Engine, dataset: Dataset) -> None:
+    """Write a dataset in one transaction (COPY on PostgreSQL)."""
+    use_copy = engine.dialect.name == 'postgresql'
+    with engine.begin() as connection:
+        if use_copy:
+            connection.exec_driver_sql("SET LOCAL synchronous_commit = off")
+        for model in TABLES:
+            rows = dataset.rows[model.__tablename__]
+            if not rows:
+                continue
+            if use_copy:
+                _copy_rows(connection, model.__table__, COLUMNS[model], rows)
+            else:
+                _insert_rows(connection, model.__table__, COLUMNS[model], rows)
+
+
+def generate(engine: Engine, config: SyntheticConfig, first_user: int = 0) -> Dict[str, int]:
+    """
+    Generate and load users ``first_user`` to ``config.users - 1``.
+
+    Returns:
+        Row counts per table
+    """
+    Base.metadata.create_all(bind=engine)
+    password_hash = get_password_hash(PASSWORD)
+    totals = {model.__tablename__: 0 for model in TABLES}
+    started = time.perf_counter()
+
+    for chunk_start in range(first_user, config.users, config.chunk_users):
+        indexes = range(chunk_start, min(chunk_start + config.chunk_users, config.users))
+        dataset = Dataset()
+        generate_users(config, indexes, password_hash, dataset)
+        for index in indexes:
+            generate_athlete(config, index, dataset)
+        load(engine, dataset)
+
+        for table, count in dataset.counts().items():
+            totals[table] += count
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "synthetic_data_progress",
+            users=indexes.stop,
+            activities=totals['activities'],
+            activities_per_second=round(totals['activities'] / elapsed, 1) if elapsed else None,
+        )
+
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load a deterministic synthetic dataset.")
+    defaults = SyntheticConfig()
+    parser.add_argument('--users', type=int, default=defaults.users)
+    parser.add_argument('--first-user', type=int, default=0, help="Append users from this index on")
+    parser.add_argument('--coach-ratio', type=float, default=defaults.coach_ratio)
+    parser.add_argument('--coached-ratio', type=float, default=defaults.coached_ratio)
+    parser.add_argument('--years', type=float, default=defaults.years)
+    parser.add_argument('--activities-per-week', type=float, default=defaults.activities_per_week)
+    parser.add_argument('--stream-ratio', type=float, default=defaults.stream_ratio,
+                        help="Fraction of activities with streams")
+    parser.add_argument('--max-stream-samples', type=int, default=defaults.max_stream_samples)
+    parser.add_argument('--plans-per-athlete', type=int, default=defaults.plans_per_athlete)
+    parser.add_argument('--workouts-per-week', type=int, default=defaults.workouts_per_week)
+    parser.add_argument('--chunk-users', type=int, default=defaults.chunk_users)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    config = SyntheticConfig(
+        users=args.users,
+        coach_ratio=args.coach_ratio,
+        coached_ratio=args.coached_ratio,
+        years=args.years,
+        activities_per_week=args.activities_per_week,
+        stream_ratio=args.stream_ratio,
+        max_stream_samples=args.max_stream_samples,
+        plans_per_athlete=args.plans_per_athlete,
+        workouts_per_week=args.workouts_per_week,
+        chunk_users=args.chunk_users,
+        seed=args.seed,
+    )
+    started = time.perf_counter()
+    totals = generate(engine, config, first_user=args.first_user)
+    elapsed = time.perf_counter() - started
+
+    for table, count in totals.items():
+        print(f"{table:<20} {count:>12,}")
+    print(f"Loaded in {elapsed:.1f}s ({totals['activities'] / max(elapsed, 1e-9):,.0f} activities/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,22 @@
 """Main FastAPI application."""
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
 import sentry_sdk
 
 from app.core.config import settings
 from app.core.logging import setup_logging
-from app.api.v1 import auth, users, activities, workouts
+from app.api.v1 import auth, users, activities, workouts, notifications, events, changes
+from app.db.session import replica_router
+from app.services.analytics.compute import compute_executor
+from app.services.connectors.resilience import BreakerState, metrics_snapshot
+from app.services.events import broker
+from app.services.token_manager import token_manager
 
 # Initialize Sentry
 if settings.SENTRY_DSN:
@@ -20,13 +29,31 @@ if settings.SENTRY_DSN:
 # Setup logging
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services with the app and stop them on shutdown."""
+    await asyncio.to_thread(compute_executor.start)
+    token_refresh = asyncio.create_task(token_manager.run()) if settings.TOKEN_REFRESH_ENABLED else None
+    replica_checks = asyncio.create_task(replica_router.run()) if replica_router.engines else None
+    yield
+    for task in (token_refresh, replica_checks):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await broker.close()
+    await asyncio.to_thread(compute_executor.shutdown)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Trainlytics API",
     description="API for Trainlytics - Coach & Athlete Training Platform",
     version="1.0.0",
     docs_url="/api/docs" if settings.ENVIRONMENT != "production" else None,
-    redoc_url="/api/redoc" if settings.ENVIRONMENT != "production" else None
+    redoc_url="/api/redoc" if settings.ENVIRONMENT != "production" else None,
+    lifespan=lifespan
 )
 
 # CORS Middleware
@@ -46,6 +73,13 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(activities.router, prefix="/api/v1/activities", tags=["activities"])
 app.include_router(workouts.router, prefix="/api/v1/workouts", tags=["workouts"])
+app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["notifications"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
+app.include_router(changes.router, prefix="/api/v1/changes", tags=["changes"])
+
+# Locally stored media (route thumbnails) when no S3 bucket is configured
+if not settings.S3_ENDPOINT:
+    app.mount(settings.MEDIA_URL, StaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
 
 
 @app.get("/")
@@ -64,6 +98,29 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/connectors")
+async def connectors_health():
+    """Provider circuit breaker states and request counters."""
+    providers = metrics_snapshot()
+    degraded = any(p["state"] != BreakerState.CLOSED for p in providers.values())
+    return {"status": "degraded" if degraded else "healthy", "providers": providers}
+
+
+@app.get("/health/replicas")
+async def replicas_health():
+    """Read replica lag and health as of the last check (reads fall back to the primary)."""
+    replicas = replica_router.status()
+    degraded = any(not r["healthy"] for r in replicas)
+    return {"status": "degraded" if degraded else "healthy", "replicas": replicas}
+
+
+@app.get("/health/compute")
+async def compute_health():
+    """Analytics process pool queue depth and timings."""
+    stats = compute_executor.stats()
+    return {"status": "busy" if stats["queued"] else "healthy", "compute": stats}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
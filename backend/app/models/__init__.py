@@ -5,10 +5,18 @@ from app.models.coach_profile import CoachProfile
 from app.models.athlete_coach import AthleteCoach, CoachingStatus
 from app.models.connected_account import ConnectedAccount, Provider
 from app.models.activity import Activity, ActivityType, DataQuality
+from app.models.activity_stream import ActivityStream
+from app.models.activity_payload import ActivityPayload
+from app.models.activity_curve import ActivityCurve, AthleteCurve
+from app.models.activity_route import ActivityRoute
+from app.models.best_effort import BestEffort
+from app.models.athlete_threshold import AthleteThreshold, ThresholdMetric
+from app.models.activity_zones import ActivityZones
 from app.models.workout import Workout, WorkoutStatus
 from app.models.training_plan import TrainingPlan, PlanStatus
 from app.models.comment import Comment
 from app.models.notification import Notification, NotificationType
+from app.models.tombstone import Tombstone
 
 __all__ = [
     "User",
@@ -21,6 +29,15 @@ __all__ = [
     "Activity",
     "ActivityType",
     "DataQuality",
+    "ActivityStream",
+    "ActivityPayload",
+    "ActivityCurve",
+    "AthleteCurve",
+    "ActivityRoute",
+    "BestEffort",
+    "AthleteThreshold",
+    "ThresholdMetric",
+    "ActivityZones",
     "Workout",
     "WorkoutStatus",
     "TrainingPlan",
@@ -28,4 +45,5 @@ __all__ = [
     "Comment",
     "Notification",
     "NotificationType",
+    "Tombstone",
 ]
@@ -3,8 +3,8 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Enum as SQLEnum, JSON, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, Float, DateTime, Boolean, Enum as SQLEnum, JSON, ForeignKey, Index, text
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base
 
@@ -33,7 +33,7 @@ class Activity(Base):
     __tablename__ = "activities"
 
     id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
     connected_account_id = Column(String, ForeignKey("connected_accounts.id"))
 
     # Source tracking
@@ -41,10 +41,14 @@ class Activity(Base):
     provider_activity_id = Column(String, nullable=False)
     data_quality = Column(SQLEnum(DataQuality), default=DataQuality.FULL)
 
+    # Cross-provider duplicates: same workout imported from another provider
+    fingerprint = Column(String)
+    duplicate_of_id = Column(String, ForeignKey("activities.id", ondelete="SET NULL"))
+
     # Basic metadata
     name = Column(String, nullable=False)
     description = Column(String)
-    activity_type = Column(SQLEnum(ActivityType), nullable=False, index=True)
+    activity_type = Column(SQLEnum(ActivityType), nullable=False)
     sport_type = Column(String)
 
     # Date & Time
@@ -89,7 +93,10 @@ class Activity(Base):
 
     # Data
     available_metrics = Column(JSON, default={})
-    raw_data = Column(JSON, nullable=False)
+    # Provider payloads live in activity_payloads; raw_data only holds rows not yet moved there
+    raw_data = deferred(Column(JSON(none_as_null=True)))
+    raw_data_hash = Column(String)  # sha256 of the canonical payload JSON
+    payload_hash = Column(String)  # sha256 of the normalized column values; unchanged re-syncs are skipped
     processed_data = Column(JSON, default={})
 
     # Timestamps
@@ -102,9 +109,32 @@ class Activity(Base):
     connected_account = relationship("ConnectedAccount", back_populates="activities")
     comments = relationship("Comment", back_populates="activity")
     workout = relationship("Workout", back_populates="activity", uselist=False)
+    streams = relationship("ActivityStream", back_populates="activity", cascade="all, delete-orphan", passive_deletes=True)
+    curves = relationship("ActivityCurve", back_populates="activity", cascade="all, delete-orphan", passive_deletes=True)
+    route = relationship("ActivityRoute", back_populates="activity", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    payload = relationship("ActivityPayload", back_populates="activity", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (
         Index('idx_user_provider_activity', 'user_id', 'provider_activity_id', unique=True),
+        # Activity list: WHERE user_id = ? AND duplicate_of_id IS NULL ORDER BY start_date DESC
+        Index(
+            'idx_activities_user_start_date',
+            'user_id', 'start_date',
+            postgresql_include=['name', 'activity_type', 'duration_seconds', 'distance_meters', 'provider'],
+            postgresql_where=text('duplicate_of_id IS NULL'),
+            sqlite_where=text('duplicate_of_id IS NULL'),
+        ),
+        # Activity list filtered by type: WHERE user_id = ? AND activity_type = ? ... ORDER BY start_date DESC
+        Index(
+            'idx_activities_user_type_start_date',
+            'user_id', 'activity_type', 'start_date',
+            postgresql_where=text('duplicate_of_id IS NULL'),
+            sqlite_where=text('duplicate_of_id IS NULL'),
+        ),
+        # Duplicate probe: WHERE user_id = ? AND fingerprint IN (...)
+        Index('idx_activities_user_fingerprint', 'user_id', 'fingerprint'),
+        # Delta sync: WHERE user_id = ? AND updated_at > ? ORDER BY updated_at, id
+        Index('idx_activities_user_updated_at', 'user_id', 'updated_at', 'id'),
     )
 
     def __repr__(self):
@@ -0,0 +1,48 @@
+"""Mean-maximal curve models."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class ActivityCurve(Base):
+    """Best average power/speed of one activity over the standard duration grid."""
+
+    __tablename__ = "activity_curves"
+
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)  # power, speed
+
+    length = Column(Integer, nullable=False)  # grid points covered by the activity
+    data = Column(LargeBinary, nullable=False)  # "<f4" values, one per grid point
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    activity = relationship("Activity", back_populates="curves")
+
+    def __repr__(self):
+        return f"<ActivityCurve {self.kind} for {self.activity_id}>"
+
+
+class AthleteCurve(Base):
+    """Element-wise best of an athlete's activity curves for a sport and period."""
+
+    __tablename__ = "athlete_curves"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sport = Column(String, primary_key=True)  # ActivityType value
+    kind = Column(String, primary_key=True)  # power, speed
+    period = Column(String, primary_key=True)  # "all" or season year, e.g. "2024"
+
+    length = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # "<f4" values, one per grid point
+    activity_count = Column(Integer, default=0, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AthleteCurve {self.sport}/{self.kind}/{self.period} for {self.user_id}>"
@@ -0,0 +1,28 @@
+"""Raw provider payload model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class ActivityPayload(Base):
+    """An activity's provider payload as compressed canonical JSON, kept off the activities row."""
+
+    __tablename__ = "activity_payloads"
+
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False)  # "zstd"
+    size = Column(Integer, nullable=False)  # uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    activity = relationship("Activity", back_populates="payload")
+
+    def __repr__(self):
+        return f"<ActivityPayload for {self.activity_id} ({self.size} bytes)>"
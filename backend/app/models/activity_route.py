@@ -0,0 +1,32 @@
+"""Activity route model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class ActivityRoute(Base):
+    """Simplified, polyline-encoded GPS track of an activity."""
+
+    __tablename__ = "activity_routes"
+
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+
+    summary_polyline = Column(Text, nullable=False)  # list/thumbnail zoom
+    detail_polyline = Column(Text, nullable=False)  # activity page zoom
+    point_count = Column(Integer, nullable=False)  # points in the source stream
+    bounds = Column(JSON)  # [min_lat, min_lng, max_lat, max_lng]
+
+    thumbnail_key = Column(String)  # storage key of the rendered SVG
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    activity = relationship("Activity", back_populates="route")
+
+    def __repr__(self):
+        return f"<ActivityRoute for {self.activity_id}>"
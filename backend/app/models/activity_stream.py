@@ -0,0 +1,30 @@
+"""Activity stream model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+class ActivityStream(Base):
+    """One time-series channel of an activity, stored as a packed little-endian array."""
+
+    __tablename__ = "activity_streams"
+
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    channel = Column(String, primary_key=True)  # time, distance, heartrate, watts, latlng, ...
+
+    dtype = Column(String, nullable=False)  # NumPy dtype string, e.g. "<f4"
+    components = Column(Integer, default=1, nullable=False)  # 2 for latlng pairs
+    length = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    activity = relationship("Activity", back_populates="streams")
+
+    def __repr__(self):
+        return f"<ActivityStream {self.channel} for {self.activity_id}>"
@@ -0,0 +1,32 @@
+"""Activity time-in-zone model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, LargeBinary, Index
+
+from app.db.base import Base
+
+
+class ActivityZones(Base):
+    """Seconds spent in each zone of one channel, against the threshold in effect that day."""
+
+    __tablename__ = "activity_zones"
+
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String, primary_key=True)  # power, heartrate, pace
+
+    # Copied from the activity for range scans without a join
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+
+    threshold = Column(Float, nullable=False)
+    seconds = Column(LargeBinary, nullable=False)  # "<i4" seconds per zone
+
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_activity_zones_user_kind_start_date', 'user_id', 'kind', 'start_date'),
+    )
+
+    def __repr__(self):
+        return f"<ActivityZones {self.kind} for {self.activity_id}>"
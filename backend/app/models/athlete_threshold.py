@@ -0,0 +1,36 @@
+"""Athlete threshold history model."""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import Column, String, Float, DateTime, Enum as SQLEnum, ForeignKey, Index
+
+from app.db.base import Base
+
+
+class ThresholdMetric(str, enum.Enum):
+    """Threshold metric enumeration."""
+    FTP = "ftp"  # watts
+    LTHR = "lthr"  # bpm
+    THRESHOLD_PACE = "threshold_pace"  # seconds per km
+
+
+class AthleteThreshold(Base):
+    """A threshold value in effect from a date until the next one for the same metric."""
+
+    __tablename__ = "athlete_thresholds"
+
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    metric = Column(SQLEnum(ThresholdMetric), nullable=False)
+    value = Column(Float, nullable=False)
+    effective_from = Column(DateTime, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_thresholds_user_metric_effective', 'user_id', 'metric', 'effective_from', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<AthleteThreshold {self.metric}={self.value} from {self.effective_from}>"
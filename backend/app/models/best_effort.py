@@ -0,0 +1,27 @@
+"""Best effort (personal record) model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
+
+from app.db.base import Base
+
+
+class BestEffort(Base):
+    """An athlete's fastest recorded segment for a standard distance."""
+
+    __tablename__ = "best_efforts"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    effort = Column(String, primary_key=True)  # 400m, 1k, 5k, 10k, half_marathon
+
+    distance_meters = Column(Float, nullable=False)
+    elapsed_seconds = Column(Float, nullable=False)
+    activity_id = Column(String, ForeignKey("activities.id", ondelete="CASCADE"), nullable=False)
+    start_offset_seconds = Column(Integer)  # segment start within the activity
+    achieved_at = Column(DateTime, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<BestEffort {self.effort} {self.elapsed_seconds}s for {self.user_id}>"
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -30,5 +30,10 @@ class Comment(Base):
     workout = relationship("Workout", back_populates="comments")
     activity = relationship("Activity", back_populates="comments")
 
+    __table_args__ = (
+        # Delta sync: WHERE updated_at > ? ORDER BY updated_at, id (visibility filtered after)
+        Index('idx_comments_updated_at', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Comment by {self.author_id}>"
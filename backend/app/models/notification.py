@@ -3,7 +3,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -19,6 +19,7 @@ class NotificationType(str, enum.Enum):
     COACHING_ACCEPTED = "coaching_accepted"
     SYNC_COMPLETED = "sync_completed"
     SYNC_FAILED = "sync_failed"
+    COACH_MESSAGE = "coach_message"
 
 
 class Notification(Base):
@@ -27,19 +28,29 @@ class Notification(Base):
     __tablename__ = "notifications"
 
     id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
 
     type = Column(SQLEnum(NotificationType), nullable=False)
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     action_url = Column(String)
 
-    is_read = Column(Boolean, default=False, index=True)
+    is_read = Column(Boolean, default=False)
 
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User")
 
+    __table_args__ = (
+        # Notification feed: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index('idx_notifications_user_created_at', 'user_id', 'created_at', 'id'),
+        # Unread feed and badge: WHERE user_id = ? AND is_read = false ORDER BY created_at DESC, id DESC
+        Index('idx_notifications_user_read_created_at', 'user_id', 'is_read', 'created_at', 'id'),
+        # Delta sync: WHERE user_id = ? AND updated_at > ? ORDER BY updated_at, id
+        Index('idx_notifications_user_updated_at', 'user_id', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Notification {self.type} for {self.user_id}>"
@@ -0,0 +1,32 @@
+"""Tombstone model."""
+
+from datetime import datetime
+
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+
+from app.db.base import Base
+
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta-sync clients can drop it from their cache."""
+
+    __tablename__ = "tombstones"
+
+    id = Column(String, primary_key=True, index=True)
+    # User whose delta feed reports the deletion (one row per affected user)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    entity = Column(String, nullable=False)  # activities, workouts, comments, notifications
+    entity_id = Column(String, nullable=False)
+
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Delta feed: WHERE user_id = ? AND deleted_at > ? ORDER BY deleted_at
+        Index('idx_tombstones_user_deleted_at', 'user_id', 'deleted_at'),
+        # Retention pruning: WHERE deleted_at < ?
+        Index('idx_tombstones_deleted_at', 'deleted_at'),
+    )
+
+    def __repr__(self):
+        return f"<Tombstone {self.entity} {self.entity_id} for {self.user_id}>"
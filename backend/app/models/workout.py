@@ -3,7 +3,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, Enum as SQLEnum, JSON, ForeignKey, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, Enum as SQLEnum, JSON, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -26,7 +26,7 @@ class Workout(Base):
     id = Column(String, primary_key=True, index=True)
     training_plan_id = Column(String, ForeignKey("training_plans.id"))
     created_by = Column(String, ForeignKey("users.id"), nullable=False)
-    athlete_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    athlete_id = Column(String, ForeignKey("users.id"), nullable=False)
 
     # Workout info
     title = Column(String, nullable=False)
@@ -48,7 +48,7 @@ class Workout(Base):
     structure = Column(JSON)
 
     # Completion
-    status = Column(SQLEnum(WorkoutStatus), default=WorkoutStatus.PLANNED, index=True)
+    status = Column(SQLEnum(WorkoutStatus), default=WorkoutStatus.PLANNED)
     completed_at = Column(DateTime)
     activity_id = Column(String, ForeignKey("activities.id"), unique=True)
 
@@ -68,5 +68,14 @@ class Workout(Base):
     activity = relationship("Activity", back_populates="workout")
     comments = relationship("Comment", back_populates="workout")
 
+    __table_args__ = (
+        # Workout list: WHERE athlete_id = ? ORDER BY scheduled_date DESC
+        Index('idx_workouts_athlete_scheduled_date', 'athlete_id', 'scheduled_date'),
+        # Workout list filtered by status: WHERE athlete_id = ? AND status = ? ORDER BY scheduled_date DESC
+        Index('idx_workouts_athlete_status_scheduled_date', 'athlete_id', 'status', 'scheduled_date'),
+        # Delta sync: WHERE athlete_id = ? AND updated_at > ? ORDER BY updated_at, id
+        Index('idx_workouts_athlete_updated_at', 'athlete_id', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Workout {self.title} for {self.athlete_id}>"
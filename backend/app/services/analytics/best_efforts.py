@@ -0,0 +1,172 @@
+"""Best efforts over standard distances from time/distance streams.
+
+Works for any provider with a distance stream. Each activity's efforts are
+kept in ``processed_data['best_efforts']`` and the athlete's records in
+``best_efforts``, updated as activities arrive.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity, ActivityType
+from app.models.best_effort import BestEffort
+
+logger = get_logger(__name__)
+
+# Effort name -> distance in meters
+STANDARD_EFFORTS = {
+    '400m': 400.0,
+    '1k': 1000.0,
+    '5k': 5000.0,
+    '10k': 10000.0,
+    'half_marathon': 21097.5,
+}
+
+# Activity types best efforts are extracted for
+BEST_EFFORT_SPORTS = {ActivityType.RUN}
+
+
+def find_best_efforts(
+    time: np.ndarray,
+    distance: np.ndarray,
+    efforts: Optional[Dict[str, float]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Find the fastest segment covering each standard distance.
+
+    For every sample as a start point, the time the target distance is
+    reached is interpolated from the distance stream in one vectorized
+    pass per effort.
+
+    Args:
+        time: Sample timestamps in seconds
+        distance: Cumulative distance in meters
+        efforts: Effort name -> meters (defaults to STANDARD_EFFORTS)
+
+    Returns:
+        Effort name -> elapsed seconds, distance and start offset
+    """
+    efforts = efforts or STANDARD_EFFORTS
+    time = np.asarray(time, dtype=np.float64)
+    distance = np.maximum.accumulate(np.asarray(distance, dtype=np.float64))
+    if len(time) < 2:
+        return {}
+
+    # Keep the last sample of each stationary run so distance is strictly increasing
+    keep = np.append(np.diff(distance) > 0, True)
+    time, distance = time[keep], distance[keep]
+
+    results = {}
+    for name, meters in efforts.items():
+        # Start points from which the effort can still be completed
+        count = np.searchsorted(distance, distance[-1] - meters, side='right')
+        if count == 0:
+            continue
+
+        end_times = np.interp(distance[:count] + meters, distance, time)
+        elapsed = end_times - time[:count]
+        best = int(np.argmin(elapsed))
+
+        results[name] = {
+            'distance_meters': meters,
+            'elapsed_seconds': round(float(elapsed[best]), 1),
+            'start_offset_seconds': int(time[best] - time[0]),
+        }
+
+    return results
+
+
+def update_records(db: Session, activity: Activity, efforts: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Merge an activity's efforts into the athlete's records (caller commits).
+
+    Returns:
+        Names of efforts where the activity set a new record
+    """
+    if not efforts:
+        return []
+
+    # Sessions don't autoflush; records added earlier in this batch must be visible
+    db.flush()
+    records = {
+        r.effort: r
+        for r in db.query(BestEffort).filter(
+            BestEffort.user_id == activity.user_id,
+            BestEffort.effort.in_(list(efforts))
+        )
+    }
+
+    improved = []
+    for name, effort in efforts.items():
+        record = records.get(name)
+        if record is not None and record.elapsed_seconds <= effort['elapsed_seconds']:
+            continue
+
+        if record is None:
+            record = BestEffort(user_id=activity.user_id, effort=name)
+            db.add(record)
+
+        record.distance_meters = effort['distance_meters']
+        record.elapsed_seconds = effort['elapsed_seconds']
+        record.start_offset_seconds = effort['start_offset_seconds']
+        record.activity_id = activity.id
+        record.achieved_at = activity.start_date
+        improved.append(name)
+
+    return improved
+
+
+def process_best_efforts(db: Session, activity: Activity, streams: Dict[str, np.ndarray]) -> List[str]:
+    """Extract, store and merge an activity's best efforts (caller commits)."""
+    if activity.activity_type not in BEST_EFFORT_SPORTS:
+        return []
+
+    time, distance = streams.get('time'), streams.get('distance')
+    if time is None or distance is None:
+        return []
+
+    efforts = find_best_efforts(time, distance)
+    activity.processed_data = {**(activity.processed_data or {}), 'best_efforts': efforts}
+
+    improved = update_records(db, activity, efforts)
+    if improved:
+        logger.info("best_efforts_improved", user_id=activity.user_id, activity_id=activity.id, efforts=improved)
+    return improved
+
+
+def rebuild_records(db: Session, user_id: str) -> int:
+    """
+    Rebuild an athlete's records from stored per-activity efforts.
+
+    Returns:
+        Number of records written
+    """
+    db.query(BestEffort).filter(BestEffort.user_id == user_id).delete(synchronize_session=False)
+
+    activities = db.query(Activity).filter(
+        Activity.user_id == user_id,
+        Activity.duplicate_of_id.is_(None),
+        Activity.activity_type.in_(BEST_EFFORT_SPORTS)
+    ).order_by(Activity.start_date)
+
+    best: Dict[str, BestEffort] = {}
+    for activity in activities:
+        for name, effort in ((activity.processed_data or {}).get('best_efforts') or {}).items():
+            record = best.get(name)
+            if record is None or effort['elapsed_seconds'] < record.elapsed_seconds:
+                best[name] = BestEffort(
+                    user_id=user_id,
+                    effort=name,
+                    distance_meters=effort['distance_meters'],
+                    elapsed_seconds=effort['elapsed_seconds'],
+                    start_offset_seconds=effort['start_offset_seconds'],
+                    activity_id=activity.id,
+                    achieved_at=activity.start_date
+                )
+
+    db.add_all(best.values())
+    db.commit()
+    return len(best)
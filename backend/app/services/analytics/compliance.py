@@ -0,0 +1,154 @@
+"""Workout compliance: planned step timeline vs. recorded streams."""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.workout import Workout, WorkoutStatus
+from app.services.analytics.compute import compute_executor
+from app.services.analytics.streams import load_streams_bulk, sample_durations
+from app.services.analytics.workout_compiler import (
+    CompiledTimeline,
+    EMPTY_TIMELINE,
+    TARGET_CHANNELS,
+    TARGET_NONE,
+    compile_workout,
+)
+
+logger = get_logger(__name__)
+
+# Channels needed to score any target kind
+SCORING_CHANNELS = ['time', *TARGET_CHANNELS.values()]
+
+# Workouts scored per compute pool call
+SCORING_CHUNK = 50
+
+
+def _round(value: float, digits: int = 3) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def score_compliance(timeline: CompiledTimeline, streams: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """
+    Score how closely an activity followed a workout timeline.
+
+    Samples are assigned to steps by elapsed time; for steps with a target,
+    compliance is the fraction of time spent inside the target range.
+
+    Args:
+        timeline: Compiled workout timeline
+        streams: Activity streams (needs 'time' plus the targeted channels)
+
+    Returns:
+        Overall score, duration ratio and per-step breakdown
+    """
+    n_steps = timeline.step_count
+    time = streams.get('time')
+    if n_steps == 0 or time is None or len(time) == 0:
+        return {'overall': None, 'duration_ratio': None, 'steps': []}
+
+    time = np.asarray(time, dtype=np.float64)
+    time = time - time[0]
+    dt = sample_durations(time)
+    actual = float(time[-1] + dt[-1])
+
+    step = np.searchsorted(timeline.ends, time, side='right')
+    inside = step < n_steps
+    step, dt, sample_idx = step[inside], dt[inside], np.nonzero(inside)[0]
+
+    kinds = timeline.kinds[step]
+    values = np.full(len(step), np.nan)
+    for kind, channel in TARGET_CHANNELS.items():
+        stream = streams.get(channel)
+        if stream is None:
+            continue
+        # a channel shorter than 'time' leaves its trailing samples unmeasured
+        stream = np.asarray(stream, dtype=np.float64)
+        mask = (kinds == kind) & (sample_idx < len(stream))
+        values[mask] = stream[sample_idx[mask]]
+
+    has_value = ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        in_range = has_value & (values >= timeline.lows[step]) & (values <= timeline.highs[step])
+
+    measured = np.bincount(step, weights=dt * has_value, minlength=n_steps)
+    compliant = np.bincount(step, weights=dt * in_range, minlength=n_steps)
+    elapsed = np.bincount(step, weights=dt, minlength=n_steps)
+    value_sum = np.bincount(step, weights=np.where(has_value, values * dt, 0.0), minlength=n_steps)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        step_scores = compliant / measured
+        step_means = value_sum / measured
+
+    targeted = (timeline.kinds != TARGET_NONE) & (measured > 0)
+    overall = compliant[targeted].sum() / measured[targeted].sum() if targeted.any() else np.nan
+
+    planned = timeline.total_duration
+    duration_ratio = min(actual, planned) / max(actual, planned) if max(actual, planned) > 0 else np.nan
+
+    return {
+        'overall': _round(overall),
+        'duration_ratio': _round(duration_ratio),
+        'steps': [
+            {
+                'index': i,
+                'name': timeline.names[i],
+                'start': float(timeline.starts[i]),
+                'end': float(timeline.ends[i]),
+                'target': None if timeline.kinds[i] == TARGET_NONE else {
+                    'channel': TARGET_CHANNELS[int(timeline.kinds[i])],
+                    'min': float(timeline.lows[i]),
+                    'max': float(timeline.highs[i]),
+                },
+                'recorded_seconds': float(elapsed[i]),
+                'average': _round(step_means[i], 2),
+                'compliance': _round(step_scores[i]) if timeline.kinds[i] != TARGET_NONE else None,
+            }
+            for i in range(n_steps)
+        ],
+    }
+
+
+def score_many(pairs: List[Tuple[CompiledTimeline, Dict[str, np.ndarray]]]) -> List[Dict[str, Any]]:
+    """``score_compliance`` over (timeline, streams) pairs, as one compute pool call."""
+    return [score_compliance(timeline, streams) for timeline, streams in pairs]
+
+
+async def score_workouts(db: Session, workouts: List[Workout]) -> Dict[str, Dict[str, Any]]:
+    """
+    Score many completed workouts, loading all linked streams in one query.
+
+    Scoring runs on the compute pool, SCORING_CHUNK workouts per call so a
+    large roster is spread over the workers.
+
+    Returns:
+        Compliance results keyed by workout ID
+    """
+    linked = [w for w in workouts if w.activity_id and w.structure]
+    streams = load_streams_bulk(db, [w.activity_id for w in linked], SCORING_CHANNELS)
+
+    pairs = []
+    for w in linked:
+        try:
+            timeline = compile_workout(w)
+        except ValueError as exc:
+            # an invalid structure scores as empty rather than failing the roster
+            logger.warning("workout_structure_invalid", workout_id=w.id, error=str(exc))
+            timeline = EMPTY_TIMELINE
+        pairs.append((timeline, streams.get(w.activity_id, {})))
+    chunks = await asyncio.gather(*(
+        compute_executor.run(score_many, pairs[offset:offset + SCORING_CHUNK])
+        for offset in range(0, len(pairs), SCORING_CHUNK)
+    ))
+    return {w.id: result for w, result in zip(linked, [r for chunk in chunks for r in chunk])}
+
+
+def completed_workouts_query(db: Session):
+    """Workouts that have a linked activity to score."""
+    return db.query(Workout).filter(
+        Workout.status == WorkoutStatus.COMPLETED,
+        Workout.activity_id.isnot(None)
+    )
@@ -0,0 +1,303 @@
+"""Shared process pool for CPU-bound stream analytics.
+
+Downsampling, compliance scoring and other whole-stream NumPy work would
+stall the event loop if run inside ``async def`` handlers, and threads
+don't help while it holds the GIL. ``compute_executor.run`` sends the work
+to a pool of ``COMPUTE_WORKERS`` processes that import the analytics
+modules once at start-up. The app lifespan calls ``start`` so the workers
+are spawned and warm before the first request, and ``shutdown`` on exit.
+
+Arrays of ``COMPUTE_SHARED_MEMORY_MIN_BYTES`` or more, anywhere in the
+arguments or the result (dicts, lists, tuples and dataclasses are walked),
+travel through ``multiprocessing.shared_memory`` blocks instead of being
+pickled: the caller copies them into a block and the worker maps it
+read-only. Blocks are unlinked by the parent once the call is done, also
+when the caller was cancelled.
+
+With ``COMPUTE_WORKERS=0`` calls run in the event loop's default thread
+pool instead (no pickling; handy for development and tests).
+
+``stats`` reports the queue depth and wait/run times for the health endpoint.
+"""
+
+import asyncio
+import dataclasses
+import importlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Imported by each worker at start-up so the first call doesn't pay for it
+WARM_IMPORTS = (
+    'numpy',
+    'app.db.base',
+    'app.services.analytics.downsample',
+    'app.services.analytics.compliance',
+    'app.services.analytics.metrics',
+    'app.services.analytics.curves',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedArray:
+    """An array placed in a shared memory block."""
+    name: str
+    dtype: str
+    shape: Tuple[int, ...]
+
+
+def _export(value: Any, blocks: List[shared_memory.SharedMemory], min_bytes: int) -> Any:
+    """Copy large arrays in ``value`` into new shared memory blocks."""
+    if isinstance(value, np.ndarray):
+        if value.nbytes < min_bytes or value.dtype.hasobject:
+            return value
+        block = shared_memory.SharedMemory(create=True, size=value.nbytes)
+        blocks.append(block)
+        np.ndarray(value.shape, value.dtype, buffer=block.buf)[...] = value
+        return SharedArray(block.name, value.dtype.str, value.shape)
+    if isinstance(value, dict):
+        return {k: _export(v, blocks, min_bytes) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and not hasattr(value, '_fields'):
+        return type(value)(_export(v, blocks, min_bytes) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.replace(value, **{
+            f.name: _export(getattr(value, f.name), blocks, min_bytes) for f in dataclasses.fields(value) if f.init
+        })
+    return value
+
+
+def _attach(value: Any, blocks: List[shared_memory.SharedMemory], copy: bool) -> Any:
+    """Resolve SharedArray references, as read-only views or as copies."""
+    if isinstance(value, SharedArray):
+        block = shared_memory.SharedMemory(name=value.name)
+        blocks.append(block)
+        array = np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf)
+        if copy:
+            return array.copy()
+        array.flags.writeable = False
+        return array
+    if isinstance(value, dict):
+        return {k: _attach(v, blocks, copy) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and not hasattr(value, '_fields'):
+        return type(value)(_attach(v, blocks, copy) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.replace(value, **{
+            f.name: _attach(getattr(value, f.name), blocks, copy) for f in dataclasses.fields(value) if f.init
+        })
+    return value
+
+
+def _close(blocks: List[shared_memory.SharedMemory], unlink: bool) -> None:
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # A view outlived the call; the mapping goes when it is collected
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _warm_up(modules: Tuple[str, ...]) -> None:
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _invoke(fn: Callable, args: tuple, kwargs: dict, min_bytes: int) -> Tuple[float, float, Any]:
+    """Worker side: map the inputs, run ``fn``, export the result."""
+    started = time.time()
+    inputs: List[shared_memory.SharedMemory] = []
+    outputs: List[shared_memory.SharedMemory] = []
+    try:
+        args, kwargs = _attach((args, kwargs), inputs, copy=False)
+        result = _export(fn(*args, **kwargs), outputs, min_bytes)
+    except BaseException:
+        _close(outputs, unlink=True)
+        raise
+    finally:
+        args = kwargs = None
+        _close(inputs, unlink=False)
+    # The parent unlinks the result blocks after copying them out
+    _close(outputs, unlink=False)
+    return started, time.time(), result
+
+
+def _shared_names(value: Any) -> List[str]:
+    if isinstance(value, SharedArray):
+        return [value.name]
+    if isinstance(value, dict):
+        value = list(value.values())
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        value = [getattr(value, f.name) for f in dataclasses.fields(value)]
+    if isinstance(value, (list, tuple)):
+        return [name for item in value for name in _shared_names(item)]
+    return []
+
+
+def _discard(future: Future) -> None:
+    """Unlink the result blocks of a call nobody is waiting for."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    for name in _shared_names(future.result()[2]):
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        _close([block], unlink=True)
+
+
+class ComputeExecutor:
+    """Process pool with shared-memory array transfer and queue metrics."""
+
+    def __init__(self, workers: int, min_shared_bytes: int, start_method: str):
+        self.workers = workers
+        self.min_shared_bytes = min_shared_bytes
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._max_pending = 0
+        self._counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(self.start_method),
+                        initializer=_warm_up,
+                        initargs=(WARM_IMPORTS,)
+                    )
+                    logger.info("compute_pool_started", workers=self.workers, start_method=self.start_method)
+        return self._pool
+
+    def start(self) -> None:
+        """Create the pool and spawn every worker now instead of on the first calls."""
+        if self.workers <= 0:
+            return
+        pool = self._get_pool()
+        # A worker is spawned per submitted call while none is idle, and
+        # each runs the warm-up imports before taking its call
+        for future in [pool.submit(_warm_up, ()) for _ in range(self.workers)]:
+            future.result()
+
+    def _submitted(self) -> None:
+        with self._lock:
+            self._pending += 1
+            self._max_pending = max(self._max_pending, self._pending)
+            self._counters['submitted'] += 1
+
+    def _finished(self, outcome: str, wait: float = 0.0, run: float = 0.0) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._counters[outcome] += 1
+            self._wait_seconds += wait
+            self._run_seconds += run
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` in a worker process and await the result.
+
+        ``fn`` must be a module-level function (it is pickled by name).
+        """
+        if self.workers <= 0:
+            return await self._run_in_thread(fn, *args, **kwargs)
+
+        blocks: List[shared_memory.SharedMemory] = []
+        submitted_at = time.time()
+        try:
+            payload = _export((args, kwargs), blocks, self.min_shared_bytes)
+            future = self._get_pool().submit(_invoke, fn, payload[0], payload[1], self.min_shared_bytes)
+        except BaseException:
+            _close(blocks, unlink=True)
+            raise
+
+        self._submitted()
+        future.add_done_callback(lambda _: _close(blocks, unlink=True))
+        try:
+            started, finished, result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call already running still finishes; drop its output
+            future.add_done_callback(_discard)
+            self._finished('cancelled')
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool on the next call
+            self._finished('failed')
+            with self._lock:
+                if self._pool is not None and self._pool._broken:
+                    self._pool = None
+            logger.error("compute_pool_broken", function=getattr(fn, '__name__', str(fn)))
+            raise
+        except BaseException:
+            self._finished('failed')
+            raise
+
+        self._finished('completed', wait=max(started - submitted_at, 0.0), run=finished - started)
+        received: List[shared_memory.SharedMemory] = []
+        try:
+            return _attach(result, received, copy=True)
+        finally:
+            _close(received, unlink=True)
+
+    async def _run_in_thread(self, fn: Callable, *args, **kwargs) -> Any:
+        self._submitted()
+        queued_at = time.monotonic()
+        timings = {}
+
+        def call():
+            timings['started'] = time.monotonic()
+            return fn(*args, **kwargs)
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(None, call)
+        except BaseException:
+            self._finished('failed')
+            raise
+        started = timings['started']
+        self._finished('completed', wait=started - queued_at, run=time.monotonic() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and average wait/run times."""
+        with self._lock:
+            finished = self._counters['completed']
+            return {
+                'workers': self.workers,
+                'pending': self._pending,
+                'queued': max(self._pending - self.workers, 0) if self.workers > 0 else self._pending,
+                'max_pending': self._max_pending,
+                **self._counters,
+                'avg_wait_ms': round(1000 * self._wait_seconds / finished, 1) if finished else None,
+                'avg_run_ms': round(1000 * self._run_seconds / finished, 1) if finished else None,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+compute_executor = ComputeExecutor(
+    workers=settings.COMPUTE_WORKERS,
+    min_shared_bytes=settings.COMPUTE_SHARED_MEMORY_MIN_BYTES,
+    start_method=settings.COMPUTE_START_METHOD
+)
@@ -0,0 +1,217 @@
+"""Mean-maximal power and speed curves.
+
+Each activity's curve holds its best average over every duration of
+``DURATION_GRID``; athlete curves are the element-wise maximum of their
+activity curves per sport and period ("all" plus one per calendar year), so a
+new activity is merged in O(grid) without rescanning history. Changing the
+grid invalidates stored curves.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity
+from app.models.activity_curve import ActivityCurve, AthleteCurve
+from app.services.analytics.streams import resample_1hz
+
+logger = get_logger(__name__)
+
+KIND_POWER = 'power'
+KIND_SPEED = 'speed'
+
+PERIOD_ALL = 'all'
+
+# Durations in seconds: every second up to 2min, then coarser steps up to 6h
+DURATION_GRID = np.unique(np.concatenate([
+    np.arange(1, 120),
+    np.arange(120, 600, 5),
+    np.arange(600, 3600, 30),
+    np.arange(3600, 6 * 3600 + 1, 120),
+])).astype(np.int64)
+
+CURVE_DTYPE = '<f4'
+
+
+def best_windows(cumulative: np.ndarray) -> np.ndarray:
+    """
+    Best average rate over each grid duration from a cumulative 1 Hz series.
+
+    Args:
+        cumulative: Running total sampled once per second, starting at 0
+
+    Returns:
+        One value per grid duration that fits in the series
+    """
+    cumulative = np.asarray(cumulative, dtype=np.float64)
+    seconds = len(cumulative) - 1
+    durations = DURATION_GRID[DURATION_GRID <= seconds]
+
+    curve = np.empty(len(durations), dtype=np.float64)
+    for i, d in enumerate(durations):
+        curve[i] = (cumulative[d:] - cumulative[:-d]).max()
+
+    return (curve / durations).astype(CURVE_DTYPE)
+
+
+def mean_max(values_1hz: np.ndarray) -> np.ndarray:
+    """Mean-maximal curve of a 1 Hz channel via prefix sums."""
+    values = np.nan_to_num(np.asarray(values_1hz, dtype=np.float64))
+    return best_windows(np.concatenate(([0.0], np.cumsum(values))))
+
+
+def compute_curves(streams: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Compute an activity's curves from its streams.
+
+    Power gaps count as zero output. Speed uses the cumulative distance stream
+    when present, otherwise integrates velocity.
+
+    Returns:
+        Curves keyed by kind (only kinds the streams support)
+    """
+    time = streams.get('time')
+    if time is None or len(time) < 2:
+        return {}
+
+    time = np.asarray(time, dtype=np.float64)
+    curves = {}
+
+    watts = streams.get('watts')
+    if watts is not None and np.any(watts):
+        curves[KIND_POWER] = mean_max(resample_1hz(time, watts, fill=0.0))
+
+    distance = streams.get('distance')
+    velocity = streams.get('velocity_smooth')
+    if distance is not None and np.any(distance):
+        grid = np.arange(time[0], time[-1] + 1.0)
+        cumulative = np.interp(grid, time, np.asarray(distance, dtype=np.float64))
+        curves[KIND_SPEED] = best_windows(np.concatenate(([0.0], cumulative[1:] - cumulative[0])))
+    elif velocity is not None and np.any(velocity):
+        curves[KIND_SPEED] = mean_max(resample_1hz(time, velocity, fill=0.0))
+
+    return {kind: curve for kind, curve in curves.items() if len(curve)}
+
+
+def encode(curve: np.ndarray) -> bytes:
+    return np.ascontiguousarray(curve, dtype=CURVE_DTYPE).tobytes()
+
+
+def decode(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=CURVE_DTYPE)
+
+
+def merge(envelope: Optional[np.ndarray], curve: np.ndarray) -> np.ndarray:
+    """Element-wise max of two curves of possibly different lengths."""
+    if envelope is None or len(envelope) == 0:
+        return np.asarray(curve, dtype=CURVE_DTYPE)
+
+    length = max(len(envelope), len(curve))
+    merged = np.full(length, np.nan, dtype=CURVE_DTYPE)
+    merged[:len(envelope)] = envelope
+    merged[:len(curve)] = np.fmax(merged[:len(curve)], curve)
+    return merged
+
+
+def save_activity_curves(db: Session, activity_id: str, curves: Dict[str, np.ndarray]) -> None:
+    """Replace an activity's stored curves."""
+    db.query(ActivityCurve).filter(ActivityCurve.activity_id == activity_id).delete(
+        synchronize_session=False
+    )
+    for kind, curve in curves.items():
+        db.add(ActivityCurve(activity_id=activity_id, kind=kind, length=len(curve), data=encode(curve)))
+
+
+def activity_periods(activity: Activity) -> List[str]:
+    return [PERIOD_ALL, str(activity.start_date.year)]
+
+
+def update_athlete_curves(db: Session, activity: Activity, curves: Dict[str, np.ndarray]) -> None:
+    """Merge an activity's curves into the athlete's all-time and season curves."""
+    if not curves:
+        return
+
+    sport = activity.activity_type.value
+    periods = activity_periods(activity)
+    # Sessions don't autoflush; curves added earlier in this batch must be visible
+    db.flush()
+    existing = {
+        (row.kind, row.period): row
+        for row in db.query(AthleteCurve).filter(
+            AthleteCurve.user_id == activity.user_id,
+            AthleteCurve.sport == sport,
+            AthleteCurve.kind.in_(list(curves)),
+            AthleteCurve.period.in_(periods)
+        )
+    }
+
+    for kind, curve in curves.items():
+        for period in periods:
+            row = existing.get((kind, period))
+            if row is None:
+                row = AthleteCurve(
+                    user_id=activity.user_id, sport=sport, kind=kind, period=period, activity_count=0
+                )
+                db.add(row)
+                merged = merge(None, curve)
+            else:
+                merged = merge(decode(row.data), curve)
+
+            row.data = encode(merged)
+            row.length = len(merged)
+            row.activity_count = (row.activity_count or 0) + 1
+
+
+def process_activity_curves(db: Session, activity: Activity, streams: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Compute, store and merge an activity's curves (caller commits)."""
+    curves = compute_curves(streams)
+    save_activity_curves(db, activity.id, curves)
+    update_athlete_curves(db, activity, curves)
+    return curves
+
+
+def rebuild_athlete_curves(db: Session, user_id: str) -> int:
+    """
+    Rebuild an athlete's curves from stored activity curves.
+
+    Needed when activities are deleted or re-processed, since the
+    incremental max cannot go down. Streams are not re-read.
+
+    Returns:
+        Number of athlete curves written
+    """
+    db.query(AthleteCurve).filter(AthleteCurve.user_id == user_id).delete(synchronize_session=False)
+
+    envelopes: Dict[tuple, np.ndarray] = {}
+    counts: Dict[tuple, int] = {}
+    rows = db.query(ActivityCurve, Activity.activity_type, Activity.start_date).join(
+        Activity, Activity.id == ActivityCurve.activity_id
+    ).filter(Activity.user_id == user_id, Activity.duplicate_of_id.is_(None))
+
+    for row, activity_type, start_date in rows:
+        curve = decode(row.data)
+        for period in (PERIOD_ALL, str(start_date.year)):
+            key = (activity_type.value, row.kind, period)
+            envelopes[key] = merge(envelopes.get(key), curve)
+            counts[key] = counts.get(key, 0) + 1
+
+    for (sport, kind, period), curve in envelopes.items():
+        db.add(AthleteCurve(
+            user_id=user_id, sport=sport, kind=kind, period=period,
+            length=len(curve), data=encode(curve), activity_count=counts[(sport, kind, period)]
+        ))
+
+    db.commit()
+    logger.info("athlete_curves_rebuilt", user_id=user_id, curves=len(envelopes))
+    return len(envelopes)
+
+
+def curve_points(curve: np.ndarray) -> List[Dict[str, Any]]:
+    """Serialize a curve as (duration, value) points."""
+    return [
+        {'duration': int(d), 'value': round(float(v), 3)}
+        for d, v in zip(DURATION_GRID[:len(curve)], curve)
+        if not np.isnan(v)
+    ]
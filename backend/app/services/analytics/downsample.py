@@ -0,0 +1,107 @@
+"""Chart downsampling with Largest-Triangle-Three-Buckets (LTTB)."""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Channels never used to pick points (sampled at the chosen indices)
+PASSIVE_CHANNELS = {'time', 'latlng', 'moving'}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps.
+
+    The first and last points are always kept, as are the series minimum
+    and maximum. Bucket averages are computed up front; the per-bucket
+    triangle areas are vectorized, leaving one Python iteration per output
+    point.
+
+    Args:
+        x: Sample positions (increasing)
+        y: Sample values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted sample indices
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    buckets = n_out - 2
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 1 < buckets:
+            cx, cy = avg_x[i + 1], avg_y[i + 1]
+        else:
+            cx, cy = x[n - 1], y[n - 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+
+    # Keep the extremes in place of their bucket's pick
+    for extreme in (int(np.argmin(y)), int(np.argmax(y))):
+        if 0 < extreme < n - 1:
+            bucket = int(np.searchsorted(edges, extreme, side='right')) - 1
+            selected[bucket + 1] = extreme
+
+    return np.unique(selected)
+
+
+def downsample_streams(
+    streams: Dict[str, np.ndarray],
+    points: int,
+    channels: Optional[Iterable[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Downsample channels onto a shared set of sample indices.
+
+    Each value channel picks ``points / channel count`` indices with LTTB;
+    the union is returned for every channel so charts share one x axis.
+
+    Args:
+        streams: Arrays keyed by channel (uses 'time' as x)
+        points: Approximate point budget
+        channels: Channels to return (default: all)
+
+    Returns:
+        Arrays keyed by channel, including 'time'
+    """
+    time = streams.get('time')
+    if time is None:
+        return {}
+
+    names = [c for c in (channels or streams) if c in streams]
+    if 'time' not in names:
+        names.insert(0, 'time')
+
+    length = len(time)
+    if points >= length:
+        return {c: streams[c] for c in names}
+
+    value_channels = [c for c in names if c not in PASSIVE_CHANNELS]
+    budget = max(points // max(len(value_channels), 1), 3)
+
+    if value_channels:
+        indices = np.unique(np.concatenate([
+            lttb_indices(time, streams[c], budget) for c in value_channels
+        ]))
+    else:
+        indices = np.linspace(0, length - 1, points).astype(np.int64)
+
+    return {c: streams[c][indices] for c in names}
@@ -0,0 +1,291 @@
+"""Stream-derived activity metrics.
+
+Everything here works on whole arrays; the only Python loop (elevation
+hysteresis) runs over local extrema, not samples.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity, ActivityType
+from app.models.activity_curve import AthleteCurve
+from app.models.activity_stream import ActivityStream
+from app.services.analytics.curves import DURATION_GRID, KIND_POWER, PERIOD_ALL, decode
+from app.services.analytics.streams import load_streams_bulk, resample_1hz, sample_durations
+
+logger = get_logger(__name__)
+
+# Rolling window for normalized power (seconds)
+NP_WINDOW = 30
+
+# Below this speed a sample counts as stopped (m/s)
+MOVING_SPEED = 0.5
+
+# Altitude changes smaller than this are treated as noise (meters)
+ELEVATION_HYSTERESIS = 3.0
+
+# FTP estimate from the best 20 min power
+FTP_DURATION = 1200
+FTP_FACTOR = 0.95
+
+# Activity columns filled from metrics when the provider left them empty
+BACKFILL_COLUMNS = (
+    'normalized_power', 'moving_time_seconds', 'elevation_gain_meters',
+    'elevation_loss_meters', 'avg_temperature',
+)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over full windows, via prefix sums."""
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return (cumulative[window:] - cumulative[:-window]) / window
+
+
+def normalized_power(watts_1hz: np.ndarray) -> Optional[float]:
+    """Fourth-power mean of the 30 s rolling average of 1 Hz power."""
+    if len(watts_1hz) < NP_WINDOW:
+        return None
+    rolling = rolling_mean(np.nan_to_num(watts_1hz), NP_WINDOW)
+    return float(np.mean(rolling ** 4) ** 0.25)
+
+
+def elevation_changes(altitude: np.ndarray, threshold: float = ELEVATION_HYSTERESIS) -> Dict[str, float]:
+    """
+    Total ascent and descent, ignoring reversals smaller than ``threshold``.
+
+    The series is first reduced to its turning points, then a reversal is
+    only accepted once it exceeds the threshold.
+    """
+    altitude = np.asarray(altitude, dtype=np.float64)
+    altitude = altitude[~np.isnan(altitude)]
+    if len(altitude) < 2:
+        return {'gain': 0.0, 'loss': 0.0}
+
+    diff = np.diff(altitude)
+    moving = np.flatnonzero(diff)
+    if len(moving) == 0:
+        return {'gain': 0.0, 'loss': 0.0}
+
+    turns = moving[np.flatnonzero(np.diff(np.sign(diff[moving]))) + 1]
+    extrema = altitude[np.concatenate(([0], turns, [len(altitude) - 1]))]
+
+    accepted = [extrema[0]]
+    for value in extrema[1:]:
+        last = accepted[-1]
+        if len(accepted) > 1 and (value - last) * (last - accepted[-2]) > 0:
+            accepted[-1] = value  # same direction: extend the current climb/descent
+        elif abs(value - last) >= threshold:
+            accepted.append(value)
+
+    steps = np.diff(accepted)
+    return {'gain': float(steps[steps > 0].sum()), 'loss': float(-steps[steps < 0].sum())}
+
+
+def _weighted_mean(values: np.ndarray, weights: np.ndarray) -> Optional[float]:
+    total = weights.sum()
+    return float((values * weights).sum() / total) if total > 0 else None
+
+
+def _moving_mask(streams: Dict[str, np.ndarray], time: np.ndarray) -> np.ndarray:
+    moving = streams.get('moving')
+    if moving is not None:
+        return np.asarray(moving, dtype=bool)
+
+    velocity = streams.get('velocity_smooth')
+    if velocity is not None:
+        return np.asarray(velocity, dtype=np.float64) >= MOVING_SPEED
+
+    distance = streams.get('distance')
+    if distance is not None:
+        speed = np.gradient(np.asarray(distance, dtype=np.float64), time) if len(time) > 1 else np.zeros(len(time))
+        return speed >= MOVING_SPEED
+
+    return np.ones(len(time), dtype=bool)
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def compute_metrics(streams: Dict[str, np.ndarray], ftp: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Derive summary metrics from an activity's streams.
+
+    Args:
+        streams: Arrays keyed by channel (needs 'time')
+        ftp: Functional threshold power for the intensity factor
+
+    Returns:
+        Metrics dict; values the streams can't support are None
+    """
+    time = streams.get('time')
+    if time is None or len(time) < 2:
+        return {}
+
+    time = np.asarray(time, dtype=np.float64)
+    dt = sample_durations(time)
+    moving = _moving_mask(streams, time)
+    moving_dt = dt * moving
+
+    metrics: Dict[str, Any] = {
+        'normalized_power': None,
+        'intensity_factor': None,
+        'variability_index': None,
+        'efficiency_factor': None,
+        'aerobic_decoupling': None,
+        'moving_time_seconds': int(round(moving_dt.sum())),
+        'elevation_gain_meters': None,
+        'elevation_loss_meters': None,
+        'avg_temperature': None,
+    }
+
+    watts = streams.get('watts')
+    heartrate = streams.get('heartrate')
+    velocity = streams.get('velocity_smooth')
+
+    if watts is not None and np.any(watts):
+        watts = np.asarray(watts, dtype=np.float64)
+        np_value = normalized_power(resample_1hz(time, watts, fill=0.0))
+        avg_power = _weighted_mean(watts, dt)
+        metrics['normalized_power'] = np_value
+        if np_value and avg_power:
+            metrics['variability_index'] = np_value / avg_power
+        if np_value and ftp:
+            metrics['intensity_factor'] = np_value / ftp
+        output = watts
+    elif velocity is not None and np.any(velocity):
+        output = np.asarray(velocity, dtype=np.float64)
+    else:
+        output = None
+
+    if output is not None and heartrate is not None and np.any(heartrate):
+        heartrate = np.asarray(heartrate, dtype=np.float64)
+        weights = moving_dt * (heartrate > 0)
+        avg_hr = _weighted_mean(heartrate, weights)
+        if avg_hr:
+            numerator = metrics['normalized_power'] or _weighted_mean(output, weights)
+            metrics['efficiency_factor'] = numerator / avg_hr if numerator else None
+
+        # Pa:HR: output/HR ratio of the first vs. second half of moving time
+        elapsed = np.cumsum(weights)
+        first = elapsed <= elapsed[-1] / 2.0
+        ratios = []
+        for half in (first, ~first):
+            hr = _weighted_mean(heartrate[half], weights[half])
+            out = _weighted_mean(output[half], weights[half])
+            ratios.append(out / hr if hr and out else None)
+        if all(ratios):
+            metrics['aerobic_decoupling'] = (ratios[0] - ratios[1]) / ratios[0] * 100.0
+
+    altitude = streams.get('altitude')
+    if altitude is not None and len(altitude) > 1:
+        changes = elevation_changes(altitude)
+        metrics['elevation_gain_meters'] = changes['gain']
+        metrics['elevation_loss_meters'] = changes['loss']
+
+    temp = streams.get('temp')
+    if temp is not None and len(temp):
+        metrics['avg_temperature'] = _weighted_mean(np.asarray(temp, dtype=np.float64), dt)
+
+    digits = {'intensity_factor': 3, 'variability_index': 3, 'efficiency_factor': 3}
+    return {
+        key: _round(value, digits.get(key, 1)) if isinstance(value, float) else value
+        for key, value in metrics.items()
+    }
+
+
+def estimate_ftp(db: Session, user_id: str) -> Optional[float]:
+    """FTP estimate from the athlete's all-time 20 min ride power."""
+    curve = db.query(AthleteCurve).filter(
+        AthleteCurve.user_id == user_id,
+        AthleteCurve.sport == ActivityType.RIDE.value,
+        AthleteCurve.kind == KIND_POWER,
+        AthleteCurve.period == PERIOD_ALL
+    ).first()
+    if curve is None:
+        return None
+
+    index = int(np.searchsorted(DURATION_GRID, FTP_DURATION))
+    values = decode(curve.data)
+    if index >= len(values) or np.isnan(values[index]):
+        return None
+    return float(values[index]) * FTP_FACTOR
+
+
+def apply_metrics(activity: Activity, metrics: Dict[str, Any]) -> None:
+    """
+    Store metrics in processed_data and fill empty Activity columns.
+
+    Columns filled here are listed in ``processed_data['filled_columns']``
+    and overwritten on the next run, so a reprocess with a new metrics
+    version replaces its own values; provider values are left alone.
+    """
+    processed = activity.processed_data or {}
+    owned = set(processed.get('filled_columns') or ())
+    filled = []
+    for column in BACKFILL_COLUMNS:
+        if column in owned or getattr(activity, column) is None:
+            setattr(activity, column, metrics.get(column))
+            if metrics.get(column) is not None:
+                filled.append(column)
+    activity.processed_data = {**processed, 'metrics': metrics, 'filled_columns': filled}
+
+
+def process_activity_metrics(
+    db: Session,
+    activity: Activity,
+    streams: Dict[str, np.ndarray],
+    ftp: Optional[float] = None
+) -> Dict[str, Any]:
+    """Compute and apply an activity's metrics (caller commits)."""
+    if ftp is None and streams.get('watts') is not None:
+        ftp = estimate_ftp(db, activity.user_id)
+
+    metrics = compute_metrics(streams, ftp=ftp)
+    if metrics:
+        apply_metrics(activity, metrics)
+    return metrics
+
+
+def backfill_metrics(db: Session, user_id: Optional[str] = None, batch_size: int = 100) -> int:
+    """
+    Compute metrics for stored activities that have streams.
+
+    Streams are loaded one batch at a time with a single query per batch.
+
+    Returns:
+        Number of activities updated
+    """
+    query = db.query(Activity).filter(
+        Activity.id.in_(db.query(ActivityStream.activity_id).distinct())
+    ).order_by(Activity.id)
+    if user_id:
+        query = query.filter(Activity.user_id == user_id)
+
+    ftp_cache: Dict[str, Optional[float]] = {}
+    updated = 0
+    last_id = None
+
+    while True:
+        batch_query = query.filter(Activity.id > last_id) if last_id else query
+        batch = batch_query.limit(batch_size).all()
+        if not batch:
+            break
+
+        streams = load_streams_bulk(db, [a.id for a in batch])
+        for activity in batch:
+            if activity.user_id not in ftp_cache:
+                ftp_cache[activity.user_id] = estimate_ftp(db, activity.user_id)
+            metrics = compute_metrics(streams.get(activity.id, {}), ftp=ftp_cache[activity.user_id])
+            if metrics:
+                apply_metrics(activity, metrics)
+                updated += 1
+
+        db.commit()
+        last_id = batch[-1].id
+        logger.info("metrics_backfill_progress", updated=updated)
+
+    return updated
@@ -0,0 +1,300 @@
+"""Versioned per-activity processing pipeline.
+
+Everything derived from an activity's streams (curves, best efforts,
+metrics, zones, route) is a ``Stage`` with a ``version`` and the stream
+channels it reads. Running a stage records its version in
+``processed_data['stages']``, so when an algorithm changes, bumping that
+stage's version and running
+
+    python -m app.services.analytics.pipeline            # every stale stage
+    python -m app.services.analytics.pipeline --stage curves
+
+reprocesses only the activities whose recorded version differs, loading
+only that stage's channels. Stages run in registration order: metrics
+estimate FTP from the athlete curves, so curves come first.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.activity import Activity
+from app.models.activity_stream import ActivityStream
+from app.models.athlete_threshold import ThresholdMetric
+from app.services.analytics.best_efforts import process_best_efforts, rebuild_records
+from app.services.analytics.curves import process_activity_curves, rebuild_athlete_curves
+from app.services.analytics.metrics import process_activity_metrics
+from app.services.analytics.routes import process_activity_route
+from app.services.analytics.streams import load_streams_bulk
+from app.services.analytics.zones import process_activity_zones
+from app.services.route_thumbnails import submit_thumbnails
+from app.services.threshold_service import ThresholdHistory, load_history
+
+logger = get_logger(__name__)
+
+Streams = Dict[str, np.ndarray]
+
+
+class StageContext:
+    """Per-run state shared by stages (threshold histories, loaded once per athlete)."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._histories: Dict[str, ThresholdHistory] = {}
+
+    def history(self, user_id: str) -> ThresholdHistory:
+        if user_id not in self._histories:
+            self._histories[user_id] = load_history(self.db, user_id)
+        return self._histories[user_id]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One processing step.
+
+    ``run`` writes the stage's output for one activity (caller commits).
+    ``rebuild``, if set, recomputes per-athlete aggregates after a bulk
+    reprocess, for stages that merge into them incrementally.
+    """
+    name: str
+    version: int
+    inputs: Tuple[str, ...]
+    run: Callable[[Session, Activity, Streams, StageContext], Any]
+    rebuild: Optional[Callable[[Session, str], Any]] = None
+
+
+STAGES: Dict[str, Stage] = {}
+
+
+def register(stage: Stage) -> Stage:
+    """Add a stage after the existing ones, or replace one with the same name."""
+    STAGES[stage.name] = stage
+    return stage
+
+
+def _curves(db: Session, activity: Activity, streams: Streams, context: StageContext) -> Any:
+    return process_activity_curves(db, activity, streams)
+
+
+def _best_efforts(db: Session, activity: Activity, streams: Streams, context: StageContext) -> Any:
+    return process_best_efforts(db, activity, streams)
+
+
+def _metrics(db: Session, activity: Activity, streams: Streams, context: StageContext) -> Any:
+    ftp = context.history(activity.user_id).at(ThresholdMetric.FTP, activity.start_date)
+    return process_activity_metrics(db, activity, streams, ftp=ftp)
+
+
+def _zones(db: Session, activity: Activity, streams: Streams, context: StageContext) -> Any:
+    return process_activity_zones(db, activity, streams, context.history(activity.user_id))
+
+
+def _route(db: Session, activity: Activity, streams: Streams, context: StageContext) -> Any:
+    return process_activity_route(db, activity, streams)
+
+
+register(Stage('curves', 1, ('time', 'watts', 'distance', 'velocity_smooth'), _curves, rebuild=rebuild_athlete_curves))
+register(Stage('best_efforts', 1, ('time', 'distance'), _best_efforts, rebuild=rebuild_records))
+register(Stage(
+    'metrics', 1, ('time', 'moving', 'distance', 'velocity_smooth', 'watts', 'heartrate', 'altitude', 'temp'),
+    _metrics
+))
+register(Stage('zones', 1, ('time', 'watts', 'heartrate', 'velocity_smooth'), _zones))
+register(Stage('route', 1, ('latlng',), _route))
+
+
+def _select(names: Optional[Iterable[str]]) -> List[Stage]:
+    if names is None:
+        return list(STAGES.values())
+    names = set(names)
+    unknown = names - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+    return [stage for stage in STAGES.values() if stage.name in names]
+
+
+def recorded_versions(activity: Activity) -> Dict[str, int]:
+    """Stage name -> version that last processed the activity."""
+    return dict((activity.processed_data or {}).get('stages') or {})
+
+
+def stale_stages(activity: Activity, stages: Optional[List[Stage]] = None) -> List[Stage]:
+    """Stages whose current version has not processed the activity."""
+    recorded = recorded_versions(activity)
+    return [stage for stage in (stages or list(STAGES.values())) if recorded.get(stage.name) != stage.version]
+
+
+def process_activity(
+    db: Session,
+    activity: Activity,
+    streams: Streams,
+    context: Optional[StageContext] = None,
+    stages: Optional[List[Stage]] = None
+) -> Dict[str, Any]:
+    """
+    Run stages over an activity's streams and record their versions (caller commits).
+
+    Returns:
+        Each stage's result by name
+    """
+    context = context or StageContext(db)
+    stages = stages or list(STAGES.values())
+    results = {stage.name: stage.run(db, activity, streams, context) for stage in stages}
+
+    # Stages replace processed_data, so read it back after they ran
+    recorded = {**recorded_versions(activity), **{stage.name: stage.version for stage in stages}}
+    activity.processed_data = {**(activity.processed_data or {}), 'stages': recorded}
+    return results
+
+
+def reprocess(
+    db: Session,
+    stage_names: Optional[Iterable[str]] = None,
+    user_id: Optional[str] = None,
+    batch_size: int = 100,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    activity_ids: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Re-run stale stages over stored activities, one batch per commit.
+
+    Only the stages an activity is behind on run, and streams are loaded
+    once per batch with just their channels. Athletes' curves and records
+    are rebuilt afterwards, and thumbnails of routes whose shape changed are
+    re-rendered in the background. ``progress`` gets the counters after every batch.
+    ``activity_ids`` limits the run to those activities.
+
+    Returns:
+        Summary with scanned/processed counts, runs per stage, seconds and rate
+    """
+    selected = _select(stage_names)
+    query = db.query(Activity).filter(
+        Activity.duplicate_of_id.is_(None),
+        Activity.id.in_(db.query(ActivityStream.activity_id).distinct())
+    )
+    if user_id:
+        query = query.filter(Activity.user_id == user_id)
+    if activity_ids is not None:
+        query = query.filter(Activity.id.in_(list(activity_ids)))
+    total = query.count()
+
+    context = StageContext(db)
+    runs = {stage.name: 0 for stage in selected}
+    rebuild_users: Dict[Stage, Set[str]] = {}
+    summary: Dict[str, Any] = {
+        'total': total, 'scanned': 0, 'processed': 0, 'stages': runs, 'seconds': 0.0, 'rate': None
+    }
+    started = time.monotonic()
+    last_id = None
+
+    while True:
+        batch_query = query.filter(Activity.id > last_id) if last_id else query
+        batch = batch_query.order_by(Activity.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        pending = [(activity, stale_stages(activity, selected)) for activity in batch]
+        pending = [(activity, stages) for activity, stages in pending if stages]
+        channels = sorted({channel for _, stages in pending for stage in stages for channel in stage.inputs})
+        streams = load_streams_bulk(db, [activity.id for activity, _ in pending], channels)
+
+        rerouted = []
+        for activity, stages in pending:
+            results = process_activity(db, activity, streams.get(activity.id, {}), context, stages)
+            # A changed summary polyline drops the thumbnail
+            route = results.get('route')
+            if route is not None and route.thumbnail_key is None:
+                rerouted.append(activity.id)
+            for stage in stages:
+                runs[stage.name] += 1
+                if stage.rebuild is not None:
+                    rebuild_users.setdefault(stage, set()).add(activity.user_id)
+        db.commit()
+        submit_thumbnails(rerouted)
+
+        elapsed = time.monotonic() - started
+        summary['scanned'] += len(batch)
+        summary['processed'] += len(pending)
+        summary['seconds'] = round(elapsed, 1)
+        summary['rate'] = round(summary['processed'] / elapsed, 1) if elapsed else None
+        logger.info("pipeline_progress", **{k: v for k, v in summary.items() if k != 'stages'})
+        if progress:
+            progress(summary)
+
+    for stage, users in rebuild_users.items():
+        for athlete_id in sorted(users):
+            stage.rebuild(db, athlete_id)
+
+    summary['seconds'] = round(time.monotonic() - started, 1)
+    logger.info("pipeline_reprocessed", **summary)
+    return summary
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _reprocess_in_background(
+    stage_names: Optional[List[str]],
+    user_id: Optional[str],
+    activity_ids: Optional[List[str]]
+) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        return reprocess(db, stage_names, user_id=user_id, activity_ids=activity_ids)
+    except Exception as e:
+        logger.error("pipeline_reprocess_failed", stages=stage_names, error=str(e))
+        db.rollback()
+        return None
+    finally:
+        db.close()
+
+
+def submit_reprocess(
+    stage_names: Optional[Iterable[str]] = None,
+    user_id: Optional[str] = None,
+    activity_ids: Optional[Iterable[str]] = None
+) -> Future:
+    """Queue a bulk reprocess; jobs run one at a time in a background thread."""
+    global _executor
+    stage_names = [stage.name for stage in _select(stage_names)]
+    activity_ids = None if activity_ids is None else list(activity_ids)
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-reprocess")
+    return _executor.submit(_reprocess_in_background, stage_names, user_id, activity_ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reprocess activities whose stage versions are out of date.")
+    parser.add_argument('--stage', action='append', choices=list(STAGES), help="Only these stages (repeatable)")
+    parser.add_argument('--user', help="Only this athlete's activities")
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    def report(summary: Dict[str, Any]) -> None:
+        print(f"{summary['scanned']:,}/{summary['total']:,} scanned, {summary['processed']:,} processed, "
+              f"{summary['rate'] or 0:.1f} activities/s")
+
+    db = SessionLocal()
+    try:
+        summary = reprocess(db, args.stage, user_id=args.user, batch_size=args.batch_size, progress=report)
+    finally:
+        db.close()
+    for name, count in summary['stages'].items():
+        print(f"{name}: {count:,}")
+
+
+if __name__ == '__main__':
+    main()
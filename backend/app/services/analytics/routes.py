@@ -0,0 +1,165 @@
+"""Route simplification and Google polyline encoding."""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.activity import Activity
+from app.models.activity_route import ActivityRoute
+
+# Douglas-Peucker tolerance (meters) per stored zoom level
+ROUTE_TOLERANCES = {
+    'summary': 25.0,
+    'detail': 4.0,
+}
+
+POLYLINE_PRECISION = 5
+
+_METERS_PER_DEGREE_LAT = 110540.0
+_METERS_PER_DEGREE_LNG = 111320.0
+
+
+def valid_points(latlng: np.ndarray) -> np.ndarray:
+    """Drop missing fixes (NaN or 0,0)."""
+    latlng = np.asarray(latlng, dtype=np.float64).reshape(-1, 2)
+    keep = np.isfinite(latlng).all(axis=1) & np.any(latlng != 0, axis=1)
+    return latlng[keep]
+
+
+def project(latlng: np.ndarray) -> np.ndarray:
+    """Equirectangular projection to meters around the route's mean latitude."""
+    cos_lat = np.cos(np.radians(latlng[:, 0].mean()))
+    return np.column_stack([
+        latlng[:, 1] * _METERS_PER_DEGREE_LNG * cos_lat,
+        latlng[:, 0] * _METERS_PER_DEGREE_LAT,
+    ])
+
+
+def dp_importance(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker split distance of each point (0 when never kept).
+
+    A point's value is capped by its parent split, so ``importance > t``
+    gives exactly the Douglas-Peucker result for any ``t >= tolerance``;
+    one pass serves every zoom level. Distances within a segment are
+    computed as one array operation.
+    """
+    n = len(xy)
+    importance = np.zeros(n)
+    if n == 0:
+        return importance
+    importance[0] = importance[-1] = np.inf
+
+    stack = [(0, n - 1, np.inf)]
+    while stack:
+        start, end, cap = stack.pop()
+        if end - start < 2:
+            continue
+
+        a, b = xy[start], xy[end]
+        points = xy[start + 1:end]
+        ab = b - a
+        length = np.hypot(*ab)
+        if length > 0:
+            distances = np.abs(ab[0] * (points[:, 1] - a[1]) - ab[1] * (points[:, 0] - a[0])) / length
+        else:
+            # Closed loop: distance from the shared endpoint
+            distances = np.hypot(points[:, 0] - a[0], points[:, 1] - a[1])
+
+        i = int(np.argmax(distances))
+        if distances[i] <= tolerance:
+            continue
+
+        split = start + 1 + i
+        importance[split] = min(distances[i], cap)
+        stack.append((start, split, importance[split]))
+        stack.append((split, end, importance[split]))
+
+    return importance
+
+
+def simplify(latlng: np.ndarray, tolerances: Dict[str, float]) -> Dict[str, np.ndarray]:
+    """Simplify a track at several tolerances (meters) in one pass."""
+    if len(latlng) < 3:
+        return {name: latlng for name in tolerances}
+
+    importance = dp_importance(project(latlng), min(tolerances.values()))
+    return {name: latlng[importance > tolerance] for name, tolerance in tolerances.items()}
+
+
+def encode_polyline(latlng: np.ndarray, precision: int = POLYLINE_PRECISION) -> str:
+    """
+    Encode points with Google's polyline algorithm.
+
+    Each zig-zagged delta is split into up to seven 5-bit chunks as array
+    columns; the characters are the masked, flattened matrix.
+    """
+    if len(latlng) == 0:
+        return ''
+
+    scaled = np.rint(np.asarray(latlng, dtype=np.float64) * 10 ** precision).astype(np.int64)
+    deltas = np.diff(scaled, axis=0, prepend=0).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+
+    shifts = np.arange(7) * 5
+    chunks = (values[:, None] >> shifts) & 0x1f
+    remaining = values[:, None] >> (shifts + 5)
+    present = np.concatenate([
+        np.ones((len(values), 1), dtype=bool), (values[:, None] >> shifts[1:]) > 0
+    ], axis=1)
+    chars = chunks + 63 + np.where(remaining > 0, 0x20, 0)
+
+    return chars[present].astype(np.uint8).tobytes().decode('ascii')
+
+
+def decode_polyline(encoded: str, precision: int = POLYLINE_PRECISION) -> List[List[float]]:
+    """Decode a polyline to [lat, lng] pairs."""
+    values, value, shift = [], 0, 0
+    for byte in encoded.encode('ascii'):
+        chunk = byte - 63
+        value |= (chunk & 0x1f) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+
+    coords = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return coords.tolist()
+
+
+def build_route(latlng: np.ndarray) -> Optional[Dict[str, object]]:
+    """Simplified polylines and bounds for a latlng stream (None without a usable track)."""
+    points = valid_points(latlng)
+    if len(points) < 2:
+        return None
+
+    simplified = simplify(points, ROUTE_TOLERANCES)
+    return {
+        'summary_polyline': encode_polyline(simplified['summary']),
+        'detail_polyline': encode_polyline(simplified['detail']),
+        'point_count': len(points),
+        'bounds': [
+            float(points[:, 0].min()), float(points[:, 1].min()),
+            float(points[:, 0].max()), float(points[:, 1].max()),
+        ],
+    }
+
+
+def process_activity_route(db: Session, activity: Activity, streams: Dict[str, np.ndarray]) -> Optional[ActivityRoute]:
+    """Store an activity's simplified route (caller commits)."""
+    latlng = streams.get('latlng')
+    route = build_route(latlng) if latlng is not None else None
+    if route is None:
+        return None
+
+    row = db.get(ActivityRoute, activity.id)
+    if row is None:
+        row = ActivityRoute(activity_id=activity.id)
+        db.add(row)
+    elif row.summary_polyline != route['summary_polyline']:
+        row.thumbnail_key = None
+
+    for field, value in route.items():
+        setattr(row, field, value)
+    return row
@@ -0,0 +1,130 @@
+"""Binary typed-array encoding of activity streams.
+
+Layout (all integers little-endian)::
+
+    0   4 bytes   magic b"TLS1"
+    4   uint32    header length H
+    8   H bytes   UTF-8 JSON header:
+                  {"points": n, "channels": [{"name": "heartrate", "type": "int16",
+                   "components": 1, "offset": 64, "length": n}, ...]}
+    ... each channel's samples at its byte ``offset``, 8-byte aligned
+
+so a browser can wrap each channel with
+``new Int16Array(buffer, offset, length * components)`` without parsing.
+"""
+
+import json
+import struct
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+MEDIA_TYPE = "application/vnd.trainlytics.streams"
+
+MAGIC = b"TLS1"
+
+ALIGNMENT = 8
+
+# NumPy dtype -> JavaScript typed array element type
+TYPED_ARRAY_TYPES = {
+    '<f4': 'float32',
+    '<f8': 'float64',
+    '<i4': 'int32',
+    '<i2': 'int16',
+    '|u1': 'uint8',
+    '|i1': 'int8',
+    '<u2': 'uint16',
+    '<u4': 'uint32',
+}
+
+_PREFIX = struct.Struct('<4sI')
+
+_ZEROS = bytes(ALIGNMENT)
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def _little_endian(array: np.ndarray) -> np.ndarray:
+    dtype = array.dtype.newbyteorder('<') if array.dtype.byteorder == '>' else array.dtype
+    return np.ascontiguousarray(array, dtype=dtype)
+
+
+def encode_stream_parts(streams: Dict[str, np.ndarray]) -> List[Union[bytes, memoryview]]:
+    """
+    Encode channels into the binary layout, as the buffers to send in order.
+
+    Arrays loaded from the stream store are already contiguous little-endian,
+    so each channel is a memoryview over its array rather than a copy.
+    """
+    arrays: List[Tuple[str, np.ndarray]] = []
+    for name, array in streams.items():
+        array = _little_endian(array)
+        if array.dtype.str not in TYPED_ARRAY_TYPES:
+            array = array.astype('<f8')
+        arrays.append((name, array))
+
+    def header_for(offsets: List[int]) -> bytes:
+        return json.dumps({
+            'points': len(arrays[0][1]) if arrays else 0,
+            'channels': [
+                {
+                    'name': name,
+                    'type': TYPED_ARRAY_TYPES[array.dtype.str],
+                    'components': array.shape[1] if array.ndim == 2 else 1,
+                    'offset': offset,
+                    'length': array.shape[0],
+                }
+                for (name, array), offset in zip(arrays, offsets)
+            ],
+        }, separators=(',', ':')).encode()
+
+    # Offsets depend on the header length, which depends on the offsets' digits:
+    # lay out with placeholders, then again with the real offsets until stable.
+    offsets = [0] * len(arrays)
+    while True:
+        header = header_for(offsets)
+        position = _PREFIX.size + len(header)
+        new_offsets = []
+        for _, array in arrays:
+            position += _padding(position)
+            new_offsets.append(position)
+            position += array.nbytes
+        if new_offsets == offsets:
+            break
+        offsets = new_offsets
+
+    parts: List[Union[bytes, memoryview]] = [_PREFIX.pack(MAGIC, len(header)), header]
+    position = _PREFIX.size + len(header)
+    for (_, array), offset in zip(arrays, offsets):
+        if offset > position:
+            parts.append(_ZEROS[:offset - position])
+        parts.append(memoryview(array).cast('B'))
+        position = offset + array.nbytes
+
+    return parts
+
+
+def encode_streams(streams: Dict[str, np.ndarray]) -> bytes:
+    """Encode channels into the binary layout as one contiguous body."""
+    return b''.join(encode_stream_parts(streams))
+
+
+def decode_streams(body: bytes) -> Dict[str, np.ndarray]:
+    """Decode the binary layout (reference implementation of the client side)."""
+    magic, header_length = _PREFIX.unpack_from(body)
+    if magic != MAGIC:
+        raise ValueError("Not a stream payload")
+
+    header = json.loads(bytes(body[_PREFIX.size:_PREFIX.size + header_length]))
+    types = {v: k for k, v in TYPED_ARRAY_TYPES.items()}
+
+    streams = {}
+    for channel in header['channels']:
+        count = channel['length'] * channel['components']
+        array = np.frombuffer(body, dtype=types[channel['type']], count=count, offset=channel['offset'])
+        if channel['components'] > 1:
+            array = array.reshape(channel['length'], channel['components'])
+        streams[channel['name']] = array
+    return streams
@@ -0,0 +1,283 @@
+"""Activity stream normalization and storage.
+
+Streams are kept as packed little-endian NumPy arrays, one row per channel,
+so analytics load them with ``np.frombuffer`` instead of parsing JSON lists.
+Channel names follow Strava's stream keys.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.logging import get_logger
+from app.models.activity_stream import ActivityStream
+from app.models.connected_account import Provider
+from app.services.analytics.compute import compute_executor
+from app.services.analytics.downsample import downsample_streams
+
+logger = get_logger(__name__)
+
+# Providers that expose per-activity streams
+STREAM_PROVIDERS = {Provider.STRAVA, Provider.POLAR, Provider.COROS}
+
+# Storage dtype per channel
+CHANNEL_DTYPES = {
+    'time': '<i4',             # seconds since start
+    'distance': '<f4',         # meters, cumulative
+    'latlng': '<f8',           # degrees, (n, 2)
+    'altitude': '<f4',         # meters
+    'velocity_smooth': '<f4',  # m/s
+    'heartrate': '<i2',        # bpm
+    'cadence': '<i2',          # rpm / spm
+    'watts': '<i2',            # W
+    'temp': '<i2',             # degrees C
+    'moving': '|u1',           # boolean
+    'grade_smooth': '<f4',     # percent
+}
+
+# Chart resolutions kept in the cache (point budgets)
+CACHED_RESOLUTIONS = (500, 2000)
+
+CHART_CACHE_TTL = 24 * 3600
+
+# Polar AccessLink sample-type codes
+POLAR_SAMPLE_TYPES = {
+    '0': 'heartrate',
+    '1': 'velocity_smooth',  # km/h, converted below
+    '2': 'cadence',
+    '3': 'altitude',
+    '4': 'watts',
+    '10': 'distance',
+}
+
+
+def to_array(channel: str, values: Iterable[Any]) -> np.ndarray:
+    """Convert a raw value list to the channel's storage dtype (missing values become 0)."""
+    dtype = np.dtype(CHANNEL_DTYPES.get(channel, '<f4'))
+    array = np.asarray(values, dtype=np.float64)
+
+    if dtype.kind in 'iu':
+        array = np.nan_to_num(array, nan=0.0)
+        array = np.rint(array)
+
+    return np.ascontiguousarray(array, dtype=dtype)
+
+
+def _from_strava(payload: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    streams = {}
+    for channel, stream in payload.items():
+        data = stream.get('data') if isinstance(stream, dict) else stream
+        if channel in CHANNEL_DTYPES and data:
+            streams[channel] = to_array(channel, data)
+    return streams
+
+
+def _from_polar(payload: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    streams = {}
+    length = 0
+
+    for sample in payload.get('samples', []):
+        channel = POLAR_SAMPLE_TYPES.get(str(sample.get('sample-type')))
+        if channel is None or not sample.get('data'):
+            continue
+
+        rate = sample.get('recording-rate') or 1
+        values = [float(v) if v not in ('', 'NaN') else np.nan for v in sample['data'].split(',')]
+        array = np.asarray(values, dtype=np.float64)
+        if rate > 1:
+            array = np.repeat(array, rate)
+        if channel == 'velocity_smooth':
+            array = array / 3.6
+
+        streams[channel] = to_array(channel, array)
+        length = max(length, len(array))
+
+    if streams:
+        streams['time'] = np.arange(length, dtype=CHANNEL_DTYPES['time'])
+        for channel, array in streams.items():
+            if len(array) < length:
+                streams[channel] = np.pad(array, (0, length - len(array)), mode='edge')
+
+    return streams
+
+
+def normalize_streams(provider: str, payload: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Convert a provider stream payload to typed arrays.
+
+    Args:
+        provider: Provider name (case-insensitive)
+        payload: Response of the connector's get_activity_streams
+
+    Returns:
+        Arrays keyed by channel name
+    """
+    if not payload:
+        return {}
+
+    if provider.lower() == 'polar':
+        return _from_polar(payload)
+
+    # Strava key_by_type format; Coros files use the same channel keys
+    return _from_strava(payload)
+
+
+def save_streams(db: Session, activity_id: str, streams: Dict[str, np.ndarray]) -> None:
+    """Replace an activity's stored streams."""
+    invalidate_chart_streams(activity_id)
+    db.query(ActivityStream).filter(ActivityStream.activity_id == activity_id).delete(
+        synchronize_session=False
+    )
+
+    for channel, array in streams.items():
+        array = np.ascontiguousarray(array, dtype=CHANNEL_DTYPES.get(channel, '<f4'))
+        db.add(ActivityStream(
+            activity_id=activity_id,
+            channel=channel,
+            dtype=array.dtype.str,
+            components=array.shape[1] if array.ndim == 2 else 1,
+            length=array.shape[0],
+            data=array.tobytes()
+        ))
+
+
+def _decode(row: ActivityStream) -> np.ndarray:
+    array = np.frombuffer(row.data, dtype=np.dtype(row.dtype))
+    if row.components > 1:
+        array = array.reshape(row.length, row.components)
+    return array
+
+
+def load_streams(
+    db: Session,
+    activity_id: str,
+    channels: Optional[List[str]] = None
+) -> Dict[str, np.ndarray]:
+    """Load an activity's streams as read-only arrays (no copy)."""
+    return load_streams_bulk(db, [activity_id], channels).get(activity_id, {})
+
+
+def load_streams_bulk(
+    db: Session,
+    activity_ids: List[str],
+    channels: Optional[List[str]] = None
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """Load streams for many activities in one query."""
+    if not activity_ids:
+        return {}
+
+    query = db.query(ActivityStream).filter(ActivityStream.activity_id.in_(activity_ids))
+    if channels:
+        query = query.filter(ActivityStream.channel.in_(channels))
+
+    result: Dict[str, Dict[str, np.ndarray]] = {}
+    for row in query:
+        result.setdefault(row.activity_id, {})[row.channel] = _decode(row)
+    return result
+
+
+def sample_durations(time: np.ndarray, max_gap: float = 5.0) -> np.ndarray:
+    """
+    Seconds each sample represents, for time-weighted aggregates.
+
+    Gaps longer than ``max_gap`` (auto-pause, signal loss) count as one second.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    if len(time) == 0:
+        return time
+
+    dt = np.diff(time, append=time[-1] + 1.0)
+    dt[(dt <= 0) | (dt > max_gap)] = 1.0
+    return dt
+
+
+def resample_1hz(time: np.ndarray, values: np.ndarray, fill: Optional[float] = None) -> np.ndarray:
+    """
+    Resample a channel onto a 1-second grid.
+
+    Args:
+        time: Sample timestamps in seconds
+        values: Channel values
+        fill: Value for seconds inside recording gaps; interpolate when None
+
+    Returns:
+        Array with one value per elapsed second
+    """
+    time = np.asarray(time, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(time) == 0:
+        return values
+
+    grid = np.arange(time[0], time[-1] + 1.0)
+    resampled = np.interp(grid, time, values)
+
+    if fill is not None:
+        # Seconds with no sample within 1s are gaps
+        nearest = np.searchsorted(time, grid)
+        nearest = np.clip(nearest, 0, len(time) - 1)
+        gap = np.abs(time[nearest] - grid) >= 1.0
+        gap &= np.abs(time[np.maximum(nearest - 1, 0)] - grid) >= 1.0
+        resampled[gap] = fill
+
+    return resampled
+
+
+def _chart_cache_key(activity_id: str, points: int) -> str:
+    return f"streams:chart:{activity_id}:{points}"
+
+
+def _pack(streams: Dict[str, np.ndarray]) -> str:
+    return json.dumps({
+        channel: [array.dtype.str, list(array.shape), base64.b64encode(array.tobytes()).decode()]
+        for channel, array in streams.items()
+    })
+
+
+def _unpack(payload: str) -> Dict[str, np.ndarray]:
+    return {
+        channel: np.frombuffer(base64.b64decode(data), dtype=np.dtype(dtype)).reshape(shape)
+        for channel, (dtype, shape, data) in json.loads(payload).items()
+    }
+
+
+def invalidate_chart_streams(activity_id: str) -> None:
+    for points in CACHED_RESOLUTIONS:
+        cache.delete(_chart_cache_key(activity_id, points))
+
+
+async def get_chart_streams(
+    db: Session,
+    activity_id: str,
+    points: int,
+    channels: Optional[List[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Streams downsampled to about ``points`` samples for charting.
+
+    Resolutions in CACHED_RESOLUTIONS are computed over all channels once and
+    cached as packed arrays; requested channels are picked from that result.
+    Downsampling runs on the compute pool.
+
+    Returns:
+        Arrays keyed by channel, including 'time' (empty when there are no streams)
+    """
+    if points not in CACHED_RESOLUTIONS:
+        streams = load_streams(db, activity_id, channels and ['time', *channels])
+        return await compute_executor.run(downsample_streams, streams, points, channels)
+
+    key = _chart_cache_key(activity_id, points)
+    payload = cache.get(key)
+    if payload is not None:
+        chart = _unpack(payload)
+    else:
+        chart = await compute_executor.run(downsample_streams, load_streams(db, activity_id), points)
+        if chart:
+            cache.set(key, _pack(chart), ttl=CHART_CACHE_TTL)
+
+    if channels:
+        chart = {c: a for c, a in chart.items() if c == 'time' or c in channels}
+    return chart
@@ -0,0 +1,223 @@
+"""Compile structured workouts into flat step timelines.
+
+``Workout.structure`` format::
+
+    {
+        "steps": [
+            {"name": "Warm up", "duration": 600,
+             "target": {"type": "heart_rate", "min": 120, "max": 140}},
+            {"repeat": 5, "steps": [
+                {"name": "Work", "duration": 180, "target": {"type": "power", "min": 250, "max": 280}},
+                {"name": "Recover", "duration": 120}
+            ]},
+            {"name": "Threshold", "distance": 2000,
+             "target": {"type": "pace", "min": 240, "max": 255}}
+        ]
+    }
+
+Durations are seconds. Pace targets are seconds per km and are stored as
+speed ranges (m/s). Distance steps are placed on the time axis using the
+midpoint of their pace/speed target; distance steps without one cannot be
+timed and are dropped.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.models.workout import Workout
+
+logger = get_logger(__name__)
+
+# Target kind codes
+TARGET_NONE = 0
+TARGET_HEART_RATE = 1
+TARGET_POWER = 2
+TARGET_SPEED = 3
+
+# Stream channel compared against each target kind
+TARGET_CHANNELS = {
+    TARGET_HEART_RATE: 'heartrate',
+    TARGET_POWER: 'watts',
+    TARGET_SPEED: 'velocity_smooth',
+}
+
+_TARGET_ALIASES = {
+    'heart_rate': TARGET_HEART_RATE,
+    'hr': TARGET_HEART_RATE,
+    'heartrate': TARGET_HEART_RATE,
+    'power': TARGET_POWER,
+    'watts': TARGET_POWER,
+    'pace': TARGET_SPEED,
+    'speed': TARGET_SPEED,
+}
+
+# Maximum nesting of repeat blocks
+MAX_DEPTH = 4
+
+# Maximum steps in a compiled timeline, after expanding repeats
+MAX_STEPS = 1000
+
+# Compiled timelines kept per process
+CACHE_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class CompiledTimeline:
+    """Flat step timeline: parallel arrays indexed by step."""
+
+    starts: np.ndarray  # seconds from workout start
+    ends: np.ndarray
+    kinds: np.ndarray  # TARGET_* codes
+    lows: np.ndarray
+    highs: np.ndarray
+    names: Tuple[str, ...]
+
+    @property
+    def step_count(self) -> int:
+        return len(self.ends)
+
+    @property
+    def total_duration(self) -> float:
+        return float(self.ends[-1]) if len(self.ends) else 0.0
+
+
+def _parse_target(target: Optional[Dict[str, Any]]) -> Tuple[int, float, float]:
+    if not target:
+        return TARGET_NONE, np.nan, np.nan
+
+    kind = _TARGET_ALIASES.get(str(target.get('type', '')).lower(), TARGET_NONE)
+    if kind == TARGET_NONE:
+        return TARGET_NONE, np.nan, np.nan
+
+    low = target.get('min', target.get('low'))
+    high = target.get('max', target.get('high'))
+    if low is None and high is None:
+        value = target.get('value')
+        if value is None:
+            return TARGET_NONE, np.nan, np.nan
+        low = high = value
+    low = float(low if low is not None else high)
+    high = float(high if high is not None else low)
+
+    if str(target.get('type')).lower() == 'pace':
+        if min(low, high) <= 0:
+            raise ValueError("Pace targets must be positive")
+        # seconds per km -> m/s; the faster pace bounds the upper speed
+        low, high = 1000.0 / max(high, low), 1000.0 / min(high, low)
+
+    return kind, min(low, high), max(low, high)
+
+
+def _step_duration(step: Dict[str, Any], kind: int, low: float, high: float) -> Optional[float]:
+    duration = step.get('duration', step.get('duration_seconds'))
+    if duration is not None:
+        return float(duration)
+
+    distance = step.get('distance', step.get('distance_meters'))
+    if distance is not None and kind == TARGET_SPEED:
+        return float(distance) / ((low + high) / 2.0)
+
+    return None
+
+
+def _flatten(steps: List[Dict[str, Any]], out: List[tuple], depth: int = 0) -> None:
+    if depth > MAX_DEPTH:
+        raise ValueError("Workout structure nests repeats too deeply")
+
+    for step in steps:
+        if 'steps' in step:
+            repeat = int(step.get('repeat', step.get('count', 1)))
+            if repeat < 0:
+                raise ValueError("Workout repeat count must not be negative")
+            block: List[tuple] = []
+            _flatten(step['steps'], block, depth + 1)
+            if len(out) + repeat * len(block) > MAX_STEPS:
+                raise ValueError(f"Workout structure expands to more than {MAX_STEPS} steps")
+            out.extend(block * repeat)
+            continue
+
+        kind, low, high = _parse_target(step.get('target'))
+        duration = _step_duration(step, kind, low, high)
+        if not duration or duration <= 0:
+            logger.warning("workout_step_skipped", step=step.get('name'), reason="no_duration")
+            continue
+
+        if len(out) >= MAX_STEPS:
+            raise ValueError(f"Workout structure expands to more than {MAX_STEPS} steps")
+        out.append((duration, kind, low, high, str(step.get('name') or step.get('type') or '')))
+
+
+def compile_structure(structure: Any) -> CompiledTimeline:
+    """
+    Compile a workout structure into a timeline.
+
+    Args:
+        structure: ``Workout.structure`` (dict with "steps", or a bare step list)
+
+    Returns:
+        CompiledTimeline (empty when there is nothing to compile)
+    """
+    steps = structure.get('steps', []) if isinstance(structure, dict) else (structure or [])
+
+    flat: List[tuple] = []
+    _flatten(steps, flat)
+
+    durations = np.array([s[0] for s in flat], dtype=np.float64)
+    ends = np.cumsum(durations)
+
+    return CompiledTimeline(
+        starts=ends - durations,
+        ends=ends,
+        kinds=np.array([s[1] for s in flat], dtype=np.int8),
+        lows=np.array([s[2] for s in flat], dtype=np.float64),
+        highs=np.array([s[3] for s in flat], dtype=np.float64),
+        names=tuple(s[4] for s in flat),
+    )
+
+
+# Timeline of a workout with nothing to score
+EMPTY_TIMELINE = compile_structure([])
+
+
+_cache: "OrderedDict[tuple, CompiledTimeline]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def workout_revision(workout: Workout) -> str:
+    """Revision key for a workout's structure."""
+    if workout.updated_at is not None:
+        return workout.updated_at.isoformat()
+    encoded = json.dumps(workout.structure, sort_keys=True, default=str).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def compile_workout(workout: Workout) -> CompiledTimeline:
+    """Compile a workout's structure, cached per (workout, revision)."""
+    key = (workout.id, workout_revision(workout))
+
+    with _cache_lock:
+        timeline = _cache.get(key)
+        if timeline is not None:
+            _cache.move_to_end(key)
+            return timeline
+
+    timeline = compile_structure(workout.structure)
+
+    with _cache_lock:
+        _cache[key] = timeline
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return timeline
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,244 @@
+"""Time-in-zone histograms.
+
+Each activity stores one small array of seconds per zone and channel,
+computed against the athlete threshold in effect on the activity date.
+Weekly distributions are sums of these arrays; streams are only re-read
+when a threshold change invalidates a date range.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity
+from app.models.activity_stream import ActivityStream
+from app.models.activity_zones import ActivityZones
+from app.models.athlete_threshold import ThresholdMetric
+from app.services.analytics.streams import load_streams_bulk, sample_durations
+
+if TYPE_CHECKING:
+    from app.services.threshold_service import ThresholdHistory
+
+logger = get_logger(__name__)
+
+ZONES_DTYPE = '<i4'
+
+# Zone upper bounds as fractions of the threshold (n bounds -> n + 1 zones)
+POWER_ZONES = (0.55, 0.75, 0.90, 1.05, 1.20, 1.50)  # Coggan, % FTP
+HEART_RATE_ZONES = (0.81, 0.90, 0.94, 1.00, 1.03, 1.06)  # Friel, % LTHR
+PACE_ZONES = (0.775, 0.877, 0.943, 1.01, 1.03, 1.11)  # Friel, % threshold speed
+
+# Zone kind -> (threshold metric, stream channel, zone bounds)
+ZONE_KINDS = {
+    'power': (ThresholdMetric.FTP, 'watts', POWER_ZONES),
+    'heartrate': (ThresholdMetric.LTHR, 'heartrate', HEART_RATE_ZONES),
+    'pace': (ThresholdMetric.THRESHOLD_PACE, 'velocity_smooth', PACE_ZONES),
+}
+
+
+def zone_edges(kind: str, threshold: float) -> np.ndarray:
+    """Absolute zone bounds in the channel's unit."""
+    _, _, bounds = ZONE_KINDS[kind]
+    if kind == 'pace':
+        threshold = 1000.0 / threshold  # s/km -> m/s
+    return np.asarray(bounds, dtype=np.float64) * threshold
+
+
+def zone_seconds(values: np.ndarray, dt: np.ndarray, edges: np.ndarray, skip_zero: bool = False) -> np.ndarray:
+    """Seconds per zone: digitize samples, then sum their durations per zone."""
+    values = np.asarray(values, dtype=np.float64)
+    weights = dt * (values > 0) if skip_zero else dt
+    counts = np.bincount(np.digitize(values, edges), weights=weights, minlength=len(edges) + 1)
+    return np.rint(counts).astype(ZONES_DTYPE)
+
+
+def compute_zones(
+    streams: Dict[str, np.ndarray],
+    thresholds: Dict[str, Optional[float]]
+) -> Dict[str, np.ndarray]:
+    """
+    Time-in-zone arrays for each channel that has data and a threshold.
+
+    Args:
+        streams: Arrays keyed by channel (needs 'time')
+        thresholds: Threshold per zone kind
+
+    Returns:
+        Seconds per zone keyed by zone kind
+    """
+    time = streams.get('time')
+    if time is None or len(time) < 2:
+        return {}
+
+    dt = sample_durations(time)
+    zones = {}
+    for kind, (_, channel, _) in ZONE_KINDS.items():
+        values = streams.get(channel)
+        threshold = thresholds.get(kind)
+        if values is None or not threshold or not np.any(values):
+            continue
+        # Heart rate dropouts and stopped time have no zone; zero watts is zone 1
+        zones[kind] = zone_seconds(values, dt, zone_edges(kind, threshold), skip_zero=kind != 'power')
+    return zones
+
+
+def thresholds_at(history: "ThresholdHistory", when: datetime) -> Dict[str, Optional[float]]:
+    """Threshold per zone kind in effect at a date."""
+    return {kind: history.at(metric, when) for kind, (metric, _, _) in ZONE_KINDS.items()}
+
+
+def save_zones(db: Session, activity: Activity, zones: Dict[str, np.ndarray], thresholds: Dict[str, Optional[float]]) -> None:
+    """Replace an activity's stored zones for the given kinds."""
+    if not zones:
+        return
+
+    db.query(ActivityZones).filter(
+        ActivityZones.activity_id == activity.id,
+        ActivityZones.kind.in_(list(zones))
+    ).delete(synchronize_session=False)
+
+    for kind, seconds in zones.items():
+        db.add(ActivityZones(
+            activity_id=activity.id,
+            kind=kind,
+            user_id=activity.user_id,
+            start_date=activity.start_date,
+            threshold=thresholds[kind],
+            seconds=seconds.tobytes()
+        ))
+
+
+def process_activity_zones(
+    db: Session,
+    activity: Activity,
+    streams: Dict[str, np.ndarray],
+    history: "ThresholdHistory"
+) -> Dict[str, np.ndarray]:
+    """Compute and store an activity's zones (caller commits)."""
+    thresholds = thresholds_at(history, activity.start_date)
+    zones = compute_zones(streams, thresholds)
+    save_zones(db, activity, zones, thresholds)
+    return zones
+
+
+def zone_activities_query(
+    db: Session,
+    user_id: str,
+    kinds: Iterable[str],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """An athlete's activities in [start, end) with a stream for any of the zone kinds."""
+    channels = [ZONE_KINDS[kind][1] for kind in kinds]
+    query = db.query(Activity).filter(
+        Activity.user_id == user_id,
+        Activity.duplicate_of_id.is_(None),
+        Activity.id.in_(db.query(ActivityStream.activity_id).filter(ActivityStream.channel.in_(channels)))
+    )
+    if start is not None:
+        query = query.filter(Activity.start_date >= start)
+    if end is not None:
+        query = query.filter(Activity.start_date < end)
+    return query
+
+
+def recompute_zones(
+    db: Session,
+    user_id: str,
+    history: "ThresholdHistory",
+    kinds: Iterable[str],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 200
+) -> int:
+    """
+    Recompute zones for an athlete's activities in [start, end).
+
+    Called when a threshold changes; only that date range is re-read, one
+    batch of streams per query.
+
+    Returns:
+        Number of activities recomputed
+    """
+    kinds = list(kinds)
+    channels = ['time', *(ZONE_KINDS[kind][1] for kind in kinds)]
+    activities = zone_activities_query(db, user_id, kinds, start, end).order_by(Activity.start_date).all()
+
+    # Drop stale rows first so activities that lose a threshold don't keep old zones
+    ids = [a.id for a in activities]
+    for offset in range(0, len(ids), batch_size):
+        db.query(ActivityZones).filter(
+            ActivityZones.activity_id.in_(ids[offset:offset + batch_size]),
+            ActivityZones.kind.in_(kinds)
+        ).delete(synchronize_session=False)
+
+    for offset in range(0, len(activities), batch_size):
+        batch = activities[offset:offset + batch_size]
+        streams = load_streams_bulk(db, [a.id for a in batch], channels)
+        for activity in batch:
+            thresholds = thresholds_at(history, activity.start_date)
+            thresholds = {kind: thresholds[kind] for kind in kinds}
+            zones = compute_zones(streams.get(activity.id, {}), thresholds)
+            for kind, seconds in zones.items():
+                db.add(ActivityZones(
+                    activity_id=activity.id,
+                    kind=kind,
+                    user_id=activity.user_id,
+                    start_date=activity.start_date,
+                    threshold=thresholds[kind],
+                    seconds=seconds.tobytes()
+                ))
+        db.flush()
+
+    db.commit()
+    logger.info("zones_recomputed", user_id=user_id, kinds=kinds, activities=len(activities))
+    return len(activities)
+
+
+def decode(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=ZONES_DTYPE)
+
+
+def week_start(value: datetime) -> datetime:
+    day = value.date() - timedelta(days=value.weekday())
+    return datetime(day.year, day.month, day.day)
+
+
+def weekly_distribution(
+    db: Session,
+    user_id: str,
+    kind: str,
+    start: datetime,
+    end: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Seconds per zone for each week (Monday start) in [start, end).
+
+    Served from stored zone arrays by idx_activity_zones_user_kind_start_date.
+    """
+    rows = db.query(ActivityZones.start_date, ActivityZones.seconds).filter(
+        ActivityZones.user_id == user_id,
+        ActivityZones.kind == kind,
+        ActivityZones.start_date >= start,
+        ActivityZones.start_date < end
+    ).order_by(ActivityZones.start_date)
+
+    zone_count = len(ZONE_KINDS[kind][2]) + 1
+    weeks: "OrderedDict[datetime, np.ndarray]" = OrderedDict()
+    counts: Dict[datetime, int] = {}
+    for start_date, seconds in rows:
+        week = week_start(start_date)
+        if week not in weeks:
+            weeks[week] = np.zeros(zone_count, dtype=np.int64)
+            counts[week] = 0
+        weeks[week] += decode(seconds)
+        counts[week] += 1
+
+    return [
+        {'week_start': week, 'activity_count': counts[week], 'seconds': totals.tolist()}
+        for week, totals in weeks.items()
+    ]
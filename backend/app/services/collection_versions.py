@@ -0,0 +1,131 @@
+"""Per-user collection versions for HTTP validators.
+
+Each user has a version per collection (activities, workouts) in the
+cache. List endpoints build their ETag from it, so a repeat request is
+answered with 304 before any query runs.
+
+Versions are bumped by session listeners whenever a flush writes an
+activity, route or workout, once the transaction commits (bumping
+earlier could let a reader pair the new version with old rows). A
+missing version is initialised from ``time.time_ns()`` rather than 0, so
+an evicted counter never comes back with a value a client already holds.
+Bulk ``query.update()`` / ``delete()`` bypass the listeners, so writes to
+anything a list shows go through the ORM; the raw payload backfill is the
+one bulk update of activities and only moves ``raw_data``, which no list
+shows.
+
+The counters only work when every process shares them. On the in-process
+cache fallback a write in one worker would leave the others serving 304s,
+so ``validator`` derives the ETag input from the rows instead: count and
+latest ``updated_at``, one index-only aggregate per request.
+"""
+
+import time
+from typing import Any, Iterable, Set, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache import cache
+from app.models.activity import Activity
+from app.models.activity_route import ActivityRoute
+from app.models.workout import Workout
+
+ACTIVITIES = "activities"
+WORKOUTS = "workouts"
+
+VERSION_TTL = 30 * 24 * 3600
+
+_PENDING_KEY = "collection_versions"
+
+
+def _key(collection: str, user_id: str) -> str:
+    return f"collection_version:{collection}:{user_id}"
+
+
+def get_version(collection: str, user_id: str) -> int:
+    """Current version of a user's collection (initialised on first use)."""
+    key = _key(collection, user_id)
+    value = cache.get(key)
+    if value is not None:
+        return int(value)
+    version = time.time_ns()
+    cache.set(key, version, ttl=VERSION_TTL)
+    return version
+
+
+def _row_validator(db: Session, collection: str, user_id: str) -> Tuple[Any, ...]:
+    if collection == WORKOUTS:
+        return tuple(db.query(func.count(Workout.id), func.max(Workout.updated_at)).filter(
+            Workout.athlete_id == user_id
+        ).one())
+    activities = db.query(func.count(Activity.id), func.max(Activity.updated_at)).filter(
+        Activity.user_id == user_id
+    ).one()
+    # Lists show the summary polyline and thumbnail
+    routes = db.query(func.max(ActivityRoute.updated_at)).join(
+        Activity, Activity.id == ActivityRoute.activity_id
+    ).filter(Activity.user_id == user_id).scalar()
+    return (*activities, routes)
+
+
+def validator(db: Session, collection: str, user_id: str) -> Any:
+    """ETag input for a user's collection: its version, or a row summary without a shared cache."""
+    if cache.is_shared:
+        return get_version(collection, user_id)
+    return _row_validator(db, collection, user_id)
+
+
+def bump(collection: str, user_ids: Iterable[str]) -> None:
+    """Invalidate the validators of users' collections."""
+    cache.incr_many({_key(collection, user_id): 1 for user_id in set(user_ids)}, only_if_exists=True)
+
+
+def _activity_owners(session: Session, activity_ids: Set[str]) -> Set[str]:
+    owners, missing = set(), set()
+    for activity_id in activity_ids:
+        activity = session.identity_map.get(identity_key(Activity, activity_id))
+        if activity is not None:
+            owners.add(activity.user_id)
+        else:
+            missing.add(activity_id)
+    if missing:
+        with session.no_autoflush:
+            owners.update(
+                user_id for (user_id,) in session.query(Activity.user_id).filter(Activity.id.in_(missing))
+            )
+    return owners
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    pending: Set[Tuple[str, str]] = session.info.setdefault(_PENDING_KEY, set())
+    route_activity_ids = set()
+
+    changed = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    for obj in (*session.new, *changed, *session.deleted):
+        if isinstance(obj, Activity) and obj.user_id:
+            pending.add((ACTIVITIES, obj.user_id))
+        elif isinstance(obj, Workout) and obj.athlete_id:
+            pending.add((WORKOUTS, obj.athlete_id))
+        elif isinstance(obj, ActivityRoute) and obj.activity_id:
+            route_activity_ids.add(obj.activity_id)
+
+    if route_activity_ids:
+        # Lists show the summary polyline and thumbnail
+        pending.update((ACTIVITIES, user_id) for user_id in _activity_owners(session, route_activity_ids))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for collection in {c for c, _ in pending}:
+        bump(collection, (user_id for c, user_id in pending if c == collection))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,122 @@
+"""Base class for provider connectors."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.connectors import resilience
+from app.services.connectors.resilience import RetryPolicy
+
+logger = get_logger(__name__)
+
+
+class BaseConnector(ABC):
+    """
+    Common HTTP plumbing for provider connectors.
+
+    Subclasses set ``provider_name`` and ``base_url`` and send provider
+    API calls through ``make_request`` (bearer token) or ``send_request``
+    (custom signing), which apply the provider's retry policy and circuit
+    breaker.
+    """
+
+    def __init__(self):
+        self.provider_name = "base"
+        self.base_url = ""
+        self.retry_policy = RetryPolicy()
+        self.client = httpx.AsyncClient(timeout=settings.CONNECTOR_TIMEOUT_SECONDS)
+
+    @abstractmethod
+    async def get_authorization_url(self, state: str, redirect_uri: str) -> str:
+        """Provider OAuth authorization URL."""
+
+    @abstractmethod
+    async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """New tokens ('access_token', 'refresh_token', 'expires_at')."""
+
+    @abstractmethod
+    async def get_activities(self, access_token: str, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Raw activity summaries."""
+
+    @abstractmethod
+    async def get_activity_detail(self, access_token: str, *args, **kwargs) -> Dict[str, Any]:
+        """Raw activity detail."""
+
+    @abstractmethod
+    def normalize_activity(self, raw_activity: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a raw activity onto Activity fields."""
+
+    @abstractmethod
+    async def handle_webhook(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Parse a webhook event (None when it is not about an activity)."""
+
+    async def get_activity_streams(self, access_token: str, activity_id: str) -> Dict[str, Any]:
+        """Raw per-sample streams (empty when the provider has none)."""
+        return {}
+
+    async def send_request(
+        self,
+        method: str,
+        send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        Run ``send`` with retries under the provider's circuit breaker.
+
+        ``send`` is re-invoked for every attempt.
+
+        Raises:
+            httpx.HTTPStatusError: Non-retryable status or retries exhausted
+            httpx.TransportError: Network failure after retries
+            CircuitOpenError: Provider is currently failing
+        """
+        return await resilience.call(self.provider_name, method, send, self.retry_policy)
+
+    async def make_request(
+        self,
+        method: str,
+        url: str,
+        access_token: str,
+        **kwargs
+    ) -> Any:
+        """
+        Make an authenticated API request and return the decoded JSON.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            access_token: Bearer token
+            **kwargs: Passed to httpx (params, json, ...)
+
+        Returns:
+            Response JSON ({} for empty responses)
+
+        Raises:
+            Exception: "TOKEN_EXPIRED" on 401, "RATE_LIMIT_EXCEEDED" on 429
+        """
+        headers = {'Authorization': f'Bearer {access_token}', **kwargs.pop('headers', {})}
+
+        async def send() -> httpx.Response:
+            return await self.client.request(method, url, headers=headers, **kwargs)
+
+        try:
+            response = await self.send_request(method, send)
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 401:
+                logger.warning(f"{self.provider_name}_token_expired", url=url)
+                raise Exception("TOKEN_EXPIRED") from e
+            if status == 429:
+                logger.warning(f"{self.provider_name}_rate_limited", url=url)
+                raise Exception("RATE_LIMIT_EXCEEDED") from e
+            logger.error(f"{self.provider_name}_request_failed", status=status, url=url)
+            raise
+
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -459,25 +459,21 @@ class CorosConnector(BaseConnector):
         Returns:
             Response data
         """
-        timestamp = str(int(time.time()))
-        signature = self._generate_signature(timestamp)
-
-        headers = {
-            'Authorization': f'Bearer {access_token}',
-            'timestamp': timestamp,
-            'signature': signature,
-            **kwargs.pop('headers', {})
-        }
+        extra_headers = kwargs.pop('headers', {})
 
-        try:
-            response = await self.client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                **kwargs
-            )
+        async def send() -> httpx.Response:
+            # The signature covers the timestamp, so re-sign every attempt
+            timestamp = str(int(time.time()))
+            headers = {
+                'Authorization': f'Bearer {access_token}',
+                'timestamp': timestamp,
+                'signature': self._generate_signature(timestamp),
+                **extra_headers
+            }
+            return await self.client.request(method=method, url=url, headers=headers, **kwargs)
 
-            response.raise_for_status()
+        try:
+            response = await self.send_request(method, send)
             data = response.json()
 
             if data.get('result') != '0000':
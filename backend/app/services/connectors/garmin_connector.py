@@ -408,11 +408,17 @@ class GarminConnector(BaseConnector):
             resource_owner_secret=access_token_secret
         )
 
-        uri, headers, body = oauth_client.sign(url, http_method=method, **kwargs)
+        # Query parameters are part of the OAuth 1.0a signature base string
+        params = kwargs.pop('params', None)
+        url = str(httpx.URL(url, params=params)) if params else url
+
+        async def send() -> httpx.Response:
+            # Fresh nonce and timestamp for every attempt
+            uri, headers, body = oauth_client.sign(url, http_method=method)
+            return await self.client.request(method, uri, headers=headers, **kwargs)
 
         try:
-            response = await self.client.request(method, uri, headers=headers, **kwargs)
-            response.raise_for_status()
+            response = await self.send_request(method, send)
             return response.json()
 
         except httpx.HTTPStatusError as e:
@@ -0,0 +1,257 @@
+"""Retries and circuit breaking for provider API requests.
+
+Every connector request goes through ``call``:
+
+- Failures are classified. Timeouts, connection errors and 5xx are
+  transient; 429 is retried only when ``Retry-After`` asks for a short
+  wait; other 4xx are the caller's problem and raised at once.
+- Transient failures are retried with decorrelated-jitter backoff, so
+  workers hitting the same provider don't retry in lockstep.
+- Each provider has a circuit breaker. After consecutive transient
+  failures it opens and requests fail fast with ``CircuitOpenError``;
+  after the recovery period one probe request is let through (half-open)
+  and its outcome closes or re-opens the breaker.
+
+Breaker state and counters are exposed by ``metrics_snapshot`` for the
+connector health endpoint.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Methods that are safe to resend after an ambiguous failure
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+# Errors raised before the request reached the provider; safe to retry for any method
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"CIRCUIT_OPEN: {provider} unavailable, retry in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    """Retry limits for one connector."""
+
+    max_attempts: int = settings.CONNECTOR_MAX_ATTEMPTS
+    base_delay: float = settings.CONNECTOR_RETRY_BASE_SECONDS
+    max_delay: float = settings.CONNECTOR_RETRY_MAX_SECONDS
+
+    def next_delay(self, previous: float) -> float:
+        """Decorrelated jitter: uniform in [base, 3 * previous], capped."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class BreakerState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = settings.CONNECTOR_BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds: float = settings.CONNECTOR_BREAKER_RECOVERY_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.clock = clock
+
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.counters = {
+            'requests': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'rejected': 0,
+            'opened': 0,
+        }
+
+    def before_call(self) -> None:
+        """Admit a request or raise ``CircuitOpenError``."""
+        with self._lock:
+            if self.state == BreakerState.OPEN:
+                waited = self.clock() - self.opened_at
+                if waited < self.recovery_seconds:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.provider, self.recovery_seconds - waited)
+                self.state = BreakerState.HALF_OPEN
+                logger.info("circuit_half_open", provider=self.provider)
+
+            if self.state == BreakerState.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(self.provider, self.recovery_seconds)
+                self._probe_in_flight = True
+
+            self.counters['requests'] += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.counters['successes'] += 1
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != BreakerState.CLOSED:
+                logger.info("circuit_closed", provider=self.provider)
+            self.state = BreakerState.CLOSED
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.counters['failures'] += 1
+            self.consecutive_failures += 1
+            probe_failed = self.state == BreakerState.HALF_OPEN
+            self._probe_in_flight = False
+            if probe_failed or (
+                self.state == BreakerState.CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = BreakerState.OPEN
+                self.opened_at = self.clock()
+                self.counters['opened'] += 1
+                logger.warning("circuit_opened", provider=self.provider, failures=self.consecutive_failures)
+
+    def release(self) -> None:
+        """Forget an admitted request without recording an outcome."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.counters['retries'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'open_for_seconds': round(self.clock() - self.opened_at, 1) if self.opened_at is not None else None,
+                **self.counters,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """Process-wide breaker for a provider."""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(provider, CircuitBreaker(provider))
+    return breaker
+
+
+def metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Breaker state and counters per provider."""
+    return {provider: breaker.snapshot() for provider, breaker in sorted(_breakers.items())}
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse ``Retry-After`` (seconds or HTTP date)."""
+    value = response.headers.get('Retry-After')
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+async def call(
+    provider: str,
+    method: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    policy: Optional[RetryPolicy] = None
+) -> httpx.Response:
+    """
+    Send a request with retries, guarded by the provider's breaker.
+
+    ``send`` is called once per attempt, so signatures and timestamps can
+    be regenerated. Returns the successful response; raises the last
+    ``httpx`` error (or ``CircuitOpenError``) otherwise.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_breaker(provider)
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    delay = policy.base_delay
+
+    for attempt in range(1, policy.max_attempts + 1):
+        breaker.before_call()
+        wait: Optional[float] = None
+        try:
+            response = await send()
+            response.raise_for_status()
+            breaker.record_success()
+            return response
+
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            if status == 429:
+                # The provider is up, just throttling us
+                breaker.record_success()
+                wait = retry_after_seconds(e.response)
+                if wait is None or wait > policy.max_delay or attempt == policy.max_attempts:
+                    raise
+            elif status >= 500:
+                breaker.record_failure()
+                if not idempotent or attempt == policy.max_attempts:
+                    raise
+                wait = retry_after_seconds(e.response) if status == 503 else None
+            else:
+                breaker.record_success()
+                raise
+
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            if attempt == policy.max_attempts or not (idempotent or isinstance(e, _NOT_SENT_ERRORS)):
+                raise
+
+        except BaseException:
+            # Anything else (cancellation, bugs) says nothing about the provider
+            breaker.release()
+            raise
+
+        if wait is None:
+            delay = policy.next_delay(delay)
+            wait = delay
+        breaker.record_retry()
+        logger.info("provider_request_retry", provider=provider, attempt=attempt, wait=round(wait, 2))
+        await asyncio.sleep(wait)
+
+    raise RuntimeError("unreachable")
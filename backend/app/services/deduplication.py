@@ -0,0 +1,226 @@
+"""Cross-provider duplicate activity detection.
+
+An athlete with several connected providers (or a watch that forwards to
+Strava) gets the same workout imported more than once. Each activity gets a
+fingerprint of bucketed start time, duration and distance; duplicates are
+found with one indexed ``fingerprint IN (...)`` probe over the neighbouring
+buckets, then confirmed with exact tolerances. The copy with streams (stored,
+or from a provider that supplies them) stays canonical, then the one with
+the best data quality; the others point to it via ``duplicate_of_id``,
+which hides them from lists, matching, zone totals, curves and records.
+"""
+
+import itertools
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity, DataQuality
+from app.models.activity_curve import ActivityCurve
+from app.models.activity_stream import ActivityStream
+from app.models.activity_zones import ActivityZones
+from app.models.workout import Workout
+from app.services.analytics.streams import STREAM_PROVIDERS
+
+logger = get_logger(__name__)
+
+START_BUCKET_SECONDS = 300
+# Duration and distance buckets are logarithmic, 10% wide
+SIZE_BUCKET_RATIO = 1.1
+
+# Confirmation tolerances once a candidate shares a neighbouring bucket
+START_TOLERANCE_SECONDS = 300
+SIZE_TOLERANCE = 0.1
+
+QUALITY_RANK = {
+    DataQuality.FULL: 0,
+    DataQuality.PARTIAL: 1,
+    DataQuality.MINIMAL: 2,
+    None: 3,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+_STREAM_PROVIDER_NAMES = {provider.name for provider in STREAM_PROVIDERS}
+
+
+def _size_bucket(value: Optional[float]) -> Optional[int]:
+    if not value or value <= 0:
+        return None
+    return int(math.floor(math.log(value) / math.log(SIZE_BUCKET_RATIO)))
+
+
+def _buckets(activity: Activity) -> Optional[Tuple[int, int, Optional[int]]]:
+    if activity.start_date is None or not activity.duration_seconds:
+        return None
+    start = int((activity.start_date - _EPOCH).total_seconds()) // START_BUCKET_SECONDS
+    return start, _size_bucket(activity.duration_seconds), _size_bucket(activity.distance_meters)
+
+
+def _format(start: int, duration: int, distance: Optional[int]) -> str:
+    return f"{start}:{duration}:{'-' if distance is None else distance}"
+
+
+def fingerprint(activity: Activity) -> Optional[str]:
+    """Bucketed (start, duration, distance) key; None without a duration."""
+    buckets = _buckets(activity)
+    return _format(*buckets) if buckets else None
+
+
+def neighbour_fingerprints(activity: Activity) -> List[str]:
+    """Fingerprints of the activity's bucket and every adjacent one."""
+    buckets = _buckets(activity)
+    if buckets is None:
+        return []
+
+    start, duration, distance = buckets
+    distances = [None] if distance is None else [distance - 1, distance, distance + 1]
+    return [
+        _format(s, d, km)
+        for s, d, km in itertools.product(
+            (start - 1, start, start + 1), (duration - 1, duration, duration + 1), distances
+        )
+    ]
+
+
+def _close(a: Optional[float], b: Optional[float]) -> bool:
+    if not a and not b:
+        return True
+    if not a or not b:
+        return False
+    return abs(a - b) <= SIZE_TOLERANCE * max(a, b)
+
+
+def is_same_activity(a: Activity, b: Activity) -> bool:
+    """Whether two activities from different providers record the same workout."""
+    return (
+        a.provider != b.provider
+        and abs((a.start_date - b.start_date).total_seconds()) <= START_TOLERANCE_SECONDS
+        and _close(a.duration_seconds, b.duration_seconds)
+        and _close(a.distance_meters, b.distance_meters)
+    )
+
+
+def _rank(activity: Activity, streamed: Set[str]) -> Tuple[int, int, datetime]:
+    # Zones, curves and efforts come from streams, so a copy that has them (or
+    # will get them) wins; then the best data, then the copy imported first
+    if activity.id in streamed:
+        streams = 0
+    elif activity.provider in _STREAM_PROVIDER_NAMES:
+        streams = 1
+    else:
+        streams = 2
+    return streams, QUALITY_RANK.get(activity.data_quality, 3), activity.created_at or datetime.utcnow()
+
+
+def _demote(db: Session, duplicate: Activity, canonical: Activity) -> None:
+    duplicate.duplicate_of_id = canonical.id
+
+    # Keep a planned-workout link on the surviving copy (activity_id is unique)
+    # Through the ORM, not a bulk update, so the workouts list version is bumped
+    if db.query(Workout.id).filter(Workout.activity_id == canonical.id).first() is None:
+        for workout in db.query(Workout).filter(Workout.activity_id == duplicate.id):
+            workout.activity_id = canonical.id
+    # Zone totals feed weekly load, curves and efforts feed the athlete's
+    # envelopes and records; only the canonical copy may count
+    db.query(ActivityZones).filter(ActivityZones.activity_id == duplicate.id).delete(synchronize_session=False)
+    db.query(ActivityCurve).filter(ActivityCurve.activity_id == duplicate.id).delete(synchronize_session=False)
+    if duplicate.processed_data:
+        processed = dict(duplicate.processed_data)
+        processed.pop('best_efforts', None)
+        if processed.get('stages'):
+            # Should the copy become canonical again, the pipeline re-runs these
+            processed['stages'] = {
+                k: v for k, v in processed['stages'].items() if k not in ('curves', 'best_efforts', 'zones')
+            }
+        duplicate.processed_data = processed
+
+
+def resolve_duplicates(db: Session, activities: List[Activity]) -> List[Activity]:
+    """
+    Fingerprint activities and link them to copies from other providers.
+
+    All activities of one user are probed with a single
+    ``(user_id, fingerprint)`` lookup. The caller commits.
+
+    Args:
+        db: Database session
+        activities: Newly imported activities of one user
+
+    Returns:
+        Activities that were marked as duplicates (new or previously canonical)
+    """
+    for activity in activities:
+        activity.fingerprint = fingerprint(activity)
+
+    probes = sorted({key for a in activities for key in neighbour_fingerprints(a)})
+    if not probes:
+        return []
+
+    # Sessions don't autoflush; activities added in this batch must be visible
+    db.flush()
+    candidates = db.query(Activity).filter(
+        Activity.user_id == activities[0].user_id,
+        Activity.fingerprint.in_(probes)
+    ).all()
+
+    by_id: Dict[str, Activity] = {c.id: c for c in candidates}
+    streamed = {
+        activity_id for (activity_id,) in db.query(ActivityStream.activity_id).filter(
+            ActivityStream.activity_id.in_(list(by_id))
+        ).distinct()
+    } if by_id else set()
+    demoted: List[Activity] = []
+    for activity in activities:
+        if activity.fingerprint is None or activity.duplicate_of_id is not None:
+            continue
+
+        group = [activity] + [
+            c for c in candidates
+            if c.id != activity.id and is_same_activity(activity, c)
+        ]
+        # Follow existing links so each group has exactly one canonical activity
+        group += [
+            by_id[c.duplicate_of_id] for c in group
+            if c.duplicate_of_id in by_id and by_id[c.duplicate_of_id] not in group
+        ]
+        if len(group) == 1:
+            continue
+
+        canonical = min(group, key=lambda a: _rank(a, streamed))
+        canonical.duplicate_of_id = None
+        for other in group:
+            if other is not canonical and other.duplicate_of_id != canonical.id:
+                _demote(db, other, canonical)
+                demoted.append(other)
+
+        logger.info(
+            "duplicate_activities",
+            user_id=activity.user_id,
+            canonical_id=canonical.id,
+            duplicate_ids=[o.id for o in group if o is not canonical],
+        )
+
+    return demoted
+
+
+def backfill_fingerprints(db: Session, user_id: str, batch_size: int = 100) -> int:
+    """
+    Fingerprint an athlete's existing activities and link their duplicates.
+
+    Returns:
+        Number of activities marked as duplicates
+    """
+    activities = db.query(Activity).filter(
+        Activity.user_id == user_id,
+        Activity.fingerprint.is_(None)
+    ).order_by(Activity.start_date).all()
+
+    demoted = 0
+    for offset in range(0, len(activities), batch_size):
+        demoted += len(resolve_duplicates(db, activities[offset:offset + batch_size]))
+        db.commit()
+    return demoted
@@ -0,0 +1,245 @@
+"""Delta sync: what changed for a user since a client's token.
+
+The web client keeps a local copy of its activities, workouts, comments
+and notifications and asks only for changes. Each collection is read with
+a keyset on ``(updated_at, id)`` over a per-user ``updated_at`` index, and
+deletions come from the ``tombstones`` table, which a ``before_flush``
+listener fills whenever one of these rows is deleted through the ORM.
+
+The token is opaque to clients: a base64 JSON map of per-collection
+cursors. When a collection is fully read, its cursor is set to the read
+time minus ``DELTA_SYNC_OVERLAP_SECONDS`` rather than to the last row, so
+a transaction that stamped ``updated_at`` earlier but committed after the
+read is still picked up; clients upsert by id, so the re-read rows are
+harmless. Tokens older than the tombstone retention get ``reset``: the
+client must drop its copy and reload. Expired tombstones are deleted by
+
+    python -m app.services.delta_sync prune
+
+which should run daily (cron or the deployment's scheduler).
+
+Rows removed by database-level cascades (e.g. comments of a deleted
+activity) are not logged; clients drop children of deleted parents.
+"""
+
+import argparse
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.activity import Activity
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.tombstone import Tombstone
+from app.models.workout import Workout
+
+logger = get_logger(__name__)
+
+ACTIVITIES = "activities"
+WORKOUTS = "workouts"
+COMMENTS = "comments"
+NOTIFICATIONS = "notifications"
+TOMBSTONES = "tombstones"
+
+COLLECTIONS = (ACTIVITIES, WORKOUTS, COMMENTS, NOTIFICATIONS)
+
+TOKEN_VERSION = 1
+
+Cursor = Tuple[datetime, str]
+
+_START: Cursor = (datetime(1970, 1, 1), "")
+
+
+class InvalidToken(ValueError):
+    """The client's token could not be decoded."""
+
+
+def encode_token(cursors: Dict[str, Cursor]) -> str:
+    payload = {
+        "v": TOKEN_VERSION,
+        "c": {name: [ts.isoformat(), last_id] for name, (ts, last_id) in cursors.items()},
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token: str) -> Dict[str, Cursor]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != TOKEN_VERSION:
+            raise InvalidToken("Unsupported token version")
+        return {
+            name: (datetime.fromisoformat(ts), str(last_id))
+            for name, (ts, last_id) in payload["c"].items()
+            if name in (*COLLECTIONS, TOMBSTONES)
+        }
+    except InvalidToken:
+        raise
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise InvalidToken("Malformed token") from e
+
+
+def _page(query: Query, stamp, key, cursor: Cursor, limit: int) -> List[Any]:
+    """Rows after ``cursor`` in (stamp, key) order; one extra row signals more."""
+    ts, last_id = cursor
+    return query.filter(
+        or_(stamp > ts, and_(stamp == ts, key > last_id))
+    ).order_by(stamp, key).limit(limit + 1).all()
+
+
+def _visible_comments(db: Session, user_id: str) -> Query:
+    """Comments the user wrote or that are on their activities or workouts."""
+    return db.query(Comment).filter(or_(
+        Comment.author_id == user_id,
+        Comment.activity_id.in_(select(Activity.id).where(Activity.user_id == user_id)),
+        Comment.workout_id.in_(select(Workout.id).where(Workout.athlete_id == user_id)),
+    ))
+
+
+def changes_since(
+    db: Session,
+    user_id: str,
+    token: Optional[str] = None,
+    limit: int = 200,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Collect a user's changes since ``token`` (everything when None).
+
+    Returns:
+        {'token', 'has_more', 'reset', <collection>: {'updated': [rows], 'deleted': [ids]}}
+        where rows are ORM objects, oldest change first and at most
+        ``limit`` per collection. Call again with the new token while
+        ``has_more`` is true.
+
+    Raises:
+        InvalidToken: Token could not be decoded
+    """
+    as_of = now or datetime.utcnow()
+    cursors = decode_token(token) if token else {}
+
+    reset = False
+    retention_start = as_of - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    if cursors and cursors.get(TOMBSTONES, _START)[0] < retention_start:
+        # Deletions older than the retention have been pruned; start over
+        reset = True
+        cursors = {}
+
+    settled: Cursor = (as_of - timedelta(seconds=settings.DELTA_SYNC_OVERLAP_SECONDS), "")
+    result: Dict[str, Any] = {name: {"updated": [], "deleted": []} for name in COLLECTIONS}
+    next_cursors: Dict[str, Cursor] = {}
+    has_more = False
+
+    sources = {
+        ACTIVITIES: (db.query(Activity).filter(Activity.user_id == user_id), Activity),
+        WORKOUTS: (db.query(Workout).filter(Workout.athlete_id == user_id), Workout),
+        COMMENTS: (_visible_comments(db, user_id), Comment),
+        NOTIFICATIONS: (db.query(Notification).filter(Notification.user_id == user_id), Notification),
+    }
+    for name, (query, model) in sources.items():
+        rows = _page(query, model.updated_at, model.id, cursors.get(name, _START), limit)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            has_more = True
+            next_cursors[name] = (rows[-1].updated_at, rows[-1].id)
+        else:
+            next_cursors[name] = settled
+
+        if name == ACTIVITIES:
+            # Activities that became another provider's duplicate leave the list
+            result[name]["updated"] = [a for a in rows if a.duplicate_of_id is None]
+            result[name]["deleted"] = [a.id for a in rows if a.duplicate_of_id is not None]
+        else:
+            result[name]["updated"] = rows
+
+    tombstones = _page(
+        db.query(Tombstone).filter(Tombstone.user_id == user_id),
+        Tombstone.deleted_at, Tombstone.id, cursors.get(TOMBSTONES, _START), limit
+    )
+    if len(tombstones) > limit:
+        tombstones = tombstones[:limit]
+        has_more = True
+        next_cursors[TOMBSTONES] = (tombstones[-1].deleted_at, tombstones[-1].id)
+    else:
+        # Retention is measured from here, so a fresh token is never reset
+        next_cursors[TOMBSTONES] = settled
+    for t in tombstones:
+        if t.entity in result:
+            result[t.entity]["deleted"].append(t.entity_id)
+
+    result.update(token=encode_token(next_cursors), has_more=has_more, reset=reset)
+    return result
+
+
+def prune_tombstones(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete tombstones older than the retention period."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    deleted = db.query(Tombstone).filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    logger.info("tombstones_pruned", count=deleted)
+    return deleted
+
+
+def _audience(obj) -> Optional[Tuple[str, set]]:
+    """(collection, users whose feed shows the row) for a tracked model."""
+    if isinstance(obj, Activity):
+        return ACTIVITIES, {obj.user_id}
+    if isinstance(obj, Workout):
+        return WORKOUTS, {obj.athlete_id}
+    if isinstance(obj, Notification):
+        return NOTIFICATIONS, {obj.user_id}
+    if isinstance(obj, Comment):
+        users = {obj.author_id}
+        if obj.activity is not None:
+            users.add(obj.activity.user_id)
+        if obj.workout is not None:
+            users.add(obj.workout.athlete_id)
+        return COMMENTS, users
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def _record_tombstones(session: Session, flush_context, instances) -> None:
+    if not session.deleted:
+        return
+    now = datetime.utcnow()
+    with session.no_autoflush:
+        for obj in list(session.deleted):
+            audience = _audience(obj)
+            if audience is None:
+                continue
+            collection, user_ids = audience
+            for user_id in user_ids - {None}:
+                session.add(Tombstone(
+                    id=str(uuid.uuid4()),
+                    user_id=user_id,
+                    entity=collection,
+                    entity_id=obj.id,
+                    deleted_at=now,
+                ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delta sync maintenance.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('prune', help=f"Delete tombstones older than {settings.TOMBSTONE_RETENTION_DAYS} days")
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Pruned {prune_tombstones(db):,} tombstones")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
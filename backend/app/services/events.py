@@ -0,0 +1,164 @@
+"""Per-user event bus for Server-Sent Events.
+
+Events are published to Redis pub/sub when Redis is available, so any API
+or worker process can reach a user connected to any API process. Each API
+process runs a single pattern subscription and fans messages out to its
+local connections, so an idle SSE connection costs one asyncio task and
+one queue. Without Redis, events are delivered within the process only.
+"""
+
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL_PREFIX = "trainlytics:events:"
+
+# Per-connection buffer; slow clients drop their oldest events beyond this
+QUEUE_SIZE = 100
+
+LISTENER_RETRY_SECONDS = 1.0
+
+
+def _channel(user_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def _encode(event: str, data: Dict[str, Any]) -> str:
+    return json.dumps({'event': event, 'data': data}, default=str)
+
+
+class EventBroker:
+    """Routes published events to the SSE connections of this process."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Publish an event to a user. Safe to call from sync code and other threads."""
+        self.publish_many([(user_id, event, data)])
+
+    def publish_many(self, events: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Publish several events in one round trip."""
+        messages = [(user_id, _encode(event, data)) for user_id, event, data in events]
+        if not messages:
+            return
+
+        if cache.is_shared:
+            try:
+                pipe = cache.redis.pipeline(transaction=False)
+                for user_id, message in messages:
+                    pipe.publish(_channel(user_id), message)
+                pipe.execute()
+            except redis.RedisError as e:
+                logger.warning("event_publish_failed", count=len(messages), error=str(e))
+            return
+
+        for user_id, message in messages:
+            self._dispatch_threadsafe(user_id, message)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Register a connection and yield the queue its events arrive on."""
+        self._loop = asyncio.get_running_loop()
+        self._ensure_listener()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(queue)
+
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                queues = self._subscribers.get(user_id)
+                if queues is not None:
+                    queues.discard(queue)
+                    if not queues:
+                        del self._subscribers[user_id]
+
+    def _dispatch_threadsafe(self, user_id: str, message: str) -> None:
+        loop = self._loop
+        if loop is None or user_id not in self._subscribers:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._dispatch(user_id, message)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch, user_id, message)
+
+    def _dispatch(self, user_id: str, message: str) -> None:
+        for queue in list(self._subscribers.get(user_id, ())):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def _ensure_listener(self) -> None:
+        if not cache.is_shared:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Forward Redis messages for this process's users to their queues."""
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                logger.info("event_listener_started")
+
+                async for message in pubsub.listen():
+                    if message.get('type') != 'pmessage':
+                        continue
+                    user_id = message['channel'][len(CHANNEL_PREFIX):]
+                    if user_id in self._subscribers:
+                        self._dispatch(user_id, message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("event_listener_failed", error=str(e))
+                await asyncio.sleep(LISTENER_RETRY_SECONDS)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+broker = EventBroker()
+
+
+def format_sse(message: str) -> str:
+    """Format an encoded broker message as an SSE frame."""
+    payload = json.loads(message)
+    return f"event: {payload['event']}\ndata: {json.dumps(payload['data'])}\n\n"
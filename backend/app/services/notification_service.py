@@ -0,0 +1,231 @@
+"""Notification fan-out and unread counters."""
+
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, func, insert, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.logging import get_logger
+from app.models.athlete_coach import AthleteCoach, CoachingStatus
+from app.models.notification import Notification, NotificationType
+from app.models.workout import Workout
+from app.services.events import broker
+
+logger = get_logger(__name__)
+
+# Rows per INSERT statement during fan-out
+INSERT_BATCH_SIZE = 1000
+
+# Unread counters are rebuilt from the database at most this often; also
+# bounds how long a count that raced a concurrent insert can stay stale
+UNREAD_COUNT_TTL = 300
+
+
+def _unread_key(user_id: str) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def build_notifications_query(
+    db: Session,
+    user_id: str,
+    unread_only: bool = False,
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None
+):
+    """Build the notification feed query.
+
+    Served by idx_notifications_user_created_at, or
+    idx_notifications_user_read_created_at for the unread feed.
+    A fan-out gives a whole batch the same ``created_at``, so pages are
+    keyed on (created_at, id) and ``before_id`` breaks ties.
+    """
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+
+    if unread_only:
+        query = query.filter(Notification.is_read == False)  # noqa: E712
+
+    if before is not None:
+        if before_id is not None:
+            query = query.filter(or_(
+                Notification.created_at < before,
+                and_(Notification.created_at == before, Notification.id < before_id)
+            ))
+        else:
+            query = query.filter(Notification.created_at < before)
+
+    return query.order_by(Notification.created_at.desc(), Notification.id.desc())
+
+
+def create_notifications(db: Session, notifications: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Bulk-insert notifications and bump the recipients' unread counters.
+
+    Args:
+        db: Database session
+        notifications: Dicts with user_id, type, title, message and optional action_url
+
+    Returns:
+        The inserted rows
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            'id': str(uuid.uuid4()),
+            'user_id': n['user_id'],
+            'type': n['type'],
+            'title': n['title'],
+            'message': n['message'],
+            'action_url': n.get('action_url'),
+            'is_read': False,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for n in notifications
+    ]
+
+    if not rows:
+        return []
+
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(Notification), rows[start:start + INSERT_BATCH_SIZE])
+    db.commit()
+
+    # Only counters already in the cache are bumped; missing ones are rebuilt on read.
+    per_user = Counter(row['user_id'] for row in rows)
+    cache.incr_many({_unread_key(user_id): n for user_id, n in per_user.items()}, only_if_exists=True)
+
+    broker.publish_many(
+        (row['user_id'], 'notification', {
+            'id': row['id'],
+            'type': row['type'],
+            'title': row['title'],
+            'message': row['message'],
+            'action_url': row['action_url'],
+            'created_at': row['created_at'],
+        })
+        for row in rows
+    )
+
+    logger.info("notifications_created", count=len(rows), recipients=len(per_user))
+    return rows
+
+
+def notify_users(
+    db: Session,
+    user_ids: Iterable[str],
+    notification_type: NotificationType,
+    title: str,
+    message: str,
+    action_url: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Send the same notification to many users."""
+    return create_notifications(db, (
+        {
+            'user_id': user_id,
+            'type': notification_type,
+            'title': title,
+            'message': message,
+            'action_url': action_url,
+        }
+        for user_id in user_ids
+    ))
+
+
+def notify_workouts_assigned(db: Session, workouts: Iterable[Workout]) -> List[Dict[str, Any]]:
+    """Notify athletes about newly assigned workouts (e.g. a whole plan at once)."""
+    return create_notifications(db, (
+        {
+            'user_id': w.athlete_id,
+            'type': NotificationType.WORKOUT_ASSIGNED,
+            'title': "New workout assigned",
+            'message': f"{w.title} on {w.scheduled_date:%Y-%m-%d}",
+            'action_url': f"/workouts/{w.id}",
+        }
+        for w in workouts
+    ))
+
+
+def broadcast_to_athletes(
+    db: Session,
+    coach_id: str,
+    notification_type: NotificationType,
+    title: str,
+    message: str,
+    action_url: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Send a notification to every active athlete of a coach."""
+    athlete_ids = [
+        athlete_id for (athlete_id,) in db.query(AthleteCoach.athlete_id).filter(
+            AthleteCoach.coach_id == coach_id,
+            AthleteCoach.status == CoachingStatus.ACTIVE
+        )
+    ]
+    return notify_users(db, athlete_ids, notification_type, title, message, action_url)
+
+
+def get_unread_count(db: Session, user_id: str) -> int:
+    """Get the unread count from the cache, counting from the database on a miss.
+
+    Writers never store a computed count: inserts increment an existing
+    counter and mark-read invalidates it, so only this read path fills the key.
+    """
+    cached = cache.get(_unread_key(user_id))
+    if cached is not None:
+        return int(cached)
+
+    count = db.query(func.count(Notification.id)).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False  # noqa: E712
+    ).scalar()
+
+    cache.set(_unread_key(user_id), count, ttl=UNREAD_COUNT_TTL)
+    return count
+
+
+def mark_read(db: Session, user_id: str, notification_ids: List[str]) -> int:
+    """
+    Mark notifications as read.
+
+    Returns:
+        Number of notifications that were unread before the call
+    """
+    if not notification_ids:
+        return 0
+
+    result = db.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == user_id,
+            Notification.id.in_(notification_ids),
+            Notification.is_read == False  # noqa: E712
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    if result.rowcount:
+        cache.delete(_unread_key(user_id))
+
+    return result.rowcount
+
+
+def mark_all_read(db: Session, user_id: str) -> int:
+    """Mark all of a user's notifications as read."""
+    result = db.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == user_id,
+            Notification.is_read == False  # noqa: E712
+        )
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    cache.delete(_unread_key(user_id))
+    return result.rowcount
@@ -0,0 +1,166 @@
+"""Raw provider payloads, kept zstd-compressed off the activities row.
+
+Provider payloads (a Strava activity with ``include_all_efforts`` runs to
+hundreds of KB) are only needed to reprocess an activity, yet as a JSON
+column they sat in every ``activities`` heap page. They now live in
+``activity_payloads`` as compressed canonical JSON, and the activity keeps
+only ``raw_data_hash``. ``Activity.raw_data`` is deferred and only holds
+rows written before the move; ``backfill_payloads`` migrates those, and
+the loaders below fall back to it meanwhile.
+"""
+
+import argparse
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import zstandard
+from sqlalchemy import inspect, null, update
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.activity import Activity
+from app.models.activity_payload import ActivityPayload
+
+logger = get_logger(__name__)
+
+CODEC = "zstd"
+COMPRESSION_LEVEL = 3
+
+
+def canonical_json(payload: Any) -> bytes:
+    """Stable JSON encoding, so equal payloads hash equally."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def encode_payload(payload: Any) -> Tuple[str, int, bytes]:
+    """(sha256 hex, uncompressed size, compressed bytes) of a payload."""
+    data = canonical_json(payload)
+    # Compressor objects are not thread-safe; they are cheap to create
+    return hashlib.sha256(data).hexdigest(), len(data), zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(data)
+
+
+def decode_payload(row: ActivityPayload) -> Any:
+    if row.codec != CODEC:
+        raise ValueError(f"Unknown payload codec: {row.codec}")
+    return json.loads(zstandard.ZstdDecompressor().decompress(row.data))
+
+
+def store_raw_payloads(db: Session, items: Iterable[Tuple[Activity, Any]]) -> int:
+    """
+    Store provider payloads for activities, skipping unchanged ones.
+
+    Existing payload rows are loaded in one query. Does not commit.
+
+    Returns:
+        Number of payloads written
+    """
+    changed = []
+    # The last payload wins when an activity appears twice
+    for activity, payload in {activity.id: (activity, payload) for activity, payload in items}.values():
+        if payload is None:
+            continue
+        digest, size, blob = encode_payload(payload)
+        if digest != activity.raw_data_hash:
+            changed.append((activity, digest, size, blob))
+    if not changed:
+        return 0
+
+    known_ids = [a.id for a, *_ in changed if a.raw_data_hash is not None]
+    rows = {
+        p.activity_id: p
+        for p in db.query(ActivityPayload).filter(ActivityPayload.activity_id.in_(known_ids))
+    } if known_ids else {}
+
+    for activity, digest, size, blob in changed:
+        row = rows.get(activity.id)
+        if row is None:
+            db.add(ActivityPayload(activity_id=activity.id, codec=CODEC, size=size, data=blob))
+        else:
+            row.codec, row.size, row.data = CODEC, size, blob
+        if inspect(activity).persistent:
+            # Drop a pre-move copy, if any
+            activity.raw_data = None
+        activity.raw_data_hash = digest
+    return len(changed)
+
+
+def load_raw_payloads(db: Session, activity_ids: List[str]) -> Dict[str, Any]:
+    """Provider payloads by activity ID (activities without one are left out)."""
+    if not activity_ids:
+        return {}
+    payloads = {
+        row.activity_id: decode_payload(row)
+        for row in db.query(ActivityPayload).filter(ActivityPayload.activity_id.in_(activity_ids))
+    }
+    missing = [activity_id for activity_id in activity_ids if activity_id not in payloads]
+    if missing:
+        payloads.update(
+            db.query(Activity.id, Activity.raw_data).filter(
+                Activity.id.in_(missing), Activity.raw_data.isnot(None)
+            ).all()
+        )
+    return payloads
+
+
+def load_raw_payload(db: Session, activity_id: str) -> Optional[Any]:
+    """An activity's provider payload, or None."""
+    return load_raw_payloads(db, [activity_id]).get(activity_id)
+
+
+def backfill_payloads(db: Session, batch_size: int = 500) -> int:
+    """
+    Move payloads still stored on activity rows into ``activity_payloads``.
+
+    ``updated_at`` is left alone so clients don't see every activity as changed.
+
+    Returns:
+        Number of activities migrated
+    """
+    moved = 0
+    while True:
+        batch = db.query(Activity.id, Activity.raw_data).filter(
+            Activity.raw_data.isnot(None)
+        ).order_by(Activity.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        stored = {
+            activity_id for (activity_id,) in db.query(ActivityPayload.activity_id).filter(
+                ActivityPayload.activity_id.in_([activity_id for activity_id, _ in batch])
+            )
+        }
+        for activity_id, payload in batch:
+            values = {'raw_data': null(), 'updated_at': Activity.updated_at}
+            if activity_id not in stored:
+                digest, size, blob = encode_payload(payload)
+                db.add(ActivityPayload(activity_id=activity_id, codec=CODEC, size=size, data=blob))
+                values['raw_data_hash'] = digest
+            db.execute(
+                update(Activity)
+                .where(Activity.id == activity_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+        moved += len(batch)
+        logger.info("raw_payloads_backfilled", batch=len(batch), total=moved)
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move raw provider payloads off the activities table.")
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Moved {backfill_payloads(db, args.batch_size):,} payloads")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Pre-rendered route thumbnails (small SVGs in object storage)."""
+
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.storage import get_storage
+from app.db.session import SessionLocal
+from app.models.activity_route import ActivityRoute
+from app.services.analytics.routes import decode_polyline, project
+
+logger = get_logger(__name__)
+
+THUMBNAIL_SIZE = 128
+THUMBNAIL_PADDING = 8
+THUMBNAIL_STROKE = "#fc4c02"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared thumbnail worker pool."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ROUTE_THUMBNAIL_WORKERS,
+                    thread_name_prefix="route-thumbnail"
+                )
+    return _executor
+
+
+def render_svg(latlng: List[List[float]], size: int = THUMBNAIL_SIZE, padding: int = THUMBNAIL_PADDING) -> str:
+    """Render a route as a square SVG path, north up, aspect ratio kept."""
+    points = np.asarray(latlng, dtype=np.float64)
+    xy = project(points)
+    xy[:, 1] = -xy[:, 1]  # SVG y grows downwards
+    xy -= xy.min(axis=0)
+
+    extent = max(float(xy.max()), 1e-9)
+    inner = size - 2 * padding
+    xy = xy * (inner / extent)
+    xy += padding + (inner - xy.max(axis=0)) / 2.0
+
+    path = "M" + "L".join(f"{x:.1f} {y:.1f}" for x, y in xy)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" width="{size}" height="{size}">'
+        f'<path d="{path}" fill="none" stroke="{THUMBNAIL_STROKE}" stroke-width="2" '
+        f'stroke-linecap="round" stroke-linejoin="round"/></svg>'
+    )
+
+
+def thumbnail_key(activity_id: str, summary_polyline: str) -> str:
+    digest = hashlib.sha1(summary_polyline.encode()).hexdigest()[:12]
+    return f"routes/{activity_id}/{digest}.svg"
+
+
+def render_and_store(activity_id: str, summary_polyline: str) -> str:
+    """Render one thumbnail and upload it; returns its storage key."""
+    key = thumbnail_key(activity_id, summary_polyline)
+    svg = render_svg(decode_polyline(summary_polyline))
+    get_storage().put(key, svg.encode(), "image/svg+xml")
+    return key
+
+
+def render_thumbnails(db: Session, activity_ids: Optional[List[str]] = None, limit: int = 500) -> int:
+    """
+    Render missing thumbnails on the worker pool and record their keys.
+
+    Args:
+        db: Database session
+        activity_ids: Restrict to these activities (default: any missing)
+        limit: Maximum thumbnails per call
+
+    Returns:
+        Number of thumbnails rendered
+    """
+    query = db.query(ActivityRoute).filter(ActivityRoute.thumbnail_key.is_(None))
+    if activity_ids is not None:
+        if not activity_ids:
+            return 0
+        query = query.filter(ActivityRoute.activity_id.in_(activity_ids))
+    routes = query.limit(limit).all()
+
+    futures = [
+        (route, get_executor().submit(render_and_store, route.activity_id, route.summary_polyline))
+        for route in routes
+    ]
+
+    rendered = 0
+    for route, future in futures:
+        try:
+            route.thumbnail_key = future.result()
+            rendered += 1
+        except Exception as e:
+            logger.error("route_thumbnail_failed", activity_id=route.activity_id, error=str(e))
+
+    db.commit()
+    return rendered
+
+
+def _render_in_background(activity_ids: List[str]) -> int:
+    db = SessionLocal()
+    try:
+        rendered = 0
+        for route in db.query(ActivityRoute).filter(
+            ActivityRoute.activity_id.in_(activity_ids),
+            ActivityRoute.thumbnail_key.is_(None)
+        ):
+            route.thumbnail_key = render_and_store(route.activity_id, route.summary_polyline)
+            rendered += 1
+        db.commit()
+        return rendered
+    except Exception as e:
+        logger.error("route_thumbnails_failed", activities=len(activity_ids), error=str(e))
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def submit_thumbnails(activity_ids: List[str]) -> Optional[Future]:
+    """Render thumbnails for freshly synced activities without blocking the caller."""
+    if not activity_ids:
+        return None
+    return get_executor().submit(_render_in_background, list(activity_ids))
@@ -0,0 +1,382 @@
+"""Activity synchronization from connected accounts."""
+
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.session import pin_primary
+from app.models.activity import Activity, ActivityType, DataQuality
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.notification import NotificationType
+from app.services import notification_service
+from app.services.analytics.metrics import BACKFILL_COLUMNS
+from app.services.analytics.pipeline import StageContext, process_activity, submit_reprocess
+from app.services.analytics.streams import STREAM_PROVIDERS, normalize_streams, save_streams
+from app.services.deduplication import resolve_duplicates
+from app.services.events import broker
+from app.services.raw_payloads import canonical_json, store_raw_payloads
+from app.services.route_thumbnails import submit_thumbnails
+from app.services.token_manager import token_manager
+from app.services.workout_matching import match_activities
+
+logger = get_logger(__name__)
+
+
+class SyncStatus:
+    """Values of ConnectedAccount.last_sync_status."""
+    IN_PROGRESS = "in_progress"
+    SUCCESS = "success"
+    FAILED = "failed"
+
+
+# Normalized fields copied onto Activity rows
+ACTIVITY_FIELDS = (
+    'provider', 'provider_activity_id', 'name', 'description', 'sport_type',
+    'start_date', 'timezone', 'duration_seconds', 'distance_meters', 'moving_time_seconds',
+    'elevation_gain_meters', 'elevation_loss_meters', 'avg_heart_rate', 'max_heart_rate',
+    'avg_power', 'max_power', 'normalized_power', 'avg_speed_mps', 'max_speed_mps',
+    'avg_cadence', 'avg_temperature', 'calories', 'start_latlng', 'end_latlng',
+    'is_manual', 'shared_with_coach', 'available_metrics',
+)
+
+# Providers whose list endpoint is paginated; the others return everything new at once
+PAGINATED_PROVIDERS = {Provider.STRAVA, Provider.COROS}
+
+# Fields the duplicate fingerprint is built from
+DEDUP_FIELDS = ('start_date', 'duration_seconds', 'distance_meters')
+
+# How far a provider may have moved an activity's start time since the last import
+UPSERT_START_DATE_SLACK = timedelta(days=7)
+
+
+def publish_sync_event(account: ConnectedAccount, status: str, **detail: Any) -> None:
+    """Push a sync status/progress event to the account owner's SSE connections."""
+    broker.publish(account.user_id, 'sync', {
+        'account_id': account.id,
+        'provider': account.provider,
+        'status': status,
+        **detail,
+    })
+
+
+def set_sync_status(db: Session, account: ConnectedAccount, status: str, **detail: Any) -> None:
+    """Record a sync status transition and publish it."""
+    account.last_sync_status = status
+    if status == SyncStatus.SUCCESS:
+        account.last_sync_at = datetime.utcnow()
+    db.commit()
+    # Reads during and right after a sync must see its writes
+    pin_primary(account.user_id)
+
+    publish_sync_event(account, status, **detail)
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _activity_values(normalized: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a connector's normalized activity onto Activity column values."""
+    values = {field: normalized.get(field) for field in ACTIVITY_FIELDS if field in normalized}
+
+    values['start_date'] = _to_naive_utc(normalized['start_date'])
+    values['activity_type'] = ActivityType[normalized['activity_type']]
+    if normalized.get('data_quality'):
+        values['data_quality'] = DataQuality[normalized['data_quality']]
+    if normalized.get('duration_seconds'):
+        values['end_date'] = values['start_date'] + timedelta(seconds=normalized['duration_seconds'])
+
+    return values
+
+
+def payload_hash(values: Dict[str, Any]) -> str:
+    """Hash of an activity's normalized column values (the raw payload is not included)."""
+    return hashlib.sha256(canonical_json(values)).hexdigest()
+
+
+def upsert_activities(
+    db: Session,
+    account: ConnectedAccount,
+    normalized_activities: List[Dict[str, Any]]
+) -> Dict[str, List]:
+    """
+    Insert new activities and update known ones, keyed by provider activity ID.
+
+    Args:
+        db: Database session
+        account: Connected account the activities came from
+        normalized_activities: Output of the connector's normalize_activity
+
+    New activities, and known ones whose start, duration or distance
+    changed, are checked against copies imported from other providers.
+    Known activities are looked up within UPSERT_START_DATE_SLACK of their
+    stored start time, then without the bound for IDs not found there. Known activities whose normalized values hash the same
+    as last time are not written at all (no updated_at/synced_at bump, and
+    their raw payload is not refreshed), so re-syncs of unchanged activities
+    cause no row churn or downstream invalidation. Updates keep the metric
+    columns the metrics stage filled when the provider sends none, and mark
+    that stage stale so ``sync_account`` can recompute it.
+
+    Returns:
+        Dict with 'created', 'updated' and 'duplicates' activity lists, and
+        'unchanged' activity IDs
+    """
+    created: List[Activity] = []
+    updated: List[Activity] = []
+    moved: List[Activity] = []
+    unchanged: List[str] = []
+
+    if not normalized_activities:
+        return {'created': created, 'updated': updated, 'duplicates': [], 'unchanged': unchanged}
+
+    batch = [_activity_values(normalized) for normalized in normalized_activities]
+    hashes = [payload_hash(values) for values in batch]
+    start_dates = [values['start_date'] for values in batch]
+
+    # Compare hashes first; only changed activities are loaded in full
+    provider_ids = [values['provider_activity_id'] for values in batch]
+    known_query = db.query(Activity.id, Activity.provider_activity_id, Activity.payload_hash).filter(
+        Activity.user_id == account.user_id
+    )
+    known = {
+        provider_activity_id: (activity_id, stored_hash)
+        for activity_id, provider_activity_id, stored_hash in known_query.filter(
+            Activity.provider_activity_id.in_(provider_ids),
+            # Prunes a start_date-partitioned table to the batch's partitions (app.db.partitioning)
+            Activity.start_date.between(
+                min(start_dates) - UPSERT_START_DATE_SLACK, max(start_dates) + UPSERT_START_DATE_SLACK
+            )
+        )
+    }
+    # An activity moved further than the slack is still known; inserting it
+    # again would break the unique provider ID (or, partitioned, duplicate it)
+    missing = [provider_id for provider_id in provider_ids if provider_id not in known]
+    if missing:
+        known.update(
+            (provider_activity_id, (activity_id, stored_hash))
+            for activity_id, provider_activity_id, stored_hash in known_query.filter(
+                Activity.provider_activity_id.in_(missing)
+            )
+        )
+    latest = dict(zip((values['provider_activity_id'] for values in batch), hashes))
+    changed_ids = [
+        activity_id for provider_activity_id, (activity_id, stored_hash) in known.items()
+        if stored_hash != latest[provider_activity_id]
+    ]
+    existing = {
+        a.provider_activity_id: a
+        for a in db.query(Activity).filter(Activity.id.in_(changed_ids))
+    } if changed_ids else {}
+
+    now = datetime.utcnow()
+    payloads = []
+    for values, digest, normalized in zip(batch, hashes, normalized_activities):
+        provider_activity_id = values['provider_activity_id']
+        activity = existing.get(provider_activity_id)
+
+        if activity is None and provider_activity_id in known:
+            unchanged.append(known[provider_activity_id][0])
+            continue
+
+        if activity is None:
+            activity = Activity(
+                id=str(uuid.uuid4()),
+                user_id=account.user_id,
+                connected_account_id=account.id,
+                synced_at=now,
+                payload_hash=digest,
+                **values
+            )
+            db.add(activity)
+            existing[provider_activity_id] = activity
+            created.append(activity)
+        else:
+            if any(field in values and values[field] != getattr(activity, field) for field in DEDUP_FIELDS):
+                moved.append(activity)
+            processed = dict(activity.processed_data or {})
+            metrics = processed.get('metrics') or {}
+            filled = set(processed.get('filled_columns') or ())
+            for field, value in values.items():
+                if field in BACKFILL_COLUMNS:
+                    if value is None:
+                        # Providers without the metric leave it to the stream metrics
+                        value = metrics.get(field)
+                    else:
+                        filled.discard(field)
+                setattr(activity, field, value)
+            if 'filled_columns' in processed:
+                processed['filled_columns'] = [c for c in BACKFILL_COLUMNS if c in filled]
+            if 'metrics' in (processed.get('stages') or {}):
+                processed['stages'] = {k: v for k, v in processed['stages'].items() if k != 'metrics'}
+            activity.processed_data = processed
+            activity.payload_hash = digest
+            activity.synced_at = now
+            updated.append(activity)
+        payloads.append((activity, normalized.get('raw_data')))
+
+    store_raw_payloads(db, payloads)
+    duplicates = resolve_duplicates(db, created + moved) if created or moved else []
+    db.commit()
+    return {'created': created, 'updated': updated, 'duplicates': duplicates, 'unchanged': unchanged}
+
+
+async def _fetch_page(
+    connector,
+    account: ConnectedAccount,
+    after: Optional[datetime],
+    page: int,
+    per_page: int
+) -> List[Dict[str, Any]]:
+    if account.provider == Provider.GARMIN:
+        # OAuth 1.0a: the token secret is stored in refresh_token
+        return await connector.get_activities(
+            account.access_token, account.refresh_token, after=after
+        )
+    return await connector.get_activities(
+        account.access_token, after=after, page=page, per_page=per_page
+    )
+
+
+async def fetch_and_store_streams(
+    db: Session,
+    account: ConnectedAccount,
+    connector,
+    activities: List[Activity]
+) -> int:
+    """
+    Download and store streams for activities and run the processing
+    pipeline over them. Route thumbnails are rendered in the background.
+
+    Returns:
+        Number of activities that had stream data
+    """
+    if account.provider not in STREAM_PROVIDERS:
+        return 0
+
+    context = StageContext(db)
+    routed: List[str] = []
+    stored = 0
+    for activity in activities:
+        access_token = await token_manager.get_access_token(db, account, connector)
+        payload = await connector.get_activity_streams(access_token, activity.provider_activity_id)
+        streams = normalize_streams(account.provider.value, payload)
+        if streams:
+            save_streams(db, activity.id, streams)
+            if process_activity(db, activity, streams, context).get('route') is not None:
+                routed.append(activity.id)
+            stored += 1
+
+    db.commit()
+    submit_thumbnails(routed)
+    return stored
+
+
+async def sync_account(
+    db: Session,
+    account: ConnectedAccount,
+    connector,
+    after: Optional[datetime] = None,
+    per_page: int = 100,
+    max_pages: Optional[int] = None,
+    fetch_streams: bool = True
+) -> Dict[str, Any]:
+    """
+    Pull activities for a connected account and store them.
+
+    Status transitions (in_progress -> success/failed) and per-page progress
+    are published as 'sync' events; a notification is sent when new
+    activities arrive or the sync fails.
+
+    Args:
+        db: Database session
+        account: Account to sync
+        connector: Provider connector instance
+        after: Only fetch activities after this date (defaults to last sync)
+        per_page: Page size for paginated providers
+        max_pages: Stop after this many pages
+        fetch_streams: Download streams for new activities
+
+    Returns:
+        Sync summary with created/updated/unchanged/matched/duplicates counts and
+        skip_rate, the fraction of fetched activities that were unchanged
+    """
+    after = after or account.last_sync_at
+    summary = {'created': 0, 'updated': 0, 'unchanged': 0, 'matched': 0, 'duplicates': 0, 'pages': 0}
+
+    set_sync_status(db, account, SyncStatus.IN_PROGRESS)
+    logger.info("sync_started", account_id=account.id, provider=account.provider)
+
+    try:
+        page = 1
+        while max_pages is None or page <= max_pages:
+            # Refreshes ahead of expiry so long syncs don't hit 401s mid-way
+            await token_manager.get_access_token(db, account, connector)
+            raw_activities = await _fetch_page(connector, account, after, page, per_page)
+            if not raw_activities:
+                break
+
+            result = upsert_activities(
+                db, account, [connector.normalize_activity(raw) for raw in raw_activities]
+            )
+            summary['created'] += len(result['created'])
+            summary['updated'] += len(result['updated'])
+            summary['unchanged'] += len(result['unchanged'])
+            summary['duplicates'] += len(result['duplicates'])
+            summary['pages'] = page
+
+            # Duplicates of another provider's copy need no streams or matching
+            canonical = [a for a in result['created'] if a.duplicate_of_id is None]
+            if fetch_streams and canonical:
+                await fetch_and_store_streams(db, account, connector, canonical)
+
+            summary['matched'] += len(match_activities(db, canonical))
+
+            # Updated activities keep their streams; recompute their metrics
+            stale = [a.id for a in result['updated'] if a.duplicate_of_id is None]
+            if stale:
+                submit_reprocess(['metrics'], user_id=account.user_id, activity_ids=stale)
+
+            publish_sync_event(account, SyncStatus.IN_PROGRESS, **summary)
+
+            if account.provider not in PAGINATED_PROVIDERS or len(raw_activities) < per_page:
+                break
+            page += 1
+
+    except Exception as e:
+        db.rollback()
+        logger.error("sync_failed", account_id=account.id, provider=account.provider, error=str(e))
+        set_sync_status(db, account, SyncStatus.FAILED, error=str(e), **summary)
+        notification_service.notify_users(
+            db,
+            [account.user_id],
+            NotificationType.SYNC_FAILED,
+            "Sync failed",
+            f"We couldn't sync your {account.provider.value.title()} activities.",
+            "/connections"
+        )
+        raise
+
+    fetched = summary['created'] + summary['updated'] + summary['unchanged']
+    summary['skip_rate'] = round(summary['unchanged'] / fetched, 3) if fetched else 0.0
+
+    set_sync_status(db, account, SyncStatus.SUCCESS, **summary)
+    logger.info("sync_completed", account_id=account.id, provider=account.provider, **summary)
+
+    if summary['created']:
+        notification_service.notify_users(
+            db,
+            [account.user_id],
+            NotificationType.SYNC_COMPLETED,
+            "Sync completed",
+            f"{summary['created']} new {account.provider.value.title()} "
+            f"activit{'y' if summary['created'] == 1 else 'ies'} imported.",
+            "/activities"
+        )
+
+    return summary
@@ -0,0 +1,201 @@
+"""Athlete threshold history (FTP, LTHR, threshold pace).
+
+Changing a threshold invalidates the zones of every activity it governs,
+which for a backdated entry can be years of streams. ``set_threshold`` and
+``delete_threshold`` only describe that work as a ``ZoneRecompute``;
+callers run it with ``run_recompute`` or queue it with ``submit_recompute``.
+"""
+
+import threading
+import uuid
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.athlete_threshold import AthleteThreshold, ThresholdMetric
+from app.services.analytics.zones import ZONE_KINDS, recompute_zones, zone_activities_query
+
+logger = get_logger(__name__)
+
+
+class ThresholdHistory:
+    """
+    Sorted threshold history of one athlete.
+
+    ``at`` returns the value in effect at a date. Dates before the first
+    entry use the first value, so a threshold set today also applies to
+    older activities until an earlier one is recorded.
+    """
+
+    def __init__(self, thresholds: Iterable[AthleteThreshold]):
+        self._dates: Dict[ThresholdMetric, List[datetime]] = {}
+        self._values: Dict[ThresholdMetric, List[float]] = {}
+        for t in sorted(thresholds, key=lambda t: t.effective_from):
+            self._dates.setdefault(t.metric, []).append(t.effective_from)
+            self._values.setdefault(t.metric, []).append(t.value)
+
+    def at(self, metric: ThresholdMetric, when: datetime) -> Optional[float]:
+        dates = self._dates.get(metric)
+        if not dates:
+            return None
+        return self._values[metric][max(bisect_right(dates, when) - 1, 0)]
+
+    def affected_range(
+        self,
+        metric: ThresholdMetric,
+        effective_from: datetime
+    ) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Dates whose value depends on the entry at ``effective_from``.
+
+        Returns:
+            (start, end) bounds; None means open-ended
+        """
+        dates = self._dates.get(metric, [])
+        position = bisect_right(dates, effective_from)
+        earlier = [d for d in dates[:position] if d != effective_from]
+        later = dates[position:]
+
+        start = effective_from if earlier else None
+        end = later[0] if later else None
+        return start, end
+
+
+def load_history(db: Session, user_id: str) -> ThresholdHistory:
+    """Load an athlete's threshold history (idx_thresholds_user_metric_effective)."""
+    return ThresholdHistory(
+        db.query(AthleteThreshold).filter(AthleteThreshold.user_id == user_id)
+    )
+
+
+def _zone_kinds(metric: ThresholdMetric) -> List[str]:
+    return [kind for kind, (m, _, _) in ZONE_KINDS.items() if m == metric]
+
+
+@dataclass(frozen=True)
+class ZoneRecompute:
+    """Zones to recompute after a threshold change: one athlete, some kinds, [start, end)."""
+    user_id: str
+    kinds: Tuple[str, ...]
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def _affected(user_id: str, metric: ThresholdMetric, effective_from: datetime,
+              before: ThresholdHistory, after: ThresholdHistory) -> ZoneRecompute:
+    # The union of the ranges the entry governed before and after the change
+    start_before, end_before = before.affected_range(metric, effective_from)
+    start_after, end_after = after.affected_range(metric, effective_from)
+    start = None if start_before is None or start_after is None else min(start_before, start_after)
+    end = None if end_before is None or end_after is None else max(end_before, end_after)
+
+    return ZoneRecompute(user_id, tuple(_zone_kinds(metric)), start, end)
+
+
+def pending_count(db: Session, job: ZoneRecompute) -> int:
+    """Number of activities a recompute will touch."""
+    return zone_activities_query(db, job.user_id, job.kinds, job.start, job.end).count()
+
+
+def run_recompute(db: Session, job: ZoneRecompute) -> int:
+    """
+    Recompute zones against the athlete's current threshold history.
+
+    Returns:
+        Number of activities recomputed
+    """
+    return recompute_zones(db, job.user_id, load_history(db, job.user_id), job.kinds, job.start, job.end)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _recompute_in_background(job: ZoneRecompute) -> int:
+    db = SessionLocal()
+    try:
+        return run_recompute(db, job)
+    except Exception as e:
+        logger.error("zone_recompute_failed", user_id=job.user_id, kinds=job.kinds, error=str(e))
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+
+def submit_recompute(job: ZoneRecompute) -> Future:
+    """
+    Recompute zones in a background thread.
+
+    One worker, so jobs run in submission order; each reads the history as
+    it is when it runs, so the last one leaves zones matching the latest
+    thresholds.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zone-recompute")
+    return _executor.submit(_recompute_in_background, job)
+
+
+def set_threshold(
+    db: Session,
+    user_id: str,
+    metric: ThresholdMetric,
+    value: float,
+    effective_from: datetime
+) -> Tuple[AthleteThreshold, ZoneRecompute]:
+    """
+    Record a threshold. An aware ``effective_from`` is stored as naive UTC,
+    like activity start dates.
+
+    Returns:
+        The threshold row and the zone recompute for the dates it governs
+    """
+    if effective_from.tzinfo is not None:
+        effective_from = effective_from.astimezone(timezone.utc).replace(tzinfo=None)
+    before = load_history(db, user_id)
+
+    threshold = db.query(AthleteThreshold).filter(
+        AthleteThreshold.user_id == user_id,
+        AthleteThreshold.metric == metric,
+        AthleteThreshold.effective_from == effective_from
+    ).first()
+
+    if threshold is None:
+        threshold = AthleteThreshold(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            metric=metric,
+            effective_from=effective_from
+        )
+        db.add(threshold)
+    threshold.value = value
+    db.commit()
+
+    job = _affected(user_id, metric, effective_from, before, load_history(db, user_id))
+    logger.info("threshold_set", user_id=user_id, metric=metric, value=value, start=job.start, end=job.end)
+    return threshold, job
+
+
+def delete_threshold(db: Session, threshold: AthleteThreshold) -> ZoneRecompute:
+    """
+    Delete a threshold.
+
+    Returns:
+        The zone recompute for the dates it governed
+    """
+    user_id, metric, effective_from = threshold.user_id, threshold.metric, threshold.effective_from
+    before = load_history(db, user_id)
+
+    db.delete(threshold)
+    db.commit()
+
+    return _affected(user_id, metric, effective_from, before, load_history(db, user_id))
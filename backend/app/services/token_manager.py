@@ -0,0 +1,264 @@
+"""Proactive OAuth token refresh for connected accounts.
+
+Accounts are kept in a min-heap ordered by ``token_expires_at``; a periodic
+pass pops everything expiring within the margin and refreshes it in batches.
+Callers that need a token go through ``get_access_token``, which refreshes
+on demand when the token is (nearly) expired.
+
+At most one refresh per account is in flight: concurrent callers in the
+process await the same future, and across processes a Redis ``SET NX``
+lock makes the others wait and re-read the token the winner stored.
+Refresh tokens are often single-use, so a second concurrent refresh would
+invalidate the first.
+
+``run`` is the background loop; the API starts it in its lifespan unless
+``TOKEN_REFRESH_ENABLED`` is off.
+"""
+
+import asyncio
+import heapq
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.models.connected_account import ConnectedAccount, Provider
+
+logger = get_logger(__name__)
+
+# Providers with expiring OAuth 2.0 tokens (Polar tokens don't expire; Garmin is OAuth 1.0a)
+REFRESHABLE_PROVIDERS = {Provider.STRAVA, Provider.COROS}
+
+LOCK_TTL_SECONDS = 30
+LOCK_POLL_SECONDS = 0.2
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def lock_key(account_id: str) -> str:
+    return f"token_refresh:{account_id}"
+
+
+def get_connector(provider: Provider):
+    """Connector instance for a provider."""
+    if provider == Provider.STRAVA:
+        from app.services.connectors.strava_connector import StravaConnector
+        return StravaConnector()
+    if provider == Provider.COROS:
+        from app.services.connectors.coros_connector import CorosConnector
+        return CorosConnector()
+    raise ValueError(f"No token refresh for provider {provider}")
+
+
+class TokenManager:
+    """Expiry-ordered, single-flight token refresher."""
+
+    def __init__(
+        self,
+        connector_factory: Callable[[Provider], object] = get_connector,
+        session_factory: Callable[[], Session] = SessionLocal,
+        margin_seconds: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.connector_factory = connector_factory
+        self.session_factory = session_factory
+        self.margin_seconds = settings.TOKEN_REFRESH_MARGIN_SECONDS if margin_seconds is None else margin_seconds
+        self.batch_size = batch_size or settings.TOKEN_REFRESH_BATCH_SIZE
+
+        self._heap: List[Tuple[int, str]] = []
+        # Latest known expiry per account; heap entries that disagree are stale
+        self._expiry: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def needs_refresh(self, account: ConnectedAccount, now: Optional[float] = None) -> bool:
+        if account.provider not in REFRESHABLE_PROVIDERS or not account.token_expires_at:
+            return False
+        now = time.time() if now is None else now
+        return account.token_expires_at <= now + self.margin_seconds
+
+    def track(self, account: ConnectedAccount) -> None:
+        """Add or re-key an account in the expiry heap."""
+        if account.provider not in REFRESHABLE_PROVIDERS or not account.token_expires_at:
+            self._expiry.pop(account.id, None)
+            return
+        if self._expiry.get(account.id) == account.token_expires_at:
+            return
+        self._expiry[account.id] = account.token_expires_at
+        heapq.heappush(self._heap, (account.token_expires_at, account.id))
+
+    def load(self, db: Session) -> int:
+        """Index every active account with an expiring token."""
+        accounts = db.query(ConnectedAccount).filter(
+            ConnectedAccount.is_active.is_(True),
+            ConnectedAccount.provider.in_(list(REFRESHABLE_PROVIDERS)),
+            ConnectedAccount.token_expires_at.isnot(None)
+        )
+        count = 0
+        for account in accounts:
+            self.track(account)
+            count += 1
+        return count
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Pop the accounts whose tokens expire within the margin."""
+        deadline = (time.time() if now is None else now) + self.margin_seconds
+        ids = []
+        while self._heap and self._heap[0][0] <= deadline:
+            expires_at, account_id = heapq.heappop(self._heap)
+            if self._expiry.get(account_id) == expires_at:
+                del self._expiry[account_id]
+                ids.append(account_id)
+        return ids
+
+    async def get_access_token(self, db: Session, account: ConnectedAccount, connector=None) -> str:
+        """Current access token, refreshed first if it is about to expire."""
+        if not self.needs_refresh(account):
+            return account.access_token
+        return await self.refresh(db, account, connector)
+
+    async def refresh(self, db: Session, account: ConnectedAccount, connector=None) -> str:
+        """Refresh an account's token; concurrent callers share one refresh."""
+        inflight = self._inflight.get(account.id)
+        if inflight is not None:
+            token = await asyncio.shield(inflight)
+            db.refresh(account)
+            return token
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[account.id] = future
+        try:
+            token = await self._refresh_locked(db, account, connector or self.connector_factory(account.provider))
+            future.set_result(token)
+            return token
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an unawaited failure isn't reported as never retrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[account.id]
+
+    async def _refresh_locked(self, db: Session, account: ConnectedAccount, connector) -> str:
+        client = cache.redis
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_TTL_SECONDS
+
+        while client is not None:
+            try:
+                # The redis client is synchronous; keep its round trips off the event loop
+                if await asyncio.to_thread(client.set, lock_key(account.id), owner, nx=True, ex=LOCK_TTL_SECONDS):
+                    break
+            except redis.RedisError as e:
+                logger.warning("token_lock_unavailable", account_id=account.id, error=str(e))
+                client = None
+                break
+
+            # Another process is refreshing: wait for it, then use its token
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            db.refresh(account)
+            if not self.needs_refresh(account):
+                self.track(account)
+                return account.access_token
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for token refresh of account {account.id}")
+
+        try:
+            # The token may have been refreshed between our check and the lock
+            db.refresh(account)
+            if not self.needs_refresh(account):
+                self.track(account)
+                return account.access_token
+
+            tokens = await connector.refresh_access_token(account.refresh_token)
+            account.access_token = tokens['access_token']
+            if tokens.get('refresh_token'):
+                account.refresh_token = tokens['refresh_token']
+            account.token_expires_at = int(tokens['expires_at'])
+            db.commit()
+
+            self.track(account)
+            logger.info("token_refreshed", account_id=account.id, provider=account.provider,
+                        expires_at=account.token_expires_at)
+            return account.access_token
+        finally:
+            if client is not None:
+                try:
+                    await asyncio.to_thread(client.eval, _RELEASE_LOCK, 1, lock_key(account.id), owner)
+                except redis.RedisError as e:
+                    logger.warning("token_lock_release_failed", account_id=account.id, error=str(e))
+
+    async def _refresh_by_id(self, account_id: str) -> Optional[str]:
+        # Sessions aren't safe to share between concurrent refreshes; each gets its own
+        db = self.session_factory()
+        try:
+            account = db.get(ConnectedAccount, account_id)
+            if account is None or not account.is_active:
+                return None
+            return await self.refresh(db, account)
+        finally:
+            db.close()
+
+    async def refresh_due(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Refresh every account expiring within the margin, ``batch_size`` at a time.
+
+        Accounts in a batch are refreshed concurrently, each with its own
+        session. Failed accounts are left out of the heap until they are
+        tracked again (e.g. by the next sync or ``load``).
+
+        Returns:
+            Dict with 'refreshed' and 'failed' counts
+        """
+        ids = self.due(now)
+        result = {'refreshed': 0, 'failed': 0}
+
+        for offset in range(0, len(ids), self.batch_size):
+            batch = ids[offset:offset + self.batch_size]
+            outcomes = await asyncio.gather(
+                *(self._refresh_by_id(account_id) for account_id in batch), return_exceptions=True
+            )
+            for account_id, outcome in zip(batch, outcomes):
+                if isinstance(outcome, Exception):
+                    result['failed'] += 1
+                    logger.error("token_refresh_failed", account_id=account_id, error=str(outcome))
+                elif outcome is not None:
+                    result['refreshed'] += 1
+
+        return result
+
+    async def run(self, interval: Optional[int] = None) -> None:
+        """Refresh loop for a background task; runs until cancelled."""
+        interval = interval or settings.TOKEN_REFRESH_INTERVAL_SECONDS
+        loaded = False
+
+        while True:
+            try:
+                if not loaded:
+                    db = self.session_factory()
+                    try:
+                        self.load(db)
+                    finally:
+                        db.close()
+                    loaded = True
+                result = await self.refresh_due()
+                if result['refreshed'] or result['failed']:
+                    logger.info("token_refresh_pass", **result)
+            except Exception as e:
+                # One bad pass (e.g. the database is down) must not end the loop
+                logger.error("token_refresh_pass_failed", error=str(e))
+            await asyncio.sleep(interval)
+
+
+token_manager = TokenManager()
@@ -0,0 +1,253 @@
+"""Link synced activities to the athlete's planned workouts."""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.models.activity import Activity, ActivityType
+from app.models.workout import Workout, WorkoutStatus
+
+logger = get_logger(__name__)
+
+# Workout.workout_type values (lower-cased) accepted for each activity type
+WORKOUT_TYPE_ALIASES = {
+    ActivityType.RUN: {'run', 'running', 'trail_run', 'track', 'treadmill'},
+    ActivityType.RIDE: {'ride', 'bike', 'cycling', 'cycle', 'indoor_ride'},
+    ActivityType.SWIM: {'swim', 'swimming', 'open_water'},
+    ActivityType.WORKOUT: {'workout', 'strength', 'gym', 'crossfit', 'cross_training'},
+    ActivityType.WALK: {'walk', 'walking'},
+    ActivityType.HIKE: {'hike', 'hiking'},
+}
+
+# Minimum score for a link
+MIN_SCORE = 0.5
+
+# Score when type matches but neither duration nor distance can be compared
+TYPE_ONLY_SCORE = 0.6
+
+DayKey = Tuple[str, date]
+
+
+def _type_compatible(workout_type: Optional[str], activity_type: ActivityType) -> bool:
+    if not workout_type:
+        return False
+    workout_type = workout_type.lower()
+    return workout_type == activity_type.value or workout_type in WORKOUT_TYPE_ALIASES.get(activity_type, ())
+
+
+def _ratio(actual: Optional[float], target: Optional[float]) -> Optional[float]:
+    if not actual or not target:
+        return None
+    return min(actual, target) / max(actual, target)
+
+
+def score_candidate(workout: Workout, activity: Activity) -> float:
+    """
+    Score how well an activity fulfils a planned workout (0-1).
+
+    The types must be compatible; duration and distance ratios are averaged
+    when the workout sets targets for them.
+    """
+    if not _type_compatible(workout.workout_type, activity.activity_type):
+        return 0.0
+
+    ratios = [
+        r for r in (
+            _ratio(activity.duration_seconds, workout.target_duration),
+            _ratio(activity.distance_meters, workout.target_distance),
+        )
+        if r is not None
+    ]
+
+    if not ratios:
+        return TYPE_ONLY_SCORE
+    return sum(ratios) / len(ratios)
+
+
+@lru_cache(maxsize=512)
+def _zone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """ZoneInfo for an IANA name, also in Strava's "(GMT-08:00) America/Los_Angeles" form."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name.rsplit(') ', 1)[-1].strip())
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def local_day(activity: Activity) -> date:
+    """
+    Calendar day the activity started on where it was recorded.
+
+    Planned workouts are scheduled on the athlete's local calendar, so an
+    evening run west of UTC must not land on the next day's workout.
+    Falls back to the UTC day when the timezone is missing or unknown.
+    """
+    start = activity.start_date
+    zone = _zone(activity.timezone)
+    if zone is None:
+        return start.date()
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    return start.astimezone(zone).date()
+
+
+class PlannedWorkoutIndex:
+    """Unlinked planned workouts keyed by (athlete_id, scheduled day)."""
+
+    def __init__(self, workouts: Iterable[Workout] = ()):
+        self._by_day: Dict[DayKey, List[Workout]] = defaultdict(list)
+        for workout in workouts:
+            self.add(workout)
+
+    @classmethod
+    def load(cls, db: Session, athlete_ids: Iterable[str], start: date, end: date) -> "PlannedWorkoutIndex":
+        """Load planned workouts for athletes between two days (inclusive)."""
+        workouts = db.query(Workout).filter(
+            Workout.athlete_id.in_(list(athlete_ids)),
+            Workout.status == WorkoutStatus.PLANNED,
+            Workout.scheduled_date >= datetime.combine(start, datetime.min.time()),
+            Workout.scheduled_date < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+            Workout.activity_id.is_(None)
+        )
+        return cls(workouts)
+
+    def add(self, workout: Workout) -> None:
+        self._by_day[(workout.athlete_id, workout.scheduled_date.date())].append(workout)
+
+    def remove(self, workout: Workout) -> None:
+        key = (workout.athlete_id, workout.scheduled_date.date())
+        candidates = self._by_day.get(key)
+        if candidates and workout in candidates:
+            candidates.remove(workout)
+            if not candidates:
+                del self._by_day[key]
+
+    def candidates(self, athlete_id: str, day: date) -> List[Workout]:
+        return self._by_day.get((athlete_id, day), [])
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_day.values())
+
+
+def _link(workout: Workout, activity: Activity) -> None:
+    workout.activity_id = activity.id
+    workout.status = WorkoutStatus.COMPLETED
+    if activity.end_date:
+        workout.completed_at = activity.end_date
+    elif activity.duration_seconds:
+        workout.completed_at = activity.start_date + timedelta(seconds=activity.duration_seconds)
+    else:
+        workout.completed_at = activity.start_date
+
+
+def _assign_day(index: PlannedWorkoutIndex, key: DayKey, activities: List[Activity]) -> List[Tuple[Activity, Workout, float]]:
+    """Greedily pair a day's activities and candidates, best score first."""
+    candidates = index.candidates(*key)
+    if not candidates:
+        return []
+
+    pairs = sorted(
+        (
+            (score_candidate(w, a), a, w)
+            for a in activities
+            for w in candidates
+        ),
+        key=lambda p: p[0],
+        reverse=True
+    )
+
+    matched = []
+    used_activities, used_workouts = set(), set()
+    for score, activity, workout in pairs:
+        if score < MIN_SCORE:
+            break
+        if activity.id in used_activities or workout.id in used_workouts:
+            continue
+        used_activities.add(activity.id)
+        used_workouts.add(workout.id)
+        matched.append((activity, workout, score))
+
+    for _, workout, _ in matched:
+        index.remove(workout)
+    return matched
+
+
+def match_activities(
+    db: Session,
+    activities: List[Activity],
+    index: Optional[PlannedWorkoutIndex] = None
+) -> List[Tuple[Activity, Workout, float]]:
+    """
+    Link activities to planned workouts on the same (local) day.
+
+    Works for a single webhook activity or a whole backfill: planned
+    workouts for the covered days are loaded with one indexed query, and
+    each activity is only compared with that day's candidates.
+
+    Args:
+        db: Database session
+        activities: Activities to match
+        index: Pre-loaded index (loaded from the database when omitted)
+
+    Returns:
+        (activity, workout, score) for each link made
+    """
+    if not activities:
+        return []
+
+    already_linked = {
+        activity_id for (activity_id,) in db.query(Workout.activity_id).filter(
+            Workout.activity_id.in_([a.id for a in activities])
+        )
+    }
+    pending = [a for a in activities if a.id not in already_linked]
+    if not pending:
+        return []
+
+    if index is None:
+        days = [local_day(a) for a in pending]
+        index = PlannedWorkoutIndex.load(db, {a.user_id for a in pending}, min(days), max(days))
+
+    by_day: Dict[DayKey, List[Activity]] = defaultdict(list)
+    for activity in pending:
+        by_day[(activity.user_id, local_day(activity))].append(activity)
+
+    matched = []
+    for key, day_activities in by_day.items():
+        matched.extend(_assign_day(index, key, day_activities))
+
+    for activity, workout, _ in matched:
+        _link(workout, activity)
+
+    if matched:
+        db.commit()
+
+    logger.info("workouts_matched", activities=len(activities), matched=len(matched))
+    return matched
+
+
+def match_history(
+    db: Session,
+    user_id: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> int:
+    """
+    Match an athlete's stored activities, e.g. after a historical backfill.
+
+    Returns:
+        Number of workouts linked
+    """
+    query = db.query(Activity).filter(Activity.user_id == user_id, Activity.duplicate_of_id.is_(None))
+    if start is not None:
+        query = query.filter(Activity.start_date >= start)
+    if end is not None:
+        query = query.filter(Activity.start_date < end)
+
+    return len(match_activities(db, query.order_by(Activity.start_date).all()))
@@ -0,0 +1,48 @@
+"""Shared test fixtures."""
+
+import os
+
+# Settings require these at import time; tests never talk to the real database.
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# Always the in-process cache: fixtures clear it, which a shared Redis refuses
+os.environ["REDIS_URL"] = ""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.cache import cache
+from app.db.base import Base
+
+
+@pytest.fixture
+def db_engine():
+    """Provide an in-memory SQLite engine with all tables created."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Provide a database session bound to the in-memory engine."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Reset the in-process cache between tests."""
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,57 @@
+"""Delta sync endpoint tests."""
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_db
+from app.api.v1 import changes
+from app.models.activity import Activity, ActivityType
+from app.models.user import User
+from app.models.workout import Workout
+
+
+@pytest.fixture
+def client(db_session):
+    user = User(id="user_1", email="a@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.add(Activity(
+        id="act_1", user_id="user_1", provider="STRAVA", provider_activity_id="1", name="Run",
+        activity_type=ActivityType.RUN, start_date=datetime(2024, 1, 15, 8), raw_data={},
+    ))
+    db_session.add(Workout(
+        id="w_1", created_by="user_1", athlete_id="user_1", title="Easy", workout_type="run",
+        scheduled_date=datetime(2024, 1, 15),
+    ))
+    db_session.commit()
+
+    app = FastAPI()
+    app.include_router(changes.router, prefix="/api/v1/changes")
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+class TestChangesEndpoint:
+    """Test suite for GET /changes."""
+
+    def test_bootstrap_then_delete(self, client, db_session):
+        """Test the feed serves list items and then the deletion."""
+        first = client.get("/api/v1/changes/").json()
+        assert [a["id"] for a in first["activities"]["updated"]] == ["act_1"]
+        assert first["activities"]["updated"][0]["updated_at"]
+        assert [w["title"] for w in first["workouts"]["updated"]] == ["Easy"]
+
+        db_session.delete(db_session.get(Workout, "w_1"))
+        db_session.commit()
+
+        second = client.get("/api/v1/changes/", params={"since": first["token"]}).json()
+        assert second["workouts"]["deleted"] == ["w_1"]
+        assert not second["reset"]
+
+    def test_invalid_token(self, client):
+        """Test an undecodable token is a 400."""
+        response = client.get("/api/v1/changes/", params={"since": "garbage"})
+        assert response.status_code == 400
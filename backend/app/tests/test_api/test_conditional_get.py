@@ -0,0 +1,125 @@
+"""Conditional GET (ETag / If-None-Match) tests for activity and workout endpoints."""
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_db
+from app.api.v1 import activities, workouts
+from app.core.cache import Cache
+from app.models.activity import Activity, ActivityType
+from app.models.activity_route import ActivityRoute
+from app.models.user import User
+from app.models.workout import Workout
+from app.services import collection_versions
+
+
+@pytest.fixture
+def user(db_session):
+    user = User(id="user_1", email="a@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.add(Activity(
+        id="act_1", user_id="user_1", provider="STRAVA", provider_activity_id="1", name="Run",
+        activity_type=ActivityType.RUN, start_date=datetime(2024, 1, 15, 8), raw_data={},
+    ))
+    db_session.add(Workout(
+        id="w_1", created_by="user_1", athlete_id="user_1", title="Easy", workout_type="run",
+        scheduled_date=datetime(2024, 1, 15),
+    ))
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def client(db_session, user):
+    app = FastAPI()
+    app.include_router(activities.router, prefix="/api/v1/activities")
+    app.include_router(workouts.router, prefix="/api/v1/workouts")
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """Treat the in-process cache as shared, so lists use the version counters."""
+    monkeypatch.setattr(Cache, "is_shared", property(lambda self: True))
+
+
+def revalidate(client, url):
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    return etag, client.get(url, headers={"If-None-Match": etag})
+
+
+class TestConditionalGet:
+    """Test suite for ETag validators."""
+
+    @pytest.mark.parametrize("url", [
+        "/api/v1/activities/", "/api/v1/activities/act_1", "/api/v1/workouts/", "/api/v1/workouts/w_1",
+    ])
+    def test_unchanged_is_not_modified(self, client, url):
+        """Test a repeat request with the ETag gets an empty 304."""
+        etag, second = revalidate(client, url)
+        assert second.status_code == 304
+        assert second.headers["ETag"] == etag
+        assert second.content == b""
+
+    def test_list_query_params_in_validator(self, client):
+        """Test different pages don't share a validator."""
+        etag, _ = revalidate(client, "/api/v1/activities/")
+        other = client.get("/api/v1/activities/?limit=10", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+    def test_activity_write_invalidates(self, client, db_session):
+        """Test committing an activity change bumps the list and detail validators."""
+        list_etag, _ = revalidate(client, "/api/v1/activities/")
+        detail_etag, _ = revalidate(client, "/api/v1/activities/act_1")
+
+        activity = db_session.get(Activity, "act_1")
+        activity.name = "Long run"
+        db_session.commit()
+
+        assert client.get("/api/v1/activities/", headers={"If-None-Match": list_etag}).status_code == 200
+        response = client.get("/api/v1/activities/act_1", headers={"If-None-Match": detail_etag})
+        assert response.status_code == 200
+        assert response.json()["name"] == "Long run"
+
+    def test_route_write_invalidates_list(self, client, db_session):
+        """Test a new route (shown as the list thumbnail) bumps the activities version."""
+        etag, _ = revalidate(client, "/api/v1/activities/")
+        db_session.expunge_all()
+        db_session.add(ActivityRoute(
+            activity_id="act_1", summary_polyline="abc", detail_polyline="abc", point_count=2,
+        ))
+        db_session.commit()
+
+        assert client.get("/api/v1/activities/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_rollback_does_not_bump(self, db_session, user):
+        """Test versions only move when the transaction commits."""
+        version = collection_versions.get_version(collection_versions.WORKOUTS, "user_1")
+        db_session.get(Workout, "w_1").title = "Tempo"
+        db_session.flush()
+        db_session.rollback()
+        assert collection_versions.get_version(collection_versions.WORKOUTS, "user_1") == version
+
+        db_session.get(Workout, "w_1").title = "Tempo"
+        db_session.commit()
+        assert collection_versions.get_version(collection_versions.WORKOUTS, "user_1") == version + 1
+
+    def test_evicted_version_not_reused(self, client, shared_cache):
+        """Test a re-initialised version never matches an old ETag."""
+        etag, _ = revalidate(client, "/api/v1/workouts/")
+        collection_versions.cache.delete("collection_version:workouts:user_1")
+        assert client.get("/api/v1/workouts/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_unshared_cache_validates_rows(self, client, db_session):
+        """Test a write no local listener saw (another worker's) still changes the list ETag."""
+        etag, _ = revalidate(client, "/api/v1/workouts/")
+        db_session.query(Workout).filter(Workout.id == "w_1").update({Workout.title: "Tempo"})
+        db_session.commit()
+        assert client.get("/api/v1/workouts/", headers={"If-None-Match": etag}).status_code == 200
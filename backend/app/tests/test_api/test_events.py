@@ -0,0 +1,34 @@
+"""Event stream ticket tests."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user
+from app.api.v1 import events
+from app.core.cache import cache
+from app.models.user import User
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(events.router, prefix="/api/v1/events")
+    app.dependency_overrides[get_current_user] = lambda: User(id="user_1", email="a@example.com")
+    return TestClient(app)
+
+
+class TestStreamTickets:
+    """Test suite for SSE stream tickets."""
+
+    def test_ticket_issued_for_current_user(self, client):
+        """Test a ticket maps to the authenticated user and is redeemed once."""
+        ticket = client.post("/api/v1/events/ticket").json()["ticket"]
+
+        assert cache.pop(f"sse_ticket:{ticket}") == "user_1"
+        assert client.get("/api/v1/events/stream", params={"ticket": ticket}).status_code == 401
+
+    def test_stream_rejects_unknown_ticket(self, client):
+        """Test the stream refuses a missing or made-up ticket."""
+        assert client.get("/api/v1/events/stream").status_code == 422
+        assert client.get("/api/v1/events/stream", params={"ticket": "nope"}).status_code == 401
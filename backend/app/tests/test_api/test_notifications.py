@@ -0,0 +1,69 @@
+"""Notification endpoint tests."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_coach, get_current_user, get_db
+from app.api.v1 import notifications
+from app.models.athlete_coach import AthleteCoach, CoachingStatus
+from app.models.notification import Notification, NotificationType
+from app.models.user import User
+from app.services import notification_service
+
+
+@pytest.fixture
+def users(db_session):
+    coach = User(id="coach", email="coach@example.com", hashed_password="x")
+    athlete = User(id="athlete", email="athlete@example.com", hashed_password="x")
+    db_session.add_all([coach, athlete])
+    db_session.add(AthleteCoach(
+        id="link_1", athlete_id="athlete", coach_id="coach", status=CoachingStatus.ACTIVE
+    ))
+    db_session.commit()
+    return coach, athlete
+
+
+@pytest.fixture
+def client(db_session, users):
+    coach, _ = users
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/api/v1/notifications")
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_current_user] = lambda: coach
+    app.dependency_overrides[get_current_coach] = lambda: coach
+    return TestClient(app)
+
+
+class TestNotificationEndpoints:
+    """Test suite for the notification API."""
+
+    def test_mark_read_unknown_is_404(self, client):
+        """Test marking an unknown notification as read is a 404."""
+        assert client.post("/api/v1/notifications/missing/read").status_code == 404
+
+    def test_mark_read_other_users_is_404(self, client, db_session, users):
+        """Test a notification belonging to another user is not found."""
+        _, athlete = users
+        created = notification_service.notify_users(
+            db_session, [athlete.id], NotificationType.SYNC_COMPLETED, "Sync", "Done"
+        )
+
+        response = client.post(f"/api/v1/notifications/{created[0]['id']}/read")
+
+        assert response.status_code == 404
+        assert db_session.get(Notification, created[0]['id']).is_read is False
+
+    def test_broadcast_reads_body(self, client, db_session, users):
+        """Test broadcast takes title and message from the JSON body."""
+        _, athlete = users
+
+        response = client.post(
+            "/api/v1/notifications/broadcast",
+            json={"title": "Race week", "message": "Taper starts today"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"recipients": 1}
+        row = db_session.query(Notification).filter(Notification.user_id == athlete.id).one()
+        assert (row.title, row.message) == ("Race week", "Taper starts today")
@@ -0,0 +1,91 @@
+"""Query plan checks for the hot list endpoints.
+
+Each list query must be answered from a composite index: no full table
+scan and no separate sort step for ORDER BY.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import and_, or_, text
+
+from app.api.v1.activities import build_activities_query
+from app.api.v1.workouts import build_workouts_query
+from app.models.activity import Activity, ActivityType
+from app.models.notification import Notification
+from app.models.workout import Workout, WorkoutStatus
+from app.services.notification_service import build_notifications_query
+
+
+def explain(session, query) -> list:
+    """Return the SQLite query plan details for an ORM query."""
+    sql = query.statement.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True}
+    )
+    rows = session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return [row[-1] for row in rows]
+
+
+def assert_index_only_plan(plan: list, index_name: str) -> None:
+    """Fail on full scans, temp sorts, or an unexpected index."""
+    joined = " | ".join(plan)
+    assert not any(step.startswith("SCAN") for step in plan), joined
+    assert "USE TEMP B-TREE" not in joined, joined
+    assert index_name in joined, joined
+
+
+class TestListQueryPlans:
+    """Test suite for list endpoint query plans."""
+
+    def test_activities_list(self, db_session):
+        """Test activity list uses the (user_id, start_date) index."""
+        query = build_activities_query(db_session, "user_123").limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_activities_user_start_date")
+
+    def test_activities_list_by_type(self, db_session):
+        """Test activity list filtered by type uses the type-aware index."""
+        query = build_activities_query(db_session, "user_123", ActivityType.RUN).limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_activities_user_type_start_date")
+
+    def test_workouts_list(self, db_session):
+        """Test workout list uses the (athlete_id, scheduled_date) index."""
+        query = build_workouts_query(db_session, "user_123").limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_workouts_athlete_scheduled_date")
+
+    @pytest.mark.parametrize("status_filter", [WorkoutStatus.PLANNED, WorkoutStatus.COMPLETED])
+    def test_workouts_list_by_status(self, db_session, status_filter):
+        """Test workout list filtered by status uses the status-aware index."""
+        query = build_workouts_query(db_session, "user_123", status_filter).limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_workouts_athlete_status_scheduled_date")
+
+    def test_notifications_feed(self, db_session):
+        """Test notification feed uses the (user_id, created_at) index."""
+        query = build_notifications_query(db_session, "user_123").limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_notifications_user_created_at")
+
+    def test_notifications_feed_page(self, db_session):
+        """Test the (created_at, id) keyset page stays on the feed index."""
+        query = build_notifications_query(
+            db_session, "user_123", before=datetime(2024, 1, 1), before_id="n1"
+        ).limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_notifications_user_created_at")
+
+    def test_unread_notifications(self, db_session):
+        """Test unread notification feed uses the (user_id, is_read, created_at) index."""
+        query = build_notifications_query(db_session, "user_123", unread_only=True).limit(50)
+        assert_index_only_plan(explain(db_session, query), "idx_notifications_user_read_created_at")
+
+    @pytest.mark.parametrize("model,owner,index_name", [
+        (Activity, "user_id", "idx_activities_user_updated_at"),
+        (Workout, "athlete_id", "idx_workouts_athlete_updated_at"),
+        (Notification, "user_id", "idx_notifications_user_updated_at"),
+    ])
+    def test_delta_sync_keyset(self, db_session, model, owner, index_name):
+        """Test the changes feed reads each collection in (updated_at, id) index order."""
+        query = db_session.query(model).filter(getattr(model, owner) == "user_123")
+        ts, last_id = datetime(2024, 1, 1), "id_1"
+        query = query.filter(
+            or_(model.updated_at > ts, and_(model.updated_at == ts, model.id > last_id))
+        ).order_by(model.updated_at, model.id).limit(201)
+        assert_index_only_plan(explain(db_session, query), index_name)
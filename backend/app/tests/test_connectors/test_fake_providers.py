@@ -0,0 +1,155 @@
+"""End-to-end sync tests against the local fake provider APIs."""
+
+import time
+
+import httpx
+import pytest
+
+from app.models.activity import Activity
+from app.models.activity_stream import ActivityStream
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.user import User
+from app.services import sync_service
+from app.services.connectors import resilience
+from app.services.connectors.coros_connector import CorosConnector
+from app.services.connectors.garmin_connector import GarminConnector
+from app.services.connectors.polar_connector import PolarConnector
+from app.services.connectors.resilience import RetryPolicy
+from app.services.connectors.strava_connector import StravaConnector
+from benchmarks.fake_providers import FakeProviderConfig, attach, create_app, garmin_token_secret
+
+CONNECTORS = {
+    Provider.STRAVA: StravaConnector,
+    Provider.POLAR: PolarConnector,
+    Provider.GARMIN: GarminConnector,
+    Provider.COROS: CorosConnector,
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    resilience._breakers.clear()
+    monkeypatch.setattr(sync_service, 'submit_thumbnails', lambda ids: None)
+    yield
+    resilience._breakers.clear()
+
+
+@pytest.fixture
+def user(db_session):
+    user = User(id="user_1", email="a@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def connect(db_session, provider: Provider, token: str = "athlete-1") -> ConnectedAccount:
+    account = ConnectedAccount(
+        id=f"acc_{provider.value}",
+        user_id="user_1",
+        provider=provider,
+        provider_user_id=token,
+        access_token=token,
+        refresh_token=garmin_token_secret(token) if provider == Provider.GARMIN else f"refresh-{token}",
+        token_expires_at=int(time.time()) + 6 * 3600,
+    )
+    db_session.add(account)
+    db_session.commit()
+    return account
+
+
+def make_connector(provider: Provider, app, monkeypatch):
+    monkeypatch.setattr('app.core.config.settings.GARMIN_CONSUMER_KEY', 'garmin-key')
+    monkeypatch.setattr('app.core.config.settings.GARMIN_CONSUMER_SECRET', 'garmin-secret')
+    monkeypatch.setattr('app.core.config.settings.COROS_API_KEY', 'coros-key')
+    monkeypatch.setattr('app.core.config.settings.COROS_API_SECRET', 'coros-secret')
+    connector = CONNECTORS[provider]()
+    connector.retry_policy = RetryPolicy(max_attempts=4, base_delay=0.0, max_delay=0.01)
+    attach(connector, app)
+    return connector
+
+
+def fake_app(**overrides):
+    config = FakeProviderConfig(
+        activities_per_athlete=5,
+        samples_per_activity=120,
+        garmin_consumer_key='garmin-key',
+        garmin_consumer_secret='garmin-secret',
+        coros_api_key='coros-key',
+        coros_api_secret='coros-secret',
+        **overrides
+    )
+    return create_app(config)
+
+
+class TestFakeProviderSync:
+    """Test suite for the full sync path against each fake provider."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider", list(CONNECTORS))
+    async def test_sync_imports_all_activities(self, db_session, user, monkeypatch, provider):
+        """Test each connector pages through its fake API and stores streams."""
+        app = fake_app()
+        account = connect(db_session, provider)
+        connector = make_connector(provider, app, monkeypatch)
+
+        summary = await sync_service.sync_account(db_session, account, connector, per_page=2)
+
+        assert summary['created'] == 5
+        assert db_session.query(Activity).filter(Activity.user_id == "user_1").count() == 5
+        streams = db_session.query(ActivityStream).count()
+        if provider in sync_service.STREAM_PROVIDERS:
+            assert streams > 0
+        else:
+            assert streams == 0
+
+    @pytest.mark.asyncio
+    async def test_polar_transaction_committed(self, db_session, user, monkeypatch):
+        """Test committed Polar exercises aren't delivered again."""
+        app = fake_app()
+        account = connect(db_session, Provider.POLAR)
+        connector = make_connector(Provider.POLAR, app, monkeypatch)
+
+        await sync_service.sync_account(db_session, account, connector, fetch_streams=False)
+        assert await connector.get_activities(account.access_token) == []
+
+    @pytest.mark.asyncio
+    async def test_garmin_rejects_bad_signature(self, db_session, user, monkeypatch):
+        """Test the fake Garmin API verifies OAuth1 signatures."""
+        app = fake_app()
+        connector = make_connector(Provider.GARMIN, app, monkeypatch)
+
+        with pytest.raises(httpx.HTTPStatusError) as exc:
+            await connector.get_activities("athlete-1", "wrong-secret")
+        assert exc.value.response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_errors_are_retried(self, db_session, user, monkeypatch):
+        """Test injected 503s are absorbed by connector retries."""
+        app = fake_app(error_rate=0.2, seed=3)
+        account = connect(db_session, Provider.STRAVA)
+        connector = make_connector(Provider.STRAVA, app, monkeypatch)
+
+        summary = await sync_service.sync_account(db_session, account, connector, per_page=2)
+
+        assert summary['created'] == 5
+        assert app.state.providers.errors['strava'] > 0
+        assert resilience.get_breaker('strava').counters['retries'] == app.state.providers.errors['strava']
+
+    @pytest.mark.asyncio
+    async def test_quota_window(self, db_session, user, monkeypatch):
+        """Test requests over the quota get 429 with Strava rate-limit headers."""
+        app = fake_app(quota=2, quota_window_seconds=900)
+        connector = make_connector(Provider.STRAVA, app, monkeypatch)
+
+        await connector.get_activities("athlete-1")
+        await connector.get_activities("athlete-1")
+        with pytest.raises(Exception, match="RATE_LIMIT_EXCEEDED"):
+            await connector.get_activities("athlete-1")
+
+        response = await connector.client.get(
+            f"{connector.base_url}/athlete/activities", headers={'Authorization': 'Bearer athlete-1'}
+        )
+        assert response.status_code == 429
+        assert response.headers['X-RateLimit-Limit'] == "2,20"
+        assert int(response.headers['Retry-After']) > 800
+        assert app.state.providers.throttled['strava'] >= 2
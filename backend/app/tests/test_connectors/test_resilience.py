@@ -0,0 +1,154 @@
+"""Unit tests for connector retries and circuit breaking."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services.connectors import resilience
+from app.services.connectors.resilience import (
+    BreakerState, CircuitBreaker, CircuitOpenError, RetryPolicy, call, retry_after_seconds
+)
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.01)
+
+
+def responses(*statuses, headers=None):
+    """send() returning the given statuses in order."""
+    request = httpx.Request('GET', 'https://api.example.com/x')
+    queue = [httpx.Response(s, request=request, headers=headers or {}, json={}) for s in statuses]
+    return AsyncMock(side_effect=queue)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    resilience._breakers.clear()
+    yield
+    resilience._breakers.clear()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetries:
+    """Test suite for failure classification and backoff."""
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_retried(self):
+        """Test 5xx is retried until success."""
+        send = responses(502, 503, 200)
+        response = await call('strava', 'GET', send, FAST)
+
+        assert response.status_code == 200
+        assert send.await_count == 3
+        assert resilience.get_breaker('strava').counters['retries'] == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self):
+        """Test 4xx raises at once and doesn't count against the provider."""
+        send = responses(404, 200)
+        with pytest.raises(httpx.HTTPStatusError):
+            await call('strava', 'GET', send, FAST)
+
+        assert send.await_count == 1
+        assert resilience.get_breaker('strava').consecutive_failures == 0
+
+    @pytest.mark.asyncio
+    async def test_post_not_retried_after_server_error(self):
+        """Test non-idempotent requests aren't resent after an ambiguous failure."""
+        send = responses(500, 200)
+        with pytest.raises(httpx.HTTPStatusError):
+            await call('polar', 'POST', send, FAST)
+        assert send.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_honours_retry_after(self):
+        """Test 429 waits for short Retry-After and gives up on long ones."""
+        with patch('app.services.connectors.resilience.asyncio.sleep', new_callable=AsyncMock) as sleep:
+            send = AsyncMock(side_effect=[
+                httpx.Response(429, headers={'Retry-After': '0.005'}, request=httpx.Request('GET', 'https://x')),
+                httpx.Response(200, request=httpx.Request('GET', 'https://x')),
+            ])
+            assert (await call('coros', 'GET', send, FAST)).status_code == 200
+            sleep.assert_awaited_once_with(0.005)
+
+        send = responses(429, 200, headers={'Retry-After': '900'})
+        with pytest.raises(httpx.HTTPStatusError):
+            await call('coros', 'GET', send, FAST)
+        assert send.await_count == 1
+
+    def test_decorrelated_jitter_bounds(self):
+        """Test delays stay within [base, min(cap, 3 * previous)]."""
+        policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=20.0)
+        delay = policy.base_delay
+        for _ in range(50):
+            previous, delay = delay, policy.next_delay(delay)
+            assert 0.5 <= delay <= min(20.0, previous * 3)
+
+    def test_retry_after_http_date(self):
+        """Test the HTTP-date form of Retry-After."""
+        response = httpx.Response(429, headers={'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+        assert retry_after_seconds(response) == 0.0
+        assert retry_after_seconds(httpx.Response(429)) is None
+
+
+class TestCircuitBreaker:
+    """Test suite for breaker transitions."""
+
+    def test_opens_sheds_and_probes(self):
+        """Test closed -> open -> half-open (single probe) -> closed."""
+        clock = FakeClock()
+        breaker = CircuitBreaker('garmin', failure_threshold=3, recovery_seconds=30, clock=clock)
+
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        clock.now = 31
+        breaker.before_call()
+        assert breaker.state == BreakerState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+        assert breaker.snapshot()['rejected'] == 2
+
+    def test_failed_probe_reopens(self):
+        """Test a failing probe re-opens the breaker for another period."""
+        clock = FakeClock()
+        breaker = CircuitBreaker('coros', failure_threshold=1, recovery_seconds=30, clock=clock)
+        breaker.before_call()
+        breaker.record_failure()
+
+        clock.now = 40
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == BreakerState.OPEN
+
+        clock.now = 60
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_provider(self):
+        """Test requests fail fast without calling the provider once open."""
+        resilience._breakers['garmin'] = CircuitBreaker('garmin', failure_threshold=2, recovery_seconds=60)
+        send = responses(*([503] * 10))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await call('garmin', 'GET', send, RetryPolicy(max_attempts=2, base_delay=0.0, max_delay=0.0))
+        with pytest.raises(CircuitOpenError):
+            await call('garmin', 'GET', send, FAST)
+
+        assert send.await_count == 2
+        assert resilience.metrics_snapshot()['garmin']['state'] == BreakerState.OPEN
@@ -0,0 +1,98 @@
+"""Unit tests for best-effort extraction and records."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.best_effort import BestEffort
+from app.models.user import User
+from app.services.analytics.best_efforts import (
+    find_best_efforts,
+    process_best_efforts,
+    rebuild_records,
+)
+
+
+def run_streams(speeds):
+    """1 Hz time/distance streams from per-second speeds (m/s)."""
+    speeds = np.asarray(speeds, dtype=np.float64)
+    return {
+        'time': np.arange(len(speeds) + 1, dtype=np.int32),
+        'distance': np.concatenate(([0.0], np.cumsum(speeds))).astype(np.float32),
+    }
+
+
+@pytest.fixture
+def athlete(db_session):
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    db_session.commit()
+    return "athlete_1"
+
+
+def make_run(db, activity_id, start):
+    activity = Activity(
+        id=activity_id,
+        user_id="athlete_1",
+        provider="GARMIN",
+        provider_activity_id=activity_id,
+        name=activity_id,
+        activity_type=ActivityType.RUN,
+        start_date=start,
+        raw_data={},
+        processed_data={},
+    )
+    db.add(activity)
+    db.commit()
+    return activity
+
+
+class TestBestEfforts:
+    """Test suite for best efforts."""
+
+    def test_finds_fastest_segment(self):
+        """Test a fast block inside a slow run is found with its offset."""
+        # 10 min at 3 m/s, 100 s at 5 m/s, 10 min at 3 m/s
+        streams = run_streams([3.0] * 600 + [5.0] * 100 + [3.0] * 600)
+
+        efforts = find_best_efforts(streams['time'], streams['distance'])
+
+        assert efforts['400m']['elapsed_seconds'] == pytest.approx(80.0)
+        assert 600 <= efforts['400m']['start_offset_seconds'] <= 620
+        # 1k: 500 m at 5 m/s + 500 m at 3 m/s
+        assert efforts['1k']['elapsed_seconds'] == pytest.approx(100 + 500 / 3, abs=0.2)
+        assert '5k' not in efforts
+
+    def test_stops_do_not_count_against_start(self):
+        """Test a stationary stretch before a segment is not included."""
+        streams = run_streams([4.0] * 50 + [0.0] * 120 + [4.0] * 200)
+
+        efforts = find_best_efforts(streams['time'], streams['distance'])
+
+        assert efforts['400m']['elapsed_seconds'] == pytest.approx(100.0)
+
+    def test_records_update_incrementally(self, db_session, athlete):
+        """Test records only move when an activity is faster, and rebuild agrees."""
+        slow = make_run(db_session, 'slow', datetime(2024, 1, 1))
+        fast = make_run(db_session, 'fast', datetime(2024, 2, 1))
+        slower = make_run(db_session, 'slower', datetime(2024, 3, 1))
+
+        assert process_best_efforts(db_session, slow, run_streams([3.0] * 1800)) == ['400m', '1k', '5k']
+        assert process_best_efforts(db_session, fast, run_streams([4.0] * 400)) == ['400m', '1k']
+        assert process_best_efforts(db_session, slower, run_streams([2.5] * 600)) == []
+        db_session.commit()
+
+        def records():
+            return {
+                r.effort: (r.activity_id, r.elapsed_seconds)
+                for r in db_session.query(BestEffort).filter(BestEffort.user_id == athlete)
+            }
+
+        incremental = records()
+        assert incremental['1k'] == ('fast', 250.0)
+        assert incremental['5k'][0] == 'slow'
+        assert slow.processed_data['best_efforts']['5k']['elapsed_seconds'] == pytest.approx(5000 / 3, abs=0.1)
+
+        assert rebuild_records(db_session, athlete) == 3
+        assert records() == incremental
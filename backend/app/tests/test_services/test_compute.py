@@ -0,0 +1,94 @@
+"""Unit tests for the analytics compute pool."""
+
+import os
+
+import numpy as np
+import pytest
+
+from app.services.analytics.compute import ComputeExecutor, SharedArray, _export
+from app.services.analytics.downsample import downsample_streams
+
+
+def shm_blocks():
+    """Names of shared memory blocks (Linux), leaving out the pool's semaphores."""
+    if not os.path.isdir('/dev/shm'):
+        return set()
+    return {name for name in os.listdir('/dev/shm') if name.startswith('psm_')}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    executor = ComputeExecutor(workers=1, min_shared_bytes=1024, start_method="forkserver")
+    yield executor
+    executor.shutdown()
+
+
+def streams(n=20000):
+    return {
+        'time': np.arange(n, dtype=np.int32),
+        'heartrate': (140 + 20 * np.sin(np.arange(n) / 200)).astype(np.int16),
+    }
+
+
+class TestComputeExecutor:
+    """Test suite for process pool calls."""
+
+    def test_large_arrays_go_through_shared_memory(self):
+        """Test only arrays over the size limit are replaced by shared blocks."""
+        blocks = []
+        payload = _export({'big': np.zeros(1000), 'small': np.zeros(4), 'n': 3}, blocks, 1024)
+        try:
+            assert isinstance(payload['big'], SharedArray)
+            assert isinstance(payload['small'], np.ndarray) and payload['n'] == 3
+            assert len(blocks) == 1
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    @pytest.mark.asyncio
+    async def test_matches_inline_and_cleans_up(self, pool):
+        """Test a pool call returns the inline result and leaves no shared blocks."""
+        before = shm_blocks()
+        data = streams()
+
+        result = await pool.run(downsample_streams, data, 20000)
+        chart = await pool.run(downsample_streams, data, 500, ['heartrate'])
+
+        assert np.array_equal(result['heartrate'], data['heartrate'])
+        expected = downsample_streams(data, 500, ['heartrate'])
+        assert all(np.array_equal(chart[c], expected[c]) for c in expected)
+        assert shm_blocks() == before
+
+        stats = pool.stats()
+        assert stats['completed'] >= 2 and stats['pending'] == 0
+        assert stats['avg_run_ms'] is not None
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self, pool):
+        """Test worker exceptions reach the caller and count as failed."""
+        before = shm_blocks()
+        failed = pool.stats()['failed']
+        with pytest.raises(TypeError):
+            await pool.run(downsample_streams, streams(), 'many')
+        assert pool.stats()['failed'] == failed + 1
+        assert shm_blocks() == before
+
+    def test_start_spawns_workers(self):
+        """Test start() brings up every worker before any call is made."""
+        executor = ComputeExecutor(workers=2, min_shared_bytes=1024, start_method="forkserver")
+        try:
+            executor.start()
+            assert len(executor._pool._processes) == 2
+            assert executor.stats()['submitted'] == 0
+        finally:
+            executor.shutdown()
+        assert executor._pool is None
+
+    @pytest.mark.asyncio
+    async def test_thread_fallback(self):
+        """Test zero workers runs calls in a thread with the same metrics."""
+        executor = ComputeExecutor(workers=0, min_shared_bytes=1024, start_method="forkserver")
+        chart = await executor.run(downsample_streams, streams(), 500)
+        assert len(chart['time']) <= 500
+        assert executor.stats()['completed'] == 1
@@ -0,0 +1,120 @@
+"""Unit tests for mean-maximal curves."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.activity_curve import AthleteCurve
+from app.models.user import User
+from app.services.analytics.curves import (
+    DURATION_GRID,
+    KIND_POWER,
+    KIND_SPEED,
+    PERIOD_ALL,
+    compute_curves,
+    decode,
+    mean_max,
+    merge,
+    process_activity_curves,
+    rebuild_athlete_curves,
+)
+
+
+def brute_force(values, duration):
+    return max(np.mean(values[i:i + duration]) for i in range(len(values) - duration + 1))
+
+
+@pytest.fixture
+def athlete(db_session):
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    db_session.commit()
+    return "athlete_1"
+
+
+def make_activity(db, activity_id, start):
+    activity = Activity(
+        id=activity_id,
+        user_id="athlete_1",
+        provider="STRAVA",
+        provider_activity_id=activity_id,
+        name=activity_id,
+        activity_type=ActivityType.RIDE,
+        start_date=start,
+        raw_data={},
+    )
+    db.add(activity)
+    db.commit()
+    return activity
+
+
+def ride_streams(seconds, base, surge=None):
+    watts = np.full(seconds, base, dtype=np.int16)
+    if surge:
+        at, length, value = surge
+        watts[at:at + length] = value
+    return {
+        'time': np.arange(seconds, dtype=np.int32),
+        'watts': watts,
+        'distance': np.arange(seconds, dtype=np.float32) * 8.0,
+    }
+
+
+class TestCurves:
+    """Test suite for curve computation and athlete envelopes."""
+
+    def test_mean_max_matches_brute_force(self):
+        """Test prefix-sum windows give the exact best averages."""
+        values = np.random.default_rng(1).integers(0, 600, 400).astype(np.float64)
+        curve = mean_max(values)
+
+        assert len(curve) == np.count_nonzero(DURATION_GRID <= 400)
+        for i in (0, 4, 29, 119, len(curve) - 1):
+            assert curve[i] == pytest.approx(brute_force(values, DURATION_GRID[i]), rel=1e-5)
+
+    def test_compute_curves_power_and_speed(self):
+        """Test power gaps count as zero and speed comes from distance."""
+        streams = ride_streams(600, 200, surge=(100, 60, 400))
+        streams['time'] = np.concatenate([np.arange(300), np.arange(400, 700)]).astype(np.int32)
+
+        curves = compute_curves(streams)
+
+        assert curves[KIND_POWER][0] == 400
+        assert curves[KIND_POWER][59] == pytest.approx(400)
+        assert curves[KIND_SPEED][9] == pytest.approx(8.0)
+        assert len(curves[KIND_POWER]) == np.count_nonzero(DURATION_GRID <= 699)
+
+    def test_merge_keeps_longest_and_best(self):
+        """Test the envelope is element-wise max across different lengths."""
+        merged = merge(np.array([300, 250], dtype='<f4'), np.array([280, 260, 200], dtype='<f4'))
+        assert merged.tolist() == [300, 260, 200]
+
+    def test_incremental_envelope_matches_rebuild(self, db_session, athlete):
+        """Test merged season and all-time curves equal a rebuild from stored curves."""
+        rides = [
+            ('r1', datetime(2023, 6, 1), ride_streams(1800, 180, surge=(60, 300, 320))),
+            ('r2', datetime(2024, 6, 1), ride_streams(3600, 210, surge=(600, 20, 700))),
+            ('r3', datetime(2024, 7, 1), ride_streams(900, 230)),
+        ]
+        for activity_id, start, streams in rides:
+            process_activity_curves(db_session, make_activity(db_session, activity_id, start), streams)
+        db_session.commit()
+
+        def snapshot():
+            return {
+                (c.kind, c.period): (decode(c.data).tolist(), c.activity_count)
+                for c in db_session.query(AthleteCurve).filter(AthleteCurve.sport == 'ride')
+            }
+
+        incremental = snapshot()
+        all_time, count = incremental[(KIND_POWER, PERIOD_ALL)]
+        season, season_count = incremental[(KIND_POWER, '2024')]
+
+        assert count == 3 and season_count == 2
+        assert all_time[0] == 700
+        assert all_time[DURATION_GRID.tolist().index(300)] == pytest.approx(320)
+        assert season[DURATION_GRID.tolist().index(300)] < 320
+
+        assert rebuild_athlete_curves(db_session, athlete) == 6
+        assert snapshot() == incremental
@@ -0,0 +1,156 @@
+"""Unit tests for cross-provider duplicate detection."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.api.v1.activities import build_activities_query
+from app.models.activity import Activity, ActivityType, DataQuality
+from app.models.activity_curve import ActivityCurve, AthleteCurve
+from app.models.best_effort import BestEffort
+from app.models.user import User
+from app.models.workout import Workout, WorkoutStatus
+from app.services.analytics.best_efforts import rebuild_records
+from app.services.analytics.curves import rebuild_athlete_curves, save_activity_curves
+from app.services.analytics.streams import save_streams
+from app.services.deduplication import (
+    backfill_fingerprints, fingerprint, neighbour_fingerprints, resolve_duplicates
+)
+
+
+@pytest.fixture
+def athlete(db_session):
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    db_session.commit()
+    return "athlete_1"
+
+
+def make_activity(db, activity_id, provider, start, duration=3600, distance=10000.0, quality=DataQuality.FULL):
+    activity = Activity(
+        id=activity_id,
+        user_id="athlete_1",
+        provider=provider,
+        provider_activity_id=activity_id,
+        name=activity_id,
+        activity_type=ActivityType.RUN,
+        start_date=start,
+        duration_seconds=duration,
+        distance_meters=distance,
+        data_quality=quality,
+        raw_data={},
+    )
+    db.add(activity)
+    return activity
+
+
+class TestDeduplication:
+    """Test suite for fingerprints and canonical selection."""
+
+    def test_neighbours_cover_bucket_edges(self):
+        """Test copies straddling a bucket boundary still share a probe key."""
+        a = Activity(start_date=datetime(2024, 3, 1, 6, 4, 59), duration_seconds=3600, distance_meters=10000.0)
+        b = Activity(start_date=datetime(2024, 3, 1, 6, 5, 30), duration_seconds=3660, distance_meters=10150.0)
+
+        assert fingerprint(a) != fingerprint(b)
+        assert fingerprint(b) in neighbour_fingerprints(a)
+        assert len(neighbour_fingerprints(a)) == 27
+
+    def test_new_copy_marked_duplicate(self, db_session, athlete):
+        """Test a lower-quality copy from another provider points at the original."""
+        start = datetime(2024, 3, 1, 6, 0)
+        original = make_activity(db_session, "coros_1", "COROS", start)
+        resolve_duplicates(db_session, [original])
+        db_session.commit()
+
+        copy = make_activity(db_session, "strava_1", "STRAVA", start + timedelta(seconds=40),
+                             duration=3620, distance=10040.0, quality=DataQuality.PARTIAL)
+        other = make_activity(db_session, "strava_2", "STRAVA", start + timedelta(hours=5))
+        demoted = resolve_duplicates(db_session, [copy, other])
+        db_session.commit()
+
+        assert demoted == [copy]
+        assert copy.duplicate_of_id == "coros_1"
+        assert other.duplicate_of_id is None
+        listed = [a.id for a in build_activities_query(db_session, athlete)]
+        assert listed == ["strava_2", "coros_1"]
+
+    def test_better_copy_becomes_canonical(self, db_session, athlete):
+        """Test a higher-quality late arrival takes over, including the workout link."""
+        start = datetime(2024, 3, 1, 6, 0)
+        first = make_activity(db_session, "polar_1", "POLAR", start, quality=DataQuality.MINIMAL)
+        resolve_duplicates(db_session, [first])
+        db_session.add(Workout(
+            id="w1", created_by=athlete, athlete_id=athlete, title="Run", workout_type="run",
+            scheduled_date=start, status=WorkoutStatus.COMPLETED, activity_id="polar_1",
+        ))
+        db_session.commit()
+
+        better = make_activity(db_session, "coros_1", "COROS", start + timedelta(seconds=10))
+        assert resolve_duplicates(db_session, [better]) == [first]
+        db_session.commit()
+
+        assert first.duplicate_of_id == "coros_1"
+        assert better.duplicate_of_id is None
+        assert db_session.get(Workout, "w1").activity_id == "coros_1"
+
+    def test_copy_with_streams_stays_canonical(self, db_session, athlete):
+        """Test a stream-less Garmin copy never displaces one that has or will get streams."""
+        start = datetime(2024, 3, 1, 6, 0)
+        garmin = make_activity(db_session, "garmin_1", "GARMIN", start)
+        resolve_duplicates(db_session, [garmin])
+        db_session.commit()
+
+        strava = make_activity(db_session, "strava_1", "STRAVA", start, quality=DataQuality.PARTIAL)
+        assert resolve_duplicates(db_session, [strava]) == [garmin]
+        db_session.commit()
+        assert strava.duplicate_of_id is None
+
+        # Stored streams beat a provider that could supply them
+        save_streams(db_session, "strava_1", {'time': np.arange(10, dtype=np.int32)})
+        polar = make_activity(db_session, "polar_1", "POLAR", start)
+        assert resolve_duplicates(db_session, [polar]) == [polar]
+        assert polar.duplicate_of_id == "strava_1"
+
+    def test_same_provider_is_never_duplicate(self, db_session, athlete):
+        """Test two activities of one provider at the same time are both kept."""
+        start = datetime(2024, 3, 1, 6, 0)
+        a = make_activity(db_session, "strava_1", "STRAVA", start)
+        b = make_activity(db_session, "strava_2", "STRAVA", start)
+        assert resolve_duplicates(db_session, [a, b]) == []
+
+    def test_backfill(self, db_session, athlete):
+        """Test existing activities are fingerprinted and linked."""
+        start = datetime(2024, 3, 1, 6, 0)
+        make_activity(db_session, "strava_1", "STRAVA", start)
+        make_activity(db_session, "coros_1", "COROS", start, quality=DataQuality.PARTIAL)
+        db_session.commit()
+
+        assert backfill_fingerprints(db_session, athlete) == 1
+        assert db_session.get(Activity, "coros_1").duplicate_of_id == "strava_1"
+        assert db_session.get(Activity, "strava_1").fingerprint is not None
+
+    def test_duplicate_leaves_curves_and_records(self, db_session, athlete):
+        """Test a demoted copy's curves and efforts stop counting towards the athlete's."""
+        start = datetime(2024, 3, 1, 6, 0)
+        first = make_activity(db_session, "polar_1", "POLAR", start, quality=DataQuality.MINIMAL)
+        effort = {'distance_meters': 5000.0, 'elapsed_seconds': 1500, 'start_offset_seconds': 0}
+        first.processed_data = {'best_efforts': {'5k': effort}, 'stages': {'curves': 1, 'best_efforts': 1, 'metrics': 1}}
+        save_activity_curves(db_session, "polar_1", {'speed': np.full(10, 3.5, dtype=np.float32)})
+        resolve_duplicates(db_session, [first])
+        db_session.commit()
+
+        better = make_activity(db_session, "coros_1", "COROS", start + timedelta(seconds=10))
+        assert resolve_duplicates(db_session, [better]) == [first]
+        db_session.commit()
+
+        assert db_session.query(ActivityCurve).filter(ActivityCurve.activity_id == "polar_1").count() == 0
+        assert first.processed_data == {'stages': {'metrics': 1}}
+
+        # Rebuilds skip duplicates even if their rows were left behind
+        save_activity_curves(db_session, "polar_1", {'speed': np.full(10, 3.5, dtype=np.float32)})
+        first.processed_data = {'best_efforts': {'5k': effort}}
+        db_session.commit()
+        assert rebuild_athlete_curves(db_session, athlete) == 0
+        assert rebuild_records(db_session, athlete) == 0
+        assert db_session.query(AthleteCurve).count() == db_session.query(BestEffort).count() == 0
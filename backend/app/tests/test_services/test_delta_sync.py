@@ -0,0 +1,143 @@
+"""Delta sync service tests."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.comment import Comment
+from app.models.notification import Notification, NotificationType
+from app.models.tombstone import Tombstone
+from app.models.user import User
+from app.models.workout import Workout
+from app.services import delta_sync, notification_service
+
+T0 = datetime(2024, 3, 1, 12)
+
+
+def activity(id, start, **kwargs):
+    return Activity(
+        id=id, user_id="user_1", provider="STRAVA", provider_activity_id=id, name=id,
+        activity_type=ActivityType.RUN, start_date=start, raw_data={}, updated_at=start, **kwargs
+    )
+
+
+@pytest.fixture
+def seeded(db_session):
+    db_session.add_all([
+        User(id="user_1", email="a@example.com", hashed_password="x"),
+        User(id="user_2", email="b@example.com", hashed_password="x"),
+        activity("act_1", T0),
+        activity("act_2", T0 + timedelta(minutes=1)),
+        Activity(
+            id="act_other", user_id="user_2", provider="STRAVA", provider_activity_id="o", name="o",
+            activity_type=ActivityType.RUN, start_date=T0, raw_data={}, updated_at=T0,
+        ),
+        Workout(
+            id="w_1", created_by="user_2", athlete_id="user_1", title="Easy", workout_type="run",
+            scheduled_date=T0, updated_at=T0,
+        ),
+        Comment(id="c_1", author_id="user_2", activity_id="act_1", content="Nice", updated_at=T0),
+        Comment(id="c_other", author_id="user_2", activity_id="act_other", content="Mine", updated_at=T0),
+        Notification(
+            id="n_1", user_id="user_1", type=NotificationType.ACTIVITY_COMMENT, title="Comment", message="Nice",
+            updated_at=T0,
+        ),
+    ])
+    db_session.commit()
+    return db_session
+
+
+def ids(changes, name, key="updated"):
+    rows = changes[name][key]
+    return [r if isinstance(r, str) else r.id for r in rows]
+
+
+class TestDeltaSync:
+    """Test suite for the changes feed."""
+
+    def test_bootstrap_returns_visible_rows(self, seeded):
+        """Test a call without a token returns everything the user can see."""
+        changes = delta_sync.changes_since(seeded, "user_1")
+
+        assert ids(changes, "activities") == ["act_1", "act_2"]
+        assert ids(changes, "workouts") == ["w_1"]
+        assert ids(changes, "comments") == ["c_1"]
+        assert ids(changes, "notifications") == ["n_1"]
+        assert not changes["has_more"] and not changes["reset"]
+
+    def test_incremental_returns_only_changes(self, seeded):
+        """Test a follow-up call returns rows changed after the overlap window."""
+        first = delta_sync.changes_since(seeded, "user_1")
+
+        seeded.get(Workout, "w_1").title = "Tempo"
+        seeded.commit()
+        changes = delta_sync.changes_since(seeded, "user_1", first["token"])
+
+        assert ids(changes, "workouts") == ["w_1"]
+        assert ids(changes, "activities") == []
+        assert ids(changes, "comments") == []
+
+    def test_mark_read_reaches_feed(self, seeded):
+        """Test the bulk mark-read update stamps updated_at."""
+        first = delta_sync.changes_since(seeded, "user_1")
+        notification_service.mark_read(seeded, "user_1", ["n_1"])
+
+        changes = delta_sync.changes_since(seeded, "user_1", first["token"])
+        assert ids(changes, "notifications") == ["n_1"]
+
+    def test_delete_leaves_tombstone(self, seeded):
+        """Test deletes reach every user whose feed showed the row."""
+        first = delta_sync.changes_since(seeded, "user_1")
+        seeded.delete(seeded.get(Comment, "c_1"))
+        seeded.commit()
+
+        assert {t.user_id for t in seeded.query(Tombstone)} == {"user_1", "user_2"}
+        changes = delta_sync.changes_since(seeded, "user_1", first["token"])
+        assert ids(changes, "comments", "deleted") == ["c_1"]
+
+    def test_duplicate_reported_deleted(self, seeded):
+        """Test an activity merged into another provider's copy leaves the feed."""
+        first = delta_sync.changes_since(seeded, "user_1")
+        seeded.get(Activity, "act_2").duplicate_of_id = "act_1"
+        seeded.commit()
+
+        changes = delta_sync.changes_since(seeded, "user_1", first["token"])
+        assert ids(changes, "activities") == []
+        assert ids(changes, "activities", "deleted") == ["act_2"]
+
+    def test_pagination(self, seeded):
+        """Test a truncated collection resumes after the last row returned."""
+        now = T0 + timedelta(hours=1)
+        first = delta_sync.changes_since(seeded, "user_1", limit=1, now=now)
+        assert ids(first, "activities") == ["act_1"]
+        assert first["has_more"]
+
+        second = delta_sync.changes_since(seeded, "user_1", first["token"], limit=1, now=now)
+        assert ids(second, "activities") == ["act_2"]
+        assert not second["has_more"]
+
+    def test_expired_token_resets(self, seeded):
+        """Test a token older than the tombstone retention starts over."""
+        first = delta_sync.changes_since(seeded, "user_1", now=T0)
+        changes = delta_sync.changes_since(seeded, "user_1", first["token"], now=T0 + timedelta(days=31))
+
+        assert changes["reset"]
+        assert ids(changes, "activities") == ["act_1", "act_2"]
+
+    def test_invalid_token(self, seeded):
+        """Test garbage tokens are rejected."""
+        with pytest.raises(delta_sync.InvalidToken):
+            delta_sync.changes_since(seeded, "user_1", "not-a-token")
+
+    def test_prune_tombstones(self, seeded):
+        """Test only tombstones past the retention are pruned."""
+        seeded.add_all([
+            Tombstone(id="t_old", user_id="user_1", entity="workouts", entity_id="w_x", deleted_at=T0),
+            Tombstone(id="t_new", user_id="user_1", entity="workouts", entity_id="w_y",
+                      deleted_at=T0 + timedelta(days=29)),
+        ])
+        seeded.commit()
+
+        assert delta_sync.prune_tombstones(seeded, now=T0 + timedelta(days=31)) == 1
+        assert [t.id for t in seeded.query(Tombstone)] == ["t_new"]
@@ -0,0 +1,79 @@
+"""Unit tests for chart stream downsampling."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.core.cache import cache
+from app.models.activity import Activity, ActivityType
+from app.models.user import User
+from app.services.analytics.downsample import downsample_streams, lttb_indices
+from app.services.analytics.streams import get_chart_streams, save_streams
+
+
+def make_streams(n=10000):
+    rng = np.random.default_rng(7)
+    heartrate = (140 + 10 * np.sin(np.arange(n) / 300) + rng.normal(0, 2, n)).astype(np.int16)
+    heartrate[4321] = 199
+    watts = (200 + rng.normal(0, 30, n)).astype(np.int16)
+    watts[777] = 0
+    return {
+        'time': np.arange(n, dtype=np.int32),
+        'heartrate': heartrate,
+        'watts': watts,
+        'latlng': np.column_stack([np.linspace(45, 46, n), np.linspace(7, 8, n)]),
+    }
+
+
+class TestDownsample:
+    """Test suite for LTTB downsampling and the chart cache."""
+
+    def test_lttb_keeps_ends_and_extremes(self):
+        """Test the budget is respected and first/last/min/max survive."""
+        streams = make_streams()
+        indices = lttb_indices(streams['time'], streams['heartrate'], 500)
+
+        assert len(indices) <= 500
+        assert indices[0] == 0 and indices[-1] == 9999
+        assert 4321 in indices
+        assert np.all(np.diff(indices) > 0)
+
+    def test_lttb_short_series_unchanged(self):
+        """Test series within budget are returned whole."""
+        assert lttb_indices(np.arange(10), np.arange(10), 500).tolist() == list(range(10))
+
+    def test_channels_share_indices(self):
+        """Test all channels are sampled at the union of picked indices."""
+        streams = make_streams()
+        chart = downsample_streams(streams, 1000, ['heartrate', 'watts', 'latlng'])
+
+        assert set(chart) == {'time', 'heartrate', 'watts', 'latlng'}
+        assert len(chart['time']) <= 1000
+        assert len({len(a) for a in chart.values()}) == 1
+        assert chart['latlng'].shape[1] == 2
+        assert chart['heartrate'].max() == 199
+        assert chart['watts'].min() == 0
+
+    @pytest.mark.asyncio
+    async def test_cached_resolution(self, db_session):
+        """Test cached resolutions are reused and dropped when streams change."""
+        db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+        db_session.add(Activity(
+            id="a1", user_id="athlete_1", provider="STRAVA", provider_activity_id="1",
+            name="Run", activity_type=ActivityType.RUN, start_date=datetime(2024, 1, 1), raw_data={},
+        ))
+        save_streams(db_session, "a1", make_streams())
+        db_session.commit()
+
+        chart = await get_chart_streams(db_session, "a1", 500, ['heartrate'])
+        assert set(chart) == {'time', 'heartrate'}
+        assert cache.get("streams:chart:a1:500") is not None
+
+        cached = await get_chart_streams(db_session, "a1", 500, ['heartrate'])
+        assert np.array_equal(cached['heartrate'], chart['heartrate'])
+
+        save_streams(db_session, "a1", {'time': np.arange(100, dtype=np.int32), 'heartrate': np.full(100, 150)})
+        db_session.commit()
+        assert cache.get("streams:chart:a1:500") is None
+        assert len((await get_chart_streams(db_session, "a1", 500))['time']) == 100
@@ -0,0 +1,99 @@
+"""Unit tests for stream-derived metrics."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.user import User
+from app.services.analytics.metrics import (
+    backfill_metrics,
+    compute_metrics,
+    elevation_changes,
+    normalized_power,
+)
+from app.services.analytics.streams import save_streams
+
+
+class TestMetrics:
+    """Test suite for metric computation."""
+
+    def test_normalized_power(self):
+        """Test NP equals average for steady power and exceeds it for surges."""
+        assert normalized_power(np.full(600, 200.0)) == pytest.approx(200.0)
+
+        surges = np.tile(np.concatenate([np.full(60, 400.0), np.full(60, 100.0)]), 10)
+        assert normalized_power(surges) > surges.mean()
+        assert normalized_power(np.full(10, 200.0)) is None
+
+    def test_elevation_hysteresis(self):
+        """Test noise below the threshold is ignored but real climbs count."""
+        noise = 100 + np.tile([0.0, 1.0], 200)
+        assert elevation_changes(noise) == {'gain': 0.0, 'loss': 0.0}
+
+        profile = np.concatenate([
+            np.linspace(100, 150, 100),
+            np.linspace(150, 148, 5),   # small dip, ignored
+            np.linspace(148, 160, 20),
+            np.linspace(160, 120, 50),
+        ])
+        changes = elevation_changes(profile)
+        assert changes['gain'] == pytest.approx(60.0)
+        assert changes['loss'] == pytest.approx(40.0)
+
+    def test_compute_metrics_ride(self):
+        """Test power, decoupling, moving time and temperature from a ride."""
+        seconds = 3600
+        heartrate = np.concatenate([np.full(1800, 140), np.full(1800, 150)])
+        velocity = np.full(seconds, 9.0)
+        velocity[1000:1100] = 0.0
+        streams = {
+            'time': np.arange(seconds),
+            'watts': np.full(seconds, 200),
+            'heartrate': heartrate,
+            'velocity_smooth': velocity,
+            'temp': np.full(seconds, 21),
+            'altitude': np.linspace(0, 100, seconds),
+        }
+
+        metrics = compute_metrics(streams, ftp=250)
+
+        assert metrics['normalized_power'] == pytest.approx(200.0, abs=0.5)
+        assert metrics['intensity_factor'] == pytest.approx(0.8, abs=0.01)
+        assert metrics['variability_index'] == pytest.approx(1.0, abs=0.01)
+        assert metrics['moving_time_seconds'] == 3500
+        assert metrics['aerobic_decoupling'] > 0
+        assert metrics['avg_temperature'] == 21.0
+        assert metrics['elevation_gain_meters'] == pytest.approx(100.0)
+
+    def test_backfill_fills_empty_columns(self, db_session):
+        """Test backfill writes processed_data and only empty columns."""
+        db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+        activity = Activity(
+            id="a1",
+            user_id="athlete_1",
+            provider="COROS",
+            provider_activity_id="1",
+            name="Ride",
+            activity_type=ActivityType.RIDE,
+            start_date=datetime(2024, 1, 1),
+            elevation_gain_meters=42.0,
+            raw_data={},
+        )
+        db_session.add(activity)
+        save_streams(db_session, "a1", {
+            'time': np.arange(600, dtype=np.int32),
+            'watts': np.full(600, 180, dtype=np.int16),
+            'altitude': np.linspace(0, 50, 600).astype(np.float32),
+            'temp': np.full(600, 15, dtype=np.int16),
+        })
+        db_session.commit()
+
+        assert backfill_metrics(db_session, batch_size=1) == 1
+
+        db_session.refresh(activity)
+        assert activity.normalized_power == pytest.approx(180.0, abs=0.5)
+        assert activity.avg_temperature == 15.0
+        assert activity.elevation_gain_meters == 42.0
+        assert activity.processed_data['metrics']['elevation_gain_meters'] == pytest.approx(50.0)
@@ -0,0 +1,149 @@
+"""Unit tests for the notification service."""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import cache
+from app.models.athlete_coach import AthleteCoach, CoachingStatus
+from app.models.notification import Notification, NotificationType
+from app.models.user import User
+from app.models.workout import Workout
+from app.services import notification_service
+
+
+@pytest.fixture
+def users(db_session):
+    """Create a coach and three athletes."""
+    coach = User(id="coach", email="coach@example.com", hashed_password="x")
+    athletes = [
+        User(id=f"athlete_{i}", email=f"athlete{i}@example.com", hashed_password="x")
+        for i in range(3)
+    ]
+    db_session.add_all([coach, *athletes])
+    db_session.add_all([
+        AthleteCoach(
+            id=str(uuid.uuid4()),
+            athlete_id=a.id,
+            coach_id=coach.id,
+            status=CoachingStatus.ACTIVE if i < 2 else CoachingStatus.PENDING
+        )
+        for i, a in enumerate(athletes)
+    ])
+    db_session.commit()
+    return coach, athletes
+
+
+class TestNotificationService:
+    """Test suite for notification fan-out and unread counters."""
+
+    def test_notify_users_bulk_insert(self, db_session, users):
+        """Test fan-out inserts one row per recipient."""
+        _, athletes = users
+        created = notification_service.notify_users(
+            db_session,
+            [a.id for a in athletes],
+            NotificationType.SYNC_COMPLETED,
+            "Sync completed",
+            "3 new activities"
+        )
+
+        assert len(created) == 3
+        assert db_session.query(Notification).count() == 3
+
+    def test_feed_pages_through_same_timestamp(self, db_session, users):
+        """Test keyset pages neither skip nor repeat rows created in one batch."""
+        _, athletes = users
+        notification_service.notify_users(
+            db_session, [athletes[0].id] * 5, NotificationType.SYNC_COMPLETED, "Sync", "Done"
+        )
+
+        seen, before, before_id = [], None, None
+        while True:
+            page = notification_service.build_notifications_query(
+                db_session, athletes[0].id, before=before, before_id=before_id
+            ).limit(2).all()
+            if not page:
+                break
+            seen.extend(n.id for n in page)
+            before, before_id = page[-1].created_at, page[-1].id
+
+        assert len(seen) == 5 and len(set(seen)) == 5
+
+    def test_notify_workouts_assigned(self, db_session, users):
+        """Test one notification per assigned workout."""
+        coach, athletes = users
+        workouts = [
+            Workout(
+                id=f"w{i}",
+                created_by=coach.id,
+                athlete_id=athletes[0].id,
+                title=f"Intervals {i}",
+                workout_type="run",
+                scheduled_date=datetime(2024, 1, 1) + timedelta(days=i)
+            )
+            for i in range(5)
+        ]
+
+        created = notification_service.notify_workouts_assigned(db_session, workouts)
+
+        assert len(created) == 5
+        assert created[0]['action_url'] == "/workouts/w0"
+        assert notification_service.get_unread_count(db_session, athletes[0].id) == 5
+
+    def test_broadcast_only_active_athletes(self, db_session, users):
+        """Test coach broadcast skips non-active relationships."""
+        coach, athletes = users
+        created = notification_service.broadcast_to_athletes(
+            db_session, coach.id, NotificationType.COACH_MESSAGE, "Hello", "Team update"
+        )
+
+        assert sorted(n['user_id'] for n in created) == ["athlete_0", "athlete_1"]
+
+    def test_unread_count_is_cached(self, db_session, users):
+        """Test the badge count hits the database once, then the cache."""
+        _, athletes = users
+        user_id = athletes[0].id
+        notification_service.notify_users(
+            db_session, [user_id, user_id], NotificationType.SYNC_COMPLETED, "Sync", "Done"
+        )
+
+        assert notification_service.get_unread_count(db_session, user_id) == 2
+
+        with patch.object(db_session, 'query', side_effect=AssertionError("COUNT executed")):
+            assert notification_service.get_unread_count(db_session, user_id) == 2
+
+    def test_counter_updated_incrementally(self, db_session, users):
+        """Test inserts bump a cached counter and mark-read invalidates it."""
+        _, athletes = users
+        user_id = athletes[0].id
+        assert notification_service.get_unread_count(db_session, user_id) == 0
+
+        created = notification_service.notify_users(
+            db_session, [user_id] * 4, NotificationType.SYNC_COMPLETED, "Sync", "Done"
+        )
+        assert notification_service.get_unread_count(db_session, user_id) == 4
+
+        updated = notification_service.mark_read(db_session, user_id, [created[0]['id'], created[1]['id']])
+        assert updated == 2
+        assert notification_service.get_unread_count(db_session, user_id) == 2
+
+        # Marking an already-read notification does not decrement again
+        assert notification_service.mark_read(db_session, user_id, [created[0]['id']]) == 0
+        assert notification_service.get_unread_count(db_session, user_id) == 2
+
+        assert notification_service.mark_all_read(db_session, user_id) == 2
+        assert cache.get(notification_service._unread_key(user_id)) is None
+        assert notification_service.get_unread_count(db_session, user_id) == 0
+
+    def test_mark_read_ignores_other_users(self, db_session, users):
+        """Test a user cannot mark someone else's notification as read."""
+        _, athletes = users
+        created = notification_service.notify_users(
+            db_session, [athletes[1].id], NotificationType.SYNC_COMPLETED, "Sync", "Done"
+        )
+
+        assert notification_service.mark_read(db_session, athletes[0].id, [created[0]['id']]) == 0
+        assert notification_service.get_unread_count(db_session, athletes[1].id) == 1
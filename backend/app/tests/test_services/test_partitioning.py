@@ -0,0 +1,52 @@
+"""Activities partitioning DDL tests."""
+
+from datetime import date
+
+from app.db import partitioning
+
+
+class TestPartitioning:
+    """Test suite for start_date partition maintenance."""
+
+    def test_yearly_partition(self):
+        """Test a partition covers one calendar year."""
+        assert partitioning.create_partition_sql(2024) == (
+            "CREATE TABLE IF NOT EXISTS activities_y2024 PARTITION OF activities "
+            "FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')"
+        )
+
+    def test_indexes_follow_model(self):
+        """Test parent indexes come from the ORM, with unique ones widened by start_date."""
+        statements = partitioning.index_sql()
+        assert "CREATE UNIQUE INDEX idx_user_provider_activity ON activities " \
+               "(user_id, provider_activity_id, start_date)" in statements
+        partial = next(s for s in statements if "idx_activities_user_start_date" in s)
+        assert "WHERE duplicate_of_id IS NULL" in partial
+        assert "INCLUDE" in partial
+
+    def test_dependents_trigger(self):
+        """Test dropped foreign keys keep their ON DELETE behaviour."""
+        function = partitioning.dependents_trigger_sql([
+            ("activity_streams", "activity_id", "c"),
+            ("workouts", "activity_id", "n"),
+            ("comments", "activity_id", "a"),
+        ])[0]
+        assert "DELETE FROM activity_streams WHERE activity_id = OLD.id;" in function
+        assert "UPDATE workouts SET activity_id = NULL WHERE activity_id = OLD.id;" in function
+        assert "foreign_key_violation" in function
+
+    def test_dependents_from_models(self):
+        """Test the trigger covers every model referencing activities.id, with its ON DELETE."""
+        dependents = partitioning.orm_dependents()
+        assert ("activity_payloads", "activity_id", "c") in dependents
+        assert ("activities", "duplicate_of_id", "n") in dependents
+        assert ("workouts", "activity_id", "a") in dependents
+        assert {table for table, _, _ in dependents} >= {
+            "activity_streams", "activity_curves", "activity_routes", "activity_zones", "best_efforts", "comments"
+        }
+
+    def test_noop_outside_postgres(self, db_engine):
+        """Test maintenance commands leave non-PostgreSQL databases alone."""
+        assert partitioning.convert(db_engine) == []
+        assert partitioning.ensure_partitions(db_engine, today=date(2024, 6, 1)) == []
+        assert partitioning.detach_partitions(db_engine, 2020) == []
@@ -0,0 +1,153 @@
+"""Unit tests for the versioned processing pipeline."""
+
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.activity_curve import AthleteCurve
+from app.models.activity_route import ActivityRoute
+from app.models.user import User
+from app.services.analytics import pipeline
+from app.services.analytics.metrics import apply_metrics, compute_metrics
+from app.services.analytics.pipeline import STAGES, process_activity, reprocess, stale_stages
+from app.services.analytics.streams import load_streams, save_streams
+
+
+@pytest.fixture
+def rides(db_session):
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    activities = []
+    for i, watts in enumerate((180, 220, 200)):
+        activity = Activity(
+            id=f"a{i}",
+            user_id="athlete_1",
+            provider="STRAVA",
+            provider_activity_id=str(i),
+            name=f"Ride {i}",
+            activity_type=ActivityType.RIDE,
+            start_date=datetime(2024, 1, 1 + i),
+            raw_data={},
+        )
+        db_session.add(activity)
+        save_streams(db_session, activity.id, {
+            'time': np.arange(600, dtype=np.int32),
+            'watts': np.full(600, watts, dtype=np.int16),
+            'distance': np.arange(600, dtype=np.float32) * 8.0,
+        })
+        activities.append(activity)
+    db_session.commit()
+    return activities
+
+
+def bump(monkeypatch, name, calls):
+    """Replace a stage with a newer version that records what it saw."""
+    stage = STAGES[name]
+
+    def run(db, activity, streams, context):
+        calls.append((activity.id, sorted(streams)))
+        return stage.run(db, activity, streams, context)
+
+    monkeypatch.setitem(STAGES, name, replace(stage, version=stage.version + 1, run=run))
+
+
+class TestPipeline:
+    """Test suite for stage versioning and bulk reprocessing."""
+
+    def test_process_records_stage_versions(self, db_session, rides):
+        """Test a processed activity has every stage's version and nothing stale."""
+        activity = rides[0]
+        results = process_activity(db_session, activity, load_streams(db_session, activity.id))
+        db_session.commit()
+
+        assert list(results) == list(STAGES)
+        assert activity.processed_data['stages'] == {name: stage.version for name, stage in STAGES.items()}
+        assert activity.processed_data['metrics']['normalized_power'] == pytest.approx(180.0, abs=0.5)
+        assert stale_stages(activity) == []
+
+    def test_bumped_stage_reprocessed_alone(self, db_session, rides, monkeypatch):
+        """Test bumping one version re-runs only that stage, with only its channels."""
+        assert reprocess(db_session)['processed'] == 3
+
+        calls = []
+        bump(monkeypatch, 'curves', calls)
+        metrics = STAGES['metrics']
+        monkeypatch.setitem(STAGES, 'metrics', replace(metrics, run=lambda *args: pytest.fail("metrics re-ran")))
+
+        summary = reprocess(db_session, batch_size=2)
+
+        assert summary['processed'] == 3
+        assert summary['stages'] == {'curves': 3, 'best_efforts': 0, 'metrics': 0, 'zones': 0, 'route': 0}
+        assert calls == [(a.id, ['distance', 'time', 'watts']) for a in rides]
+        assert rides[0].processed_data['stages']['curves'] == STAGES['curves'].version
+        assert reprocess(db_session)['processed'] == 0
+
+    def test_bumped_metrics_overwrite_filled_columns(self, db_session, rides, monkeypatch):
+        """Test a new metrics version replaces the columns it filled, not provider values."""
+        rides[1].normalized_power = 300.0
+        reprocess(db_session)
+        assert rides[0].normalized_power == pytest.approx(180.0, abs=0.5)
+        assert 'normalized_power' in rides[0].processed_data['filled_columns']
+
+        def run(db, activity, streams, context):
+            metrics = {**compute_metrics(streams), 'normalized_power': 999.0}
+            apply_metrics(activity, metrics)
+            return metrics
+
+        stage = STAGES['metrics']
+        monkeypatch.setitem(STAGES, 'metrics', replace(stage, version=stage.version + 1, run=run))
+        reprocess(db_session, ['metrics'])
+
+        assert rides[0].normalized_power == 999.0
+        assert rides[0].processed_data['metrics']['normalized_power'] == 999.0
+        assert rides[1].normalized_power == 300.0
+
+    def test_reprocess_rebuilds_athlete_curves(self, db_session, rides, monkeypatch):
+        """Test the athlete envelope is rebuilt from reprocessed activity curves."""
+        reprocess(db_session)
+        bump(monkeypatch, 'curves', [])
+        db_session.query(AthleteCurve).delete()
+        db_session.commit()
+
+        reprocess(db_session, ['curves'])
+
+        assert db_session.query(AthleteCurve).filter(AthleteCurve.activity_count == 3).count() > 0
+
+    def test_reprocess_selected_activities(self, db_session, rides):
+        """Test activity_ids limits a reprocess to those activities."""
+        assert reprocess(db_session, ['metrics'], activity_ids=['a1'])['processed'] == 1
+        assert stale_stages(rides[1], [STAGES['metrics']]) == []
+        assert stale_stages(rides[0], [STAGES['metrics']]) != []
+
+    def test_rerouted_thumbnails_rendered(self, db_session, rides, monkeypatch):
+        """Test reprocessing that changes a route's shape queues a new thumbnail."""
+        submitted = []
+        monkeypatch.setattr(pipeline, 'submit_thumbnails', lambda ids: submitted.append(list(ids)))
+        track = np.column_stack([45 + np.linspace(0, 0.05, 600), 7 + np.sin(np.linspace(0, 6, 600)) * 0.01])
+        save_streams(db_session, 'a0', {**load_streams(db_session, 'a0'), 'latlng': track})
+        db_session.commit()
+        reprocess(db_session, ['route'])
+        db_session.get(ActivityRoute, 'a0').thumbnail_key = 'routes/a0-old.svg'
+        db_session.commit()
+
+        save_streams(db_session, 'a0', {**load_streams(db_session, 'a0'), 'latlng': track[::-1]})
+        rides[0].processed_data = {**rides[0].processed_data, 'stages': {}}
+        db_session.commit()
+        submitted.clear()
+        reprocess(db_session, ['route'])
+
+        assert submitted == [['a0']]
+        assert db_session.get(ActivityRoute, 'a0').thumbnail_key is None
+
+    def test_progress_and_unknown_stage(self, db_session, rides):
+        """Test progress is reported per batch and unknown stage names are refused."""
+        seen = []
+        reprocess(db_session, ['curves'], batch_size=2, progress=lambda s: seen.append((s['scanned'], s['total'])))
+        assert seen == [(2, 3), (3, 3)]
+
+        with pytest.raises(ValueError):
+            reprocess(db_session, ['nope'])
+        with pytest.raises(ValueError):
+            pipeline.submit_reprocess(['nope'])
@@ -0,0 +1,78 @@
+"""Raw provider payload storage tests."""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models.activity import Activity, ActivityType
+from app.models.activity_payload import ActivityPayload
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.user import User
+from app.services import raw_payloads, sync_service
+
+PAYLOAD = {'id': 1, 'type': 'Run', 'segment_efforts': [{'id': n, 'elapsed_time': 60} for n in range(50)]}
+
+
+@pytest.fixture
+def account(db_session):
+    db_session.add(User(id="user_1", email="a@example.com", hashed_password="x"))
+    account = ConnectedAccount(
+        id="acc_1", user_id="user_1", provider=Provider.STRAVA, provider_user_id="123", access_token="token",
+    )
+    db_session.add(account)
+    db_session.commit()
+    return account
+
+
+def normalized(payload=PAYLOAD, **overrides):
+    return {
+        'provider': 'STRAVA', 'provider_activity_id': '1', 'name': 'Run', 'activity_type': 'RUN',
+        'start_date': datetime(2024, 1, 15, 8), 'raw_data': payload, **overrides,
+    }
+
+
+class TestRawPayloads:
+    """Test suite for compressed payload storage."""
+
+    def test_sync_stores_payload_off_row(self, db_session, account):
+        """Test synced payloads go to activity_payloads, compressed, with the hash on the activity."""
+        activity = sync_service.upsert_activities(db_session, account, [normalized()])['created'][0]
+        db_session.expire_all()
+
+        stored = db_session.get(Activity, activity.id)
+        assert 'raw_data' not in inspect(stored).dict  # deferred
+        assert stored.raw_data is None
+        row = db_session.get(ActivityPayload, activity.id)
+        assert row.size > len(row.data)
+        assert stored.raw_data_hash == raw_payloads.encode_payload(PAYLOAD)[0]
+        assert raw_payloads.load_raw_payload(db_session, activity.id) == PAYLOAD
+
+    def test_unchanged_payload_not_rewritten(self, db_session, account):
+        """Test re-importing an identical payload writes nothing."""
+        activity = sync_service.upsert_activities(db_session, account, [normalized()])['created'][0]
+        assert raw_payloads.store_raw_payloads(db_session, [(activity, dict(reversed(list(PAYLOAD.items()))))]) == 0
+
+        changed = {**PAYLOAD, 'name': 'Renamed'}
+        sync_service.upsert_activities(db_session, account, [normalized(changed, name='Renamed')])
+        assert raw_payloads.load_raw_payload(db_session, activity.id) == changed
+
+    def test_backfill_moves_legacy_rows(self, db_session, account):
+        """Test payloads stored on activity rows are moved without touching updated_at."""
+        updated_at = datetime(2024, 1, 15, 9)
+        db_session.add(Activity(
+            id="act_1", user_id="user_1", provider="STRAVA", provider_activity_id="1", name="Run",
+            activity_type=ActivityType.RUN, start_date=datetime(2024, 1, 15, 8), raw_data=PAYLOAD,
+            updated_at=updated_at,
+        ))
+        db_session.commit()
+        assert raw_payloads.load_raw_payload(db_session, "act_1") == PAYLOAD
+
+        assert raw_payloads.backfill_payloads(db_session, batch_size=1) == 1
+        db_session.expire_all()
+
+        activity = db_session.get(Activity, "act_1")
+        assert activity.raw_data is None
+        assert activity.updated_at == updated_at
+        assert activity.raw_data_hash == raw_payloads.encode_payload(PAYLOAD)[0]
+        assert raw_payloads.load_raw_payload(db_session, "act_1") == PAYLOAD
@@ -0,0 +1,117 @@
+"""Read replica routing tests."""
+
+import asyncio
+from contextlib import suppress
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_read_user, get_read_db
+from app.db import session as db_session_module
+from app.db.session import ReplicaRouter, pin_primary, read_session
+from app.db.base import Base
+from app.models.user import User
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    return [create_engine(f"sqlite:///{tmp_path}/replica_{i}.db") for i in range(2)]
+
+
+@pytest.fixture
+def router(monkeypatch, replicas):
+    router = ReplicaRouter(replicas, max_lag=5, check_interval=60)
+    router.check()
+    monkeypatch.setattr(db_session_module, "replica_router", router)
+    return router
+
+
+class TestReplicaRouter:
+    """Test suite for replica selection."""
+
+    def test_round_robin(self, router, replicas):
+        """Test reads alternate between healthy replicas."""
+        assert [router.pick() for _ in range(4)] == replicas * 2
+
+    def test_lagging_replica_skipped(self, router, replicas):
+        """Test a replica behind the lag limit is left out, and all lagging means primary."""
+        router._lag[replicas[0]] = 30.0
+        assert {router.pick() for _ in range(4)} == {replicas[1]}
+
+        router._lag[replicas[1]] = 30.0
+        assert router.pick() is None
+
+    def test_unreachable_replica_skipped(self, tmp_path):
+        """Test a replica failing its health check is out of rotation."""
+        down = create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+        up = create_engine(f"sqlite:///{tmp_path}/replica.db")
+        router = ReplicaRouter([down, up], max_lag=5, check_interval=60)
+        router.check()
+
+        assert {router.pick() for _ in range(4)} == {up}
+        assert [r["healthy"] for r in router.status()] == [False, True]
+
+    def test_pick_never_checks(self, replicas):
+        """Test picking only reads cached state: unchecked replicas are not used."""
+        router = ReplicaRouter(replicas, max_lag=5, check_interval=0)
+        assert router.pick() is None
+
+    @pytest.mark.asyncio
+    async def test_background_checks(self, replicas):
+        """Test the background loop records replica health."""
+        router = ReplicaRouter(replicas, max_lag=5, check_interval=60)
+        task = asyncio.create_task(router.run())
+        for _ in range(100):
+            if router.pick() is not None:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+        assert [r["healthy"] for r in router.status()] == [True, True]
+
+    def test_no_replicas(self):
+        """Test reads stay on the primary when no replicas are configured."""
+        assert ReplicaRouter([], max_lag=5, check_interval=60).pick() is None
+
+
+class TestReadSession:
+    """Test suite for read-only sessions."""
+
+    def test_pinned_user_reads_primary(self, router, replicas):
+        """Test a user who just wrote reads from the primary."""
+        db = read_session("user_1")
+        assert db.get_bind() in replicas
+        db.close()
+
+        pin_primary("user_1")
+        db = read_session("user_1")
+        assert db.get_bind() is db_session_module.engine
+        assert not db.info["read_only"]
+        db.close()
+
+    def test_replica_session_rejects_writes(self, router):
+        """Test writes through a replica session fail before reaching the database."""
+        db = read_session("user_1")
+        db.add(User(id="user_1", email="a@example.com", hashed_password="x"))
+        with pytest.raises(RuntimeError):
+            db.flush()
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_read_user_loaded_from_replica(self, router, replicas):
+        """Test read endpoints authenticate through the replica session."""
+        for replica in replicas:
+            Base.metadata.create_all(bind=replica)
+            with Session(replica) as db:
+                db.add(User(id="replica_user", email="r@example.com", hashed_password="x"))
+                db.commit()
+
+        sessions = get_read_db("replica_user")
+        db = next(sessions)
+        user = await get_current_read_user(db, "replica_user")
+        sessions.close()
+
+        assert user.id == "replica_user"
@@ -0,0 +1,101 @@
+"""Unit tests for route simplification and thumbnails."""
+
+from datetime import datetime
+
+import numpy as np
+
+from app.core import storage as storage_module
+from app.core.storage import LocalStorage, storage_url
+from app.models.activity import Activity, ActivityType
+from app.models.activity_route import ActivityRoute
+from app.models.user import User
+from app.services import route_thumbnails
+from app.services.analytics.routes import (
+    ROUTE_TOLERANCES, decode_polyline, dp_importance, encode_polyline, process_activity_route, project
+)
+
+
+def douglas_peucker(xy, tolerance):
+    """Textbook recursive Douglas-Peucker, returning kept indices."""
+    def recurse(start, end):
+        if end - start < 2:
+            return []
+        a, b = xy[start], xy[end]
+        ab = b - a
+        points = xy[start + 1:end]
+        distances = np.abs(ab[0] * (points[:, 1] - a[1]) - ab[1] * (points[:, 0] - a[0])) / np.hypot(*ab)
+        i = int(np.argmax(distances))
+        if distances[i] <= tolerance:
+            return []
+        split = start + 1 + i
+        return recurse(start, split) + [split] + recurse(split, end)
+
+    return [0] + recurse(0, len(xy) - 1) + [len(xy) - 1]
+
+
+def make_track(n=2000):
+    rng = np.random.default_rng(3)
+    t = np.linspace(0, 1, n)
+    return np.column_stack([
+        45.0 + 0.02 * t + 0.002 * np.sin(t * 40) + rng.normal(0, 2e-6, n),
+        7.0 + 0.03 * t + 0.001 * np.cos(t * 25),
+    ])
+
+
+class TestRoutes:
+    """Test suite for multi-tolerance simplification and polylines."""
+
+    def test_importance_matches_recursive_dp(self):
+        """Test every tolerance from one pass equals a separate DP run."""
+        xy = project(make_track())
+        importance = dp_importance(xy, min(ROUTE_TOLERANCES.values()))
+
+        for tolerance in (4.0, 10.0, 25.0, 100.0):
+            assert np.flatnonzero(importance > tolerance).tolist() == douglas_peucker(xy, tolerance)
+
+    def test_polyline_reference_example(self):
+        """Test encoding against Google's documented example."""
+        points = [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]]
+        assert encode_polyline(np.array(points)) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+        assert np.allclose(decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@"), points)
+
+    def test_polyline_round_trip(self):
+        """Test encoded tracks decode to the input at 1e-5 precision."""
+        track = make_track(500)
+        assert np.allclose(decode_polyline(encode_polyline(track)), track, atol=5e-6)
+
+    def test_process_and_render_thumbnail(self, db_session, tmp_path, monkeypatch):
+        """Test routes are stored and thumbnails land in storage."""
+        storage = LocalStorage(str(tmp_path), "/media")
+        monkeypatch.setattr(route_thumbnails, "get_storage", lambda: storage)
+
+        db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+        activity = Activity(
+            id="a1", user_id="athlete_1", provider="STRAVA", provider_activity_id="1",
+            name="Ride", activity_type=ActivityType.RIDE, start_date=datetime(2024, 1, 1), raw_data={},
+        )
+        db_session.add(activity)
+        track = make_track()
+        track[10] = [0.0, 0.0]  # lost fix
+        process_activity_route(db_session, activity, {'latlng': track})
+        db_session.commit()
+
+        route = db_session.get(ActivityRoute, "a1")
+        assert route.point_count == 1999
+        assert len(route.summary_polyline) < len(route.detail_polyline) < len(encode_polyline(track))
+        assert route.bounds[0] > 44
+
+        assert route_thumbnails.render_thumbnails(db_session, ["a1"]) == 1
+        key = db_session.get(ActivityRoute, "a1").thumbnail_key
+        svg = (tmp_path / key).read_text()
+        assert svg.startswith("<svg") and 'viewBox="0 0 128 128"' in svg
+        assert route_thumbnails.render_thumbnails(db_session, ["a1"]) == 0
+
+    def test_storage_url_without_backend(self, monkeypatch):
+        """Test URLs degrade to None when the storage backend can't be created."""
+        def unavailable():
+            raise RuntimeError("S3_ENDPOINT is set but boto3 is not installed")
+
+        monkeypatch.setattr(storage_module, "get_storage", unavailable)
+        assert storage_url("routes/a1.svg") is None
+        assert storage_url(None) is None
@@ -0,0 +1,65 @@
+"""Unit tests for the binary stream encoding."""
+
+import json
+import struct
+
+import numpy as np
+
+from app.services.analytics.stream_codec import (
+    ALIGNMENT,
+    MAGIC,
+    decode_streams,
+    encode_stream_parts,
+    encode_streams,
+)
+
+
+class TestStreamCodec:
+    """Test suite for typed-array encoding."""
+
+    def test_round_trip(self):
+        """Test channels keep dtype, shape and values."""
+        streams = {
+            'time': np.arange(7, dtype='<i4'),
+            'heartrate': np.array([120, 121, 125, 130, 0, 140, 141], dtype='<i2'),
+            'moving': np.array([1, 1, 1, 0, 0, 1, 1], dtype='|u1'),
+            'latlng': np.arange(14, dtype='<f8').reshape(7, 2),
+            'altitude': np.linspace(100, 110, 7).astype('<f4'),
+        }
+
+        decoded = decode_streams(encode_streams(streams))
+
+        assert list(decoded) == list(streams)
+        for name, array in streams.items():
+            assert decoded[name].dtype == array.dtype
+            assert np.array_equal(decoded[name], array)
+
+    def test_layout_is_aligned(self):
+        """Test the header is readable and every channel starts 8-byte aligned."""
+        body = encode_streams({
+            'moving': np.ones(3, dtype='|u1'),
+            'velocity_smooth': np.ones(3, dtype='<f4'),
+            'latlng': np.ones((3, 2), dtype='<f8'),
+        })
+
+        magic, header_length = struct.unpack_from('<4sI', body)
+        header = json.loads(body[8:8 + header_length])
+
+        assert magic == MAGIC
+        assert header['points'] == 3
+        assert [c['type'] for c in header['channels']] == ['uint8', 'float32', 'float64']
+        assert all(c['offset'] % ALIGNMENT == 0 for c in header['channels'])
+        assert header['channels'][-1]['offset'] + 3 * 2 * 8 == len(body)
+
+    def test_big_endian_input_is_converted(self):
+        """Test arrays are always sent little-endian."""
+        decoded = decode_streams(encode_streams({'watts': np.array([1, 256], dtype='>i2')}))
+        assert decoded['watts'].tolist() == [1, 256]
+
+    def test_parts_reference_channel_buffers(self):
+        """Test the streamed parts point at the channel arrays instead of copies."""
+        watts = np.arange(5, dtype='<i2')
+        parts = encode_stream_parts({'time': np.arange(5, dtype='<i4'), 'watts': watts})
+
+        assert b''.join(parts) == encode_streams({'time': np.arange(5, dtype='<i4'), 'watts': watts})
+        assert np.shares_memory(np.frombuffer(parts[-1], dtype='<i2'), watts)
@@ -0,0 +1,240 @@
+"""Unit tests for the activity sync service."""
+
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.activity import Activity, ActivityType, DataQuality
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.notification import Notification
+from app.models.user import User
+from app.services import sync_service
+from app.services.analytics.metrics import apply_metrics
+from app.services.analytics.streams import load_streams
+from app.services.events import broker
+from app.services.sync_service import SyncStatus
+
+
+def make_raw(activity_id: int, start: str = '2024-01-15T08:00:00Z') -> dict:
+    """Build a minimal Strava-style activity."""
+    return {
+        'id': activity_id,
+        'name': f'Run {activity_id}',
+        'type': 'Run',
+        'start_date': start,
+        'elapsed_time': 3600,
+        'distance': 10000.0,
+    }
+
+
+def normalize(raw: dict) -> dict:
+    """Normalize like StravaConnector.normalize_activity (subset)."""
+    return {
+        'provider': 'STRAVA',
+        'provider_activity_id': str(raw['id']),
+        'name': raw['name'],
+        'activity_type': 'RUN',
+        'start_date': raw['start_date'],
+        'duration_seconds': raw['elapsed_time'],
+        'distance_meters': raw['distance'],
+        'data_quality': 'PARTIAL',
+        'raw_data': raw,
+    }
+
+
+@pytest.fixture
+def account(db_session):
+    """Create a user with a connected Strava account."""
+    db_session.add(User(id="user_1", email="a@example.com", hashed_password="x"))
+    account = ConnectedAccount(
+        id="acc_1",
+        user_id="user_1",
+        provider=Provider.STRAVA,
+        provider_user_id="123",
+        access_token="token",
+    )
+    db_session.add(account)
+    db_session.commit()
+    return account
+
+
+@pytest.fixture
+def connector():
+    """Fake connector returning two pages of activities."""
+    pages = {
+        1: [make_raw(1), make_raw(2)],
+        2: [make_raw(3)],
+    }
+    connector = MagicMock()
+    connector.get_activities = AsyncMock(
+        side_effect=lambda token, after=None, page=1, per_page=30: pages.get(page, [])
+    )
+
+    def _normalize(raw):
+        normalized = normalize(raw)
+        normalized['start_date'] = datetime.fromisoformat(raw['start_date'].replace('Z', '+00:00'))
+        return normalized
+
+    connector.normalize_activity = MagicMock(side_effect=_normalize)
+    connector.get_activity_streams = AsyncMock(return_value={
+        'time': {'data': [0, 1, 2]},
+        'heartrate': {'data': [120, 125, 130]},
+    })
+    return connector
+
+
+class TestSyncService:
+    """Test suite for account sync and status events."""
+
+    @pytest.mark.asyncio
+    async def test_sync_account_creates_activities(self, db_session, account, connector):
+        """Test a full sync pages through results and stores activities."""
+        summary = await sync_service.sync_account(db_session, account, connector, per_page=2)
+
+        assert summary == {
+            'created': 3, 'updated': 0, 'unchanged': 0, 'matched': 0, 'duplicates': 0, 'pages': 2, 'skip_rate': 0.0,
+        }
+        assert db_session.query(Activity).count() == 3
+        assert account.last_sync_status == SyncStatus.SUCCESS
+        assert account.last_sync_at is not None
+
+        activity = db_session.query(Activity).filter(Activity.provider_activity_id == '1').one()
+        assert activity.activity_type == ActivityType.RUN
+        assert activity.start_date.tzinfo is None
+        assert (activity.end_date - activity.start_date).total_seconds() == 3600
+
+        assert db_session.query(Notification).count() == 1
+
+        streams = load_streams(db_session, activity.id)
+        assert streams['heartrate'].tolist() == [120, 125, 130]
+        assert connector.get_activity_streams.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_resync_skips_unchanged(self, db_session, account, connector):
+        """Test re-syncing unchanged activities writes nothing and reports the skip rate."""
+        await sync_service.sync_account(db_session, account, connector, per_page=2)
+        synced_at = {a.id: (a.synced_at, a.updated_at) for a in db_session.query(Activity)}
+
+        summary = await sync_service.sync_account(db_session, account, connector, per_page=2)
+
+        assert (summary['created'], summary['updated'], summary['unchanged']) == (0, 0, 3)
+        assert summary['skip_rate'] == 1.0
+        db_session.expire_all()
+        assert {a.id: (a.synced_at, a.updated_at) for a in db_session.query(Activity)} == synced_at
+
+    def test_resync_updates_changed(self, db_session, account):
+        """Test only activities whose normalized values changed are updated."""
+        first, second = normalize(make_raw(1)), normalize(make_raw(2))
+        for normalized in (first, second):
+            normalized['start_date'] = datetime(2024, 1, 15, 8)
+        sync_service.upsert_activities(db_session, account, [first, second])
+
+        result = sync_service.upsert_activities(db_session, account, [dict(first, name='Renamed'), second])
+
+        assert [a.name for a in result['updated']] == ['Renamed']
+        assert len(result['unchanged']) == 1
+        assert db_session.query(Activity).count() == 2
+
+    def test_update_keeps_backfilled_metrics(self, db_session, account):
+        """Test a provider-side rename doesn't wipe metric columns filled from streams."""
+        normalized = dict(normalize(make_raw(1)), start_date=datetime(2024, 1, 15, 8),
+                          normalized_power=None, moving_time_seconds=None, avg_temperature=None)
+        activity = sync_service.upsert_activities(db_session, account, [normalized])['created'][0]
+        apply_metrics(activity, {'normalized_power': 250.0, 'moving_time_seconds': 3500, 'avg_temperature': None})
+        activity.processed_data = {**activity.processed_data, 'stages': {'metrics': 1, 'zones': 1}}
+        db_session.commit()
+
+        result = sync_service.upsert_activities(db_session, account, [dict(normalized, name='Renamed')])
+
+        assert result['updated'] == [activity]
+        assert activity.name == 'Renamed'
+        assert (activity.normalized_power, activity.moving_time_seconds) == (250.0, 3500)
+        assert activity.processed_data['stages'] == {'zones': 1}
+
+    def test_moved_activity_rechecked_for_duplicates(self, db_session, account):
+        """Test an update that moves an activity onto another provider's copy links them."""
+        normalized = dict(normalize(make_raw(1)), start_date=datetime(2024, 1, 15, 8))
+        activity = sync_service.upsert_activities(db_session, account, [normalized])['created'][0]
+        db_session.add(Activity(
+            id="coros_1", user_id="user_1", provider="COROS", provider_activity_id="c1", name="Run",
+            activity_type=ActivityType.RUN, start_date=datetime(2024, 1, 15, 10), duration_seconds=3600,
+            distance_meters=10000.0, data_quality=DataQuality.FULL, raw_data={},
+        ))
+        db_session.commit()
+        sync_service.resolve_duplicates(db_session, [db_session.get(Activity, "coros_1")])
+        db_session.commit()
+
+        result = sync_service.upsert_activities(
+            db_session, account, [dict(normalized, start_date=datetime(2024, 1, 15, 10))]
+        )
+
+        assert result['duplicates'] == [activity]
+        assert activity.duplicate_of_id == "coros_1"
+
+    def test_upsert_matches_moved_start(self, db_session, account):
+        """Test an activity whose start time the provider corrected is updated in place."""
+        raw = make_raw(1)
+        normalized = normalize(raw)
+        normalized['start_date'] = datetime(2024, 1, 15, 8)
+        sync_service.upsert_activities(db_session, account, [normalized])
+
+        normalized = dict(normalized, start_date=datetime(2024, 1, 15, 10), name='Corrected')
+        result = sync_service.upsert_activities(db_session, account, [normalized])
+
+        assert [a.name for a in result['updated']] == ['Corrected']
+        assert db_session.query(Activity).count() == 1
+
+    def test_upsert_matches_start_moved_past_slack(self, db_session, account):
+        """Test an activity moved by more than the lookup slack is updated, not inserted again."""
+        normalized = dict(normalize(make_raw(1)), start_date=datetime(2024, 1, 15, 8))
+        activity = sync_service.upsert_activities(db_session, account, [normalized])['created'][0]
+
+        moved = dict(normalized, start_date=datetime(2024, 3, 1, 8), name='Corrected')
+        result = sync_service.upsert_activities(db_session, account, [moved])
+
+        assert result['updated'] == [activity]
+        assert activity.start_date == datetime(2024, 3, 1, 8)
+        assert db_session.query(Activity).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_failure_sets_status(self, db_session, account, connector):
+        """Test a connector error marks the account as failed and notifies."""
+        connector.get_activities = AsyncMock(side_effect=Exception("RATE_LIMIT_EXCEEDED"))
+
+        with pytest.raises(Exception, match="RATE_LIMIT_EXCEEDED"):
+            await sync_service.sync_account(db_session, account, connector)
+
+        assert account.last_sync_status == SyncStatus.FAILED
+        assert db_session.query(Notification).count() == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_events_published(self, db_session, account, connector):
+        """Test status transitions and notifications reach a subscriber."""
+        async with broker.subscribe(account.user_id) as queue:
+            await sync_service.sync_account(db_session, account, connector, per_page=2)
+
+            events = []
+            while not queue.empty():
+                events.append(json.loads(queue.get_nowait()))
+
+        sync_statuses = [e['data']['status'] for e in events if e['event'] == 'sync']
+        assert sync_statuses == [
+            SyncStatus.IN_PROGRESS, SyncStatus.IN_PROGRESS, SyncStatus.IN_PROGRESS, SyncStatus.SUCCESS
+        ]
+        assert events[-1]['event'] == 'notification'
+        assert events[-1]['data']['type'] == 'sync_completed'
+
+    @pytest.mark.asyncio
+    async def test_events_isolated_per_user(self):
+        """Test a user's events are not delivered to other users."""
+        async with broker.subscribe("user_a") as queue_a, broker.subscribe("user_b") as queue_b:
+            broker.publish("user_a", "sync", {"status": "success"})
+
+            message = await asyncio.wait_for(queue_a.get(), timeout=1)
+            assert json.loads(message)['data']['status'] == "success"
+            assert queue_b.empty()
+
+        assert broker.connection_count == 0
@@ -0,0 +1,71 @@
+"""Unit tests for the synthetic dataset generator."""
+
+from datetime import datetime
+
+import pytest
+
+from app.db import synthetic_data
+from app.db.synthetic_data import Dataset, SyntheticConfig, generate, generate_athlete
+from app.models.activity import Activity
+from app.models.activity_stream import ActivityStream
+from app.models.athlete_coach import AthleteCoach
+from app.models.user import User, UserRole
+from app.models.workout import Workout, WorkoutStatus
+from app.services.analytics.streams import load_streams
+from app.services.raw_payloads import load_raw_payload
+
+CONFIG = SyntheticConfig(
+    users=12, coach_ratio=0.1, coached_ratio=0.5, years=0.5, activities_per_week=5,
+    stream_ratio=0.1, max_stream_samples=300, plans_per_athlete=2, chunk_users=5, seed=7,
+)
+
+
+@pytest.fixture(autouse=True)
+def cheap_password_hash(monkeypatch):
+    monkeypatch.setattr(synthetic_data, 'get_password_hash', lambda password: 'x')
+
+
+class TestSyntheticData:
+    """Test suite for synthetic data generation and loading."""
+
+    def test_deterministic(self):
+        """Test the same seed and user index produce identical rows."""
+        first, second = Dataset(), Dataset()
+        generate_athlete(CONFIG, 3, first)
+        generate_athlete(CONFIG, 3, second)
+        assert first.rows == second.rows
+        assert first.rows['activities']
+
+        other = Dataset()
+        generate_athlete(SyntheticConfig(seed=8, years=0.5), 3, other)
+        assert other.rows['activities'] != first.rows['activities']
+
+    def test_load(self, db_engine, db_session):
+        """Test a chunked load writes every table consistently."""
+        totals = generate(db_engine, CONFIG)
+
+        assert db_session.query(User).count() == CONFIG.users == totals['users']
+        assert db_session.query(User).filter(User.role == UserRole.COACH).count() == 1
+        assert db_session.query(Activity).count() == totals['activities'] > 0
+        assert db_session.query(AthleteCoach).count() == totals['athlete_coaches']
+
+        activity = db_session.query(Activity).first()
+        assert activity.start_date < CONFIG.end
+        assert activity.fingerprint
+        assert load_raw_payload(db_session, activity.id)['type'] == activity.sport_type
+
+        streamed = db_session.query(ActivityStream.activity_id).distinct().first()
+        assert streamed is not None
+        assert len(load_streams(db_session, streamed[0])['time']) > 1
+
+        completed = db_session.query(Workout).filter(Workout.status == WorkoutStatus.COMPLETED).all()
+        assert completed and all(w.activity_id for w in completed)
+        assert db_session.query(Workout).filter(
+            Workout.status == WorkoutStatus.PLANNED, Workout.scheduled_date < CONFIG.end
+        ).count() == 0
+
+    def test_append_users(self, db_engine, db_session):
+        """Test users can be appended without clashing with earlier ones."""
+        generate(db_engine, SyntheticConfig(**{**CONFIG.__dict__, 'users': 6}))
+        generate(db_engine, CONFIG, first_user=6)
+        assert db_session.query(User).count() == CONFIG.users
@@ -0,0 +1,133 @@
+"""Unit tests for the OAuth token manager."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.connected_account import ConnectedAccount, Provider
+from app.models.user import User
+from app.services.token_manager import TokenManager
+
+
+def make_account(db, account_id, provider=Provider.STRAVA, expires_in=60):
+    account = ConnectedAccount(
+        id=account_id,
+        user_id="user_1",
+        provider=provider,
+        provider_user_id=account_id,
+        access_token=f"{account_id}_old",
+        refresh_token=f"{account_id}_refresh",
+        token_expires_at=int(time.time()) + expires_in,
+    )
+    db.add(account)
+    return account
+
+
+def make_connector(delay=0.0, fail_for=()):
+    async def refresh(refresh_token):
+        await asyncio.sleep(delay)
+        account_id = refresh_token.replace("_refresh", "")
+        if account_id in fail_for:
+            raise Exception("invalid_grant")
+        return {
+            'access_token': f"{account_id}_new",
+            'refresh_token': f"{account_id}_refresh2",
+            'expires_at': int(time.time()) + 21600,
+        }
+
+    connector = MagicMock()
+    connector.refresh_access_token = AsyncMock(side_effect=refresh)
+    return connector
+
+
+@pytest.fixture
+def user(db_session):
+    db_session.add(User(id="user_1", email="a@example.com", hashed_password="x"))
+    db_session.commit()
+
+
+class TestTokenManager:
+    """Test suite for expiry ordering and single-flight refresh."""
+
+    def test_due_pops_in_expiry_order(self, db_session, user):
+        """Test only accounts inside the margin are due, and re-keyed entries are skipped."""
+        manager = TokenManager(margin_seconds=600)
+        soon = make_account(db_session, "soon", expires_in=60)
+        later = make_account(db_session, "later", expires_in=300)
+        make_account(db_session, "fresh", expires_in=7200)
+        make_account(db_session, "polar", provider=Provider.POLAR, expires_in=60)
+        db_session.commit()
+        assert manager.load(db_session) == 3
+
+        later.token_expires_at += 3600
+        manager.track(later)
+
+        assert manager.due() == ["soon"]
+        assert manager.due() == []
+        soon.token_expires_at = int(time.time()) + 30
+        manager.track(soon)
+        assert manager.due() == ["soon"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_refresh(self, db_session, user):
+        """Test one provider call serves every concurrent caller."""
+        manager = TokenManager(margin_seconds=600)
+        account = make_account(db_session, "acc_1")
+        db_session.commit()
+        connector = make_connector(delay=0.05)
+
+        tokens = await asyncio.gather(*(
+            manager.get_access_token(db_session, account, connector) for _ in range(5)
+        ))
+
+        assert tokens == ["acc_1_new"] * 5
+        assert connector.refresh_access_token.await_count == 1
+        assert account.refresh_token == "acc_1_refresh2"
+        assert await manager.get_access_token(db_session, account, connector) == "acc_1_new"
+        assert connector.refresh_access_token.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_due_in_batches(self, db_engine, db_session, user):
+        """Test due accounts are refreshed per batch and failures are counted."""
+        for i in range(5):
+            make_account(db_session, f"acc_{i}", expires_in=30 * i)
+        make_account(db_session, "fresh", expires_in=7200)
+        db_session.commit()
+
+        connector = make_connector(fail_for={"acc_3"})
+        manager = TokenManager(
+            connector_factory=lambda provider: connector,
+            session_factory=sessionmaker(autoflush=False, bind=db_engine),
+            margin_seconds=600,
+            batch_size=2,
+        )
+        manager.load(db_session)
+
+        assert await manager.refresh_due() == {'refreshed': 4, 'failed': 1}
+        db_session.expire_all()
+        assert db_session.get(ConnectedAccount, "acc_0").access_token == "acc_0_new"
+        assert db_session.get(ConnectedAccount, "acc_3").access_token == "acc_3_old"
+        assert db_session.get(ConnectedAccount, "fresh").access_token == "fresh_old"
+
+    @pytest.mark.asyncio
+    async def test_run_survives_failed_pass(self, db_engine, user):
+        """Test a failing pass is logged and the loop keeps going until cancelled."""
+        manager = TokenManager(session_factory=sessionmaker(autoflush=False, bind=db_engine))
+        passes = []
+
+        async def refresh_due():
+            passes.append(len(passes))
+            if len(passes) == 1:
+                raise RuntimeError("database unavailable")
+            return {'refreshed': 0, 'failed': 0}
+
+        manager.refresh_due = refresh_due
+        task = asyncio.create_task(manager.run(interval=0.01))
+        while len(passes) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
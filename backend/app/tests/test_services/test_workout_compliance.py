@@ -0,0 +1,154 @@
+"""Unit tests for the workout compiler and compliance scorer."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.workout import Workout
+from app.services.analytics import workout_compiler
+from app.services.analytics.compliance import score_compliance
+from app.services.analytics.workout_compiler import (
+    TARGET_HEART_RATE,
+    TARGET_NONE,
+    TARGET_POWER,
+    TARGET_SPEED,
+    compile_structure,
+    compile_workout,
+)
+
+
+@pytest.fixture
+def interval_structure():
+    """10min warm-up, 3x (2min hard / 1min easy), 5min cool-down."""
+    return {
+        'steps': [
+            {'name': 'Warm up', 'duration': 600, 'target': {'type': 'heart_rate', 'min': 120, 'max': 140}},
+            {'repeat': 3, 'steps': [
+                {'name': 'Hard', 'duration': 120, 'target': {'type': 'power', 'min': 250, 'max': 280}},
+                {'name': 'Easy', 'duration': 60},
+            ]},
+            {'name': 'Cool down', 'duration': 300},
+        ]
+    }
+
+
+class TestWorkoutCompiler:
+    """Test suite for structure compilation."""
+
+    def test_compile_flattens_repeats(self, interval_structure):
+        """Test repeats expand into a flat timeline."""
+        timeline = compile_structure(interval_structure)
+
+        assert timeline.step_count == 8
+        assert timeline.total_duration == 600 + 3 * 180 + 300
+        assert timeline.kinds.tolist() == [
+            TARGET_HEART_RATE, TARGET_POWER, TARGET_NONE, TARGET_POWER,
+            TARGET_NONE, TARGET_POWER, TARGET_NONE, TARGET_NONE,
+        ]
+        assert timeline.starts[1] == 600
+        assert timeline.ends[1] == 720
+
+    def test_pace_target_becomes_speed(self):
+        """Test pace targets (s/km) convert to a speed range and time distance steps."""
+        timeline = compile_structure([
+            {'distance': 1000, 'target': {'type': 'pace', 'min': 240, 'max': 260}},
+        ])
+
+        assert timeline.kinds.tolist() == [TARGET_SPEED]
+        assert timeline.lows[0] == pytest.approx(1000 / 260)
+        assert timeline.highs[0] == pytest.approx(1000 / 240)
+        assert 240 < timeline.total_duration < 260
+
+    def test_zero_pace_rejected(self):
+        """Test a pace target of zero is a validation error."""
+        with pytest.raises(ValueError, match="positive"):
+            compile_structure([{'distance': 1000, 'target': {'type': 'pace', 'min': 0, 'max': 260}}])
+
+    def test_repeats_capped(self):
+        """Test a huge repeat count is rejected instead of expanded."""
+        with pytest.raises(ValueError, match="steps"):
+            compile_structure([{'repeat': 10 ** 9, 'steps': [{'duration': 60}]}])
+
+    def test_untimed_steps_are_dropped(self):
+        """Test distance steps without a pace target are skipped."""
+        timeline = compile_structure([{'distance': 1000}, {'duration': 60}])
+        assert timeline.step_count == 1
+
+    def test_compile_cached_per_revision(self, interval_structure):
+        """Test the timeline is reused until the workout changes."""
+        workout_compiler.clear_cache()
+        workout = Workout(id='w1', structure=interval_structure, updated_at=datetime(2024, 1, 1))
+
+        first = compile_workout(workout)
+        assert compile_workout(workout) is first
+
+        workout.structure = {'steps': [{'duration': 60}]}
+        workout.updated_at = datetime(2024, 1, 2)
+        assert compile_workout(workout).step_count == 1
+
+
+class TestComplianceScorer:
+    """Test suite for compliance scoring."""
+
+    def test_perfect_execution(self, interval_structure):
+        """Test an activity that hits every target scores 1.0."""
+        timeline = compile_structure(interval_structure)
+        time = np.arange(0, int(timeline.total_duration))
+        step = np.searchsorted(timeline.ends, time, side='right')
+
+        streams = {
+            'time': time,
+            'heartrate': np.full(len(time), 130),
+            'watts': np.where(timeline.kinds[step] == TARGET_POWER, 265, 100),
+        }
+
+        result = score_compliance(timeline, streams)
+
+        assert result['overall'] == 1.0
+        assert result['duration_ratio'] == 1.0
+        assert result['steps'][0]['compliance'] == 1.0
+        assert result['steps'][1]['average'] == 265
+        assert result['steps'][2]['compliance'] is None
+
+    def test_partial_execution(self, interval_structure):
+        """Test missing half of each interval halves its score."""
+        timeline = compile_structure(interval_structure)
+        time = np.arange(0, int(timeline.total_duration))
+        step = np.searchsorted(timeline.ends, time, side='right')
+        offset = time - timeline.starts[np.minimum(step, timeline.step_count - 1)]
+
+        watts = np.where((timeline.kinds[step] == TARGET_POWER) & (offset < 60), 265, 200)
+        streams = {'time': time, 'heartrate': np.full(len(time), 130), 'watts': watts}
+
+        result = score_compliance(timeline, streams)
+
+        assert [s['compliance'] for s in result['steps'] if s['target'] and s['target']['channel'] == 'watts'] == [0.5] * 3
+        # 600s of HR fully in range + 3 * 60s of power in range, over 960s targeted
+        assert result['overall'] == pytest.approx((600 + 180) / 960, abs=1e-3)
+
+    def test_missing_channel(self, interval_structure):
+        """Test steps whose channel was not recorded are unscored."""
+        timeline = compile_structure(interval_structure)
+        time = np.arange(0, 600)
+
+        result = score_compliance(timeline, {'time': time, 'heartrate': np.full(600, 150)})
+
+        assert result['overall'] == 0.0
+        assert result['steps'][1]['compliance'] is None
+        assert result['duration_ratio'] == pytest.approx(600 / 1440, abs=1e-3)
+
+    def test_short_channel_truncated(self, interval_structure):
+        """Test a channel shorter than 'time' leaves the tail unmeasured."""
+        timeline = compile_structure(interval_structure)
+        time = np.arange(0, 900)
+
+        result = score_compliance(timeline, {'time': time, 'heartrate': np.full(300, 130)})
+
+        assert result['steps'][0]['compliance'] == 1.0
+        assert result['steps'][0]['recorded_seconds'] == 600
+
+    def test_empty_streams(self, interval_structure):
+        """Test scoring without streams returns no score."""
+        result = score_compliance(compile_structure(interval_structure), {})
+        assert result == {'overall': None, 'duration_ratio': None, 'steps': []}
@@ -0,0 +1,143 @@
+"""Unit tests for activity-to-workout matching."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.user import User
+from app.models.workout import Workout, WorkoutStatus
+from app.services.workout_matching import (
+    MIN_SCORE,
+    PlannedWorkoutIndex,
+    match_activities,
+    match_history,
+    score_candidate,
+)
+
+
+@pytest.fixture
+def athlete(db_session):
+    """Create an athlete and a coach."""
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    db_session.add(User(id="coach_1", email="c@example.com", hashed_password="x"))
+    db_session.commit()
+    return "athlete_1"
+
+
+def make_workout(db, workout_id, day, workout_type='run', duration=3600, distance=10000.0):
+    workout = Workout(
+        id=workout_id,
+        created_by="coach_1",
+        athlete_id="athlete_1",
+        title=workout_id,
+        workout_type=workout_type,
+        scheduled_date=day,
+        target_duration=duration,
+        target_distance=distance,
+        status=WorkoutStatus.PLANNED,
+    )
+    db.add(workout)
+    return workout
+
+
+def make_activity(db, activity_id, start, activity_type=ActivityType.RUN, duration=3600, distance=10000.0):
+    activity = Activity(
+        id=activity_id,
+        user_id="athlete_1",
+        provider="STRAVA",
+        provider_activity_id=activity_id,
+        name=activity_id,
+        activity_type=activity_type,
+        start_date=start,
+        end_date=start + timedelta(seconds=duration),
+        duration_seconds=duration,
+        distance_meters=distance,
+        raw_data={},
+    )
+    db.add(activity)
+    return activity
+
+
+class TestWorkoutMatching:
+    """Test suite for the matching engine."""
+
+    def test_score_requires_compatible_type(self):
+        """Test incompatible types never match and close targets score high."""
+        workout = Workout(workout_type='Running', target_duration=3600, target_distance=10000.0)
+        run = Activity(activity_type=ActivityType.RUN, duration_seconds=3300, distance_meters=9500.0)
+        ride = Activity(activity_type=ActivityType.RIDE, duration_seconds=3600, distance_meters=10000.0)
+
+        assert score_candidate(workout, ride) == 0.0
+        assert score_candidate(workout, run) > 0.9
+
+    def test_links_activity_to_same_day_workout(self, db_session, athlete):
+        """Test an activity completes the planned workout scheduled that day."""
+        make_workout(db_session, 'w1', datetime(2024, 3, 4))
+        make_workout(db_session, 'w2', datetime(2024, 3, 5))
+        activity = make_activity(db_session, 'a1', datetime(2024, 3, 4, 7, 30))
+        db_session.commit()
+
+        matched = match_activities(db_session, [activity])
+
+        assert [(a.id, w.id) for a, w, _ in matched] == [('a1', 'w1')]
+        workout = db_session.get(Workout, 'w1')
+        assert workout.activity_id == 'a1'
+        assert workout.status == WorkoutStatus.COMPLETED
+        assert workout.completed_at == datetime(2024, 3, 4, 8, 30)
+        assert db_session.get(Workout, 'w2').status == WorkoutStatus.PLANNED
+
+        # Already linked activities are left alone
+        assert match_activities(db_session, [activity]) == []
+
+    def test_matches_on_local_day(self, db_session, athlete):
+        """Test an evening run west of UTC matches that evening's workout, not the next day's."""
+        make_workout(db_session, 'tue', datetime(2024, 3, 5))
+        make_workout(db_session, 'wed', datetime(2024, 3, 6))
+        activity = make_activity(db_session, 'a1', datetime(2024, 3, 6, 2, 30))
+        activity.timezone = "(GMT-08:00) America/Los_Angeles"
+        db_session.commit()
+
+        matched = match_activities(db_session, [activity])
+
+        assert [w.id for _, w, _ in matched] == ['tue']
+
+    def test_day_assignment_prefers_best_pairs(self, db_session, athlete):
+        """Test two sessions on one day go to the workouts they fit best."""
+        day = datetime(2024, 3, 4)
+        make_workout(db_session, 'easy', day, duration=1800, distance=5000.0)
+        make_workout(db_session, 'long', day, duration=7200, distance=20000.0)
+        make_workout(db_session, 'swim', day, workout_type='swim', duration=1800, distance=1500.0)
+        short = make_activity(db_session, 'a_short', day.replace(hour=7), duration=1750, distance=5100.0)
+        long = make_activity(db_session, 'a_long', day.replace(hour=17), duration=7000, distance=19500.0)
+        db_session.commit()
+
+        matched = {a.id: w.id for a, w, _ in match_activities(db_session, [long, short])}
+
+        assert matched == {'a_short': 'easy', 'a_long': 'long'}
+        assert db_session.get(Workout, 'swim').status == WorkoutStatus.PLANNED
+
+    def test_poor_fit_is_not_linked(self, db_session, athlete):
+        """Test a candidate below the score threshold stays planned."""
+        make_workout(db_session, 'w1', datetime(2024, 3, 4), duration=7200, distance=30000.0)
+        activity = make_activity(db_session, 'a1', datetime(2024, 3, 4, 7), duration=900, distance=2000.0)
+        db_session.commit()
+
+        assert score_candidate(db_session.get(Workout, 'w1'), activity) < MIN_SCORE
+        assert match_activities(db_session, [activity]) == []
+
+    def test_match_history_backfill(self, db_session, athlete):
+        """Test bulk matching over a stored history with one preloaded index."""
+        start = datetime(2024, 1, 1)
+        for i in range(30):
+            day = start + timedelta(days=i)
+            make_workout(db_session, f'w{i}', day)
+            if i % 3:
+                make_activity(db_session, f'a{i}', day.replace(hour=6))
+        db_session.commit()
+
+        index = PlannedWorkoutIndex.load(db_session, ['athlete_1'], start.date(), (start + timedelta(days=29)).date())
+        assert len(index) == 30
+
+        assert match_history(db_session, 'athlete_1') == 20
+        assert db_session.query(Workout).filter(Workout.status == WorkoutStatus.PLANNED).count() == 10
@@ -0,0 +1,134 @@
+"""Unit tests for thresholds and time-in-zone histograms."""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.activity import Activity, ActivityType
+from app.models.activity_zones import ActivityZones
+from app.models.athlete_threshold import AthleteThreshold, ThresholdMetric
+from app.models.user import User
+from app.services.analytics.streams import save_streams
+from app.services.analytics.zones import compute_zones, decode, weekly_distribution
+from app.services.threshold_service import (
+    ThresholdHistory,
+    delete_threshold,
+    pending_count,
+    run_recompute,
+    set_threshold,
+)
+
+
+@pytest.fixture
+def athlete(db_session):
+    db_session.add(User(id="athlete_1", email="a@example.com", hashed_password="x"))
+    db_session.commit()
+    return "athlete_1"
+
+
+def make_ride(db, activity_id, start, watts=200):
+    db.add(Activity(
+        id=activity_id,
+        user_id="athlete_1",
+        provider="STRAVA",
+        provider_activity_id=activity_id,
+        name=activity_id,
+        activity_type=ActivityType.RIDE,
+        start_date=start,
+        raw_data={},
+    ))
+    save_streams(db, activity_id, {
+        'time': np.arange(600, dtype=np.int32),
+        'watts': np.full(600, watts, dtype=np.int16),
+    })
+    db.commit()
+
+
+def zones_by_activity(db):
+    return {
+        z.activity_id: (z.threshold, decode(z.seconds).tolist())
+        for z in db.query(ActivityZones).filter(ActivityZones.kind == 'power')
+    }
+
+
+class TestZones:
+    """Test suite for zones and threshold history."""
+
+    def test_compute_zones(self):
+        """Test samples are binned by threshold fraction and HR dropouts skipped."""
+        streams = {
+            'time': np.arange(400),
+            'watts': np.concatenate([np.full(100, 100), np.full(300, 260)]),
+            'heartrate': np.concatenate([np.zeros(100), np.full(300, 170)]),
+        }
+
+        zones = compute_zones(streams, {'power': 250.0, 'heartrate': 170.0, 'pace': None})
+
+        assert zones['power'].tolist() == [100, 0, 0, 300, 0, 0, 0]
+        assert zones['heartrate'].tolist() == [0, 0, 0, 0, 300, 0, 0]
+        assert 'pace' not in zones
+
+    def test_threshold_at_date(self):
+        """Test lookups use the latest entry, falling back to the first."""
+        history = ThresholdHistory([
+            AthleteThreshold(metric=ThresholdMetric.FTP, value=250, effective_from=datetime(2024, 6, 1)),
+            AthleteThreshold(metric=ThresholdMetric.FTP, value=230, effective_from=datetime(2024, 1, 1)),
+        ])
+
+        assert history.at(ThresholdMetric.FTP, datetime(2023, 5, 1)) == 230
+        assert history.at(ThresholdMetric.FTP, datetime(2024, 3, 1)) == 230
+        assert history.at(ThresholdMetric.FTP, datetime(2024, 6, 1)) == 250
+        assert history.at(ThresholdMetric.LTHR, datetime(2024, 6, 1)) is None
+        assert history.affected_range(ThresholdMetric.FTP, datetime(2024, 1, 1)) == (None, datetime(2024, 6, 1))
+        assert history.affected_range(ThresholdMetric.FTP, datetime(2024, 6, 1)) == (datetime(2024, 6, 1), None)
+
+    def test_threshold_change_recomputes_range(self, db_session, athlete):
+        """Test only activities governed by the changed entry are recomputed."""
+        make_ride(db_session, 'jan', datetime(2024, 1, 10))
+        make_ride(db_session, 'mar', datetime(2024, 3, 10))
+        make_ride(db_session, 'jul', datetime(2024, 7, 10))
+
+        _, job = set_threshold(db_session, athlete, ThresholdMetric.FTP, 250, datetime(2024, 1, 1))
+        assert pending_count(db_session, job) == 3
+        assert run_recompute(db_session, job) == 3
+        assert zones_by_activity(db_session)['jan'] == (250, [0, 0, 600, 0, 0, 0, 0])
+
+        threshold, job = set_threshold(db_session, athlete, ThresholdMetric.FTP, 180, datetime(2024, 3, 1))
+        assert pending_count(db_session, job) == 2
+        assert run_recompute(db_session, job) == 2
+        zones = zones_by_activity(db_session)
+        assert zones['jan'][0] == 250
+        assert zones['mar'] == (180, [0, 0, 0, 0, 600, 0, 0])
+        assert zones['jul'][0] == 180
+
+        assert run_recompute(db_session, delete_threshold(db_session, threshold)) == 2
+        assert zones_by_activity(db_session)['jul'][0] == 250
+
+    def test_aware_effective_from_stored_as_utc(self, db_session, athlete):
+        """Test a "Z"-suffixed effective_from is compared and stored as naive UTC."""
+        make_ride(db_session, 'jan', datetime(2024, 1, 10))
+        make_ride(db_session, 'mar', datetime(2024, 3, 10))
+        set_threshold(db_session, athlete, ThresholdMetric.FTP, 250, datetime(2024, 1, 1))
+
+        threshold, job = set_threshold(
+            db_session, athlete, ThresholdMetric.FTP, 180, datetime.fromisoformat("2024-03-01T00:00:00Z")
+        )
+
+        assert threshold.effective_from == datetime(2024, 3, 1)
+        assert job.start == datetime(2024, 3, 1)
+        assert run_recompute(db_session, job) == 1
+
+    def test_weekly_distribution_sums_arrays(self, db_session, athlete):
+        """Test weekly totals add up stored arrays per Monday-start week."""
+        make_ride(db_session, 'mon', datetime(2024, 1, 8, 7))
+        make_ride(db_session, 'sun', datetime(2024, 1, 14, 7), watts=100)
+        make_ride(db_session, 'next', datetime(2024, 1, 15, 7))
+        run_recompute(db_session, set_threshold(db_session, athlete, ThresholdMetric.FTP, 250, datetime(2024, 1, 1))[1])
+
+        weeks = weekly_distribution(db_session, athlete, 'power', datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+        assert [w['week_start'] for w in weeks] == [datetime(2024, 1, 8), datetime(2024, 1, 15)]
+        assert weeks[0]['seconds'] == [600, 0, 600, 0, 0, 0, 0]
+        assert weeks[0]['activity_count'] == 2
+        assert weeks[1]['seconds'] == [0, 0, 600, 0, 0, 0, 0]
@@ -0,0 +1,199 @@
+"""End-to-end sync benchmark against the fake provider APIs.
+
+Creates one user with a connected account per provider and athlete, runs
+``sync_account`` for all of them concurrently (connector -> upsert ->
+streams -> analytics -> matching) and reports throughput, provider
+request counts and connector retry / breaker counters.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.sync_benchmark --athletes 4 --activities 100 \\
+        --latency-ms 80 --error-rate 0.02
+
+Uses a throwaway SQLite database (one account at a time) unless
+``DATABASE_URL`` is set.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+# Settings are read at import time
+_workdir = tempfile.mkdtemp(prefix="trainlytics-bench-")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/benchmark.db")
+os.environ.setdefault("REDIS_URL", "")
+os.environ.setdefault("MEDIA_ROOT", os.path.join(_workdir, "media"))
+os.environ.setdefault("GARMIN_CONSUMER_KEY", "bench-garmin-key")
+os.environ.setdefault("GARMIN_CONSUMER_SECRET", "bench-garmin-secret")
+os.environ.setdefault("COROS_API_KEY", "bench-coros-key")
+os.environ.setdefault("COROS_API_SECRET", "bench-coros-secret")
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.activity import Activity  # noqa: E402
+from app.models.connected_account import ConnectedAccount, Provider  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import sync_service  # noqa: E402
+from app.services.connectors import resilience  # noqa: E402
+from app.services.connectors.resilience import RetryPolicy  # noqa: E402
+from app.services.connectors.coros_connector import CorosConnector  # noqa: E402
+from app.services.connectors.garmin_connector import GarminConnector  # noqa: E402
+from app.services.connectors.polar_connector import PolarConnector  # noqa: E402
+from app.services.connectors.strava_connector import StravaConnector  # noqa: E402
+from benchmarks.fake_providers import (  # noqa: E402
+    PROVIDERS, FakeProviderConfig, attach, create_app, garmin_token_secret
+)
+
+CONNECTORS = {
+    Provider.STRAVA: StravaConnector,
+    Provider.POLAR: PolarConnector,
+    Provider.GARMIN: GarminConnector,
+    Provider.COROS: CorosConnector,
+}
+
+
+def setup_accounts(providers, athletes: int):
+    """Create users and connected accounts; returns account ids."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    account_ids = []
+    try:
+        for _ in range(athletes):
+            user = User(id=str(uuid.uuid4()), email=f"bench-{uuid.uuid4().hex[:12]}@example.com",
+                        hashed_password="x")
+            db.add(user)
+            for provider in providers:
+                token = f"{user.id}-{provider}"
+                account = ConnectedAccount(
+                    id=str(uuid.uuid4()),
+                    user_id=user.id,
+                    provider=Provider[provider.upper()],
+                    provider_user_id=token,
+                    access_token=token,
+                    refresh_token=garmin_token_secret(token) if provider == 'garmin' else f"refresh-{token}",
+                    token_expires_at=int(time.time()) + 6 * 3600,
+                )
+                db.add(account)
+                account_ids.append(account.id)
+        db.commit()
+    finally:
+        db.close()
+    return account_ids
+
+
+async def sync_one(account_id: str, app, policy: RetryPolicy, semaphore: asyncio.Semaphore, fetch_streams: bool):
+    async with semaphore:
+        db = SessionLocal()
+        try:
+            account = db.get(ConnectedAccount, account_id)
+            connector = CONNECTORS[account.provider]()
+            connector.retry_policy = policy
+            attach(connector, app)
+            try:
+                started = time.perf_counter()
+                summary = await sync_service.sync_account(db, account, connector, fetch_streams=fetch_streams)
+                return account.provider.value.lower(), summary, time.perf_counter() - started, None
+            except Exception as e:
+                return account.provider.value.lower(), None, 0.0, str(e)
+            finally:
+                await connector.close()
+        finally:
+            db.close()
+
+
+async def run(args) -> None:
+    providers = [p.strip().lower() for p in args.providers.split(',') if p.strip()]
+    unknown = set(providers) - set(PROVIDERS)
+    if unknown:
+        raise SystemExit(f"Unknown providers: {', '.join(sorted(unknown))}")
+
+    config = FakeProviderConfig(
+        activities_per_athlete=args.activities,
+        samples_per_activity=args.samples,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota=args.quota,
+        quota_window_seconds=args.quota_window,
+        seed=args.seed,
+    )
+    app = create_app(config)
+    policy = RetryPolicy(max_attempts=args.max_attempts, base_delay=args.retry_base, max_delay=args.retry_max)
+    # Hide other sessions' background thumbnail rendering from the timings
+    sync_service.submit_thumbnails = lambda ids: None
+
+    if engine.dialect.name == 'sqlite' and args.concurrency > 1:
+        # Sessions hold their write transaction across awaits; SQLite would lock
+        print("SQLite allows a single writer; syncing one account at a time")
+        args.concurrency = 1
+
+    account_ids = setup_accounts(providers, args.athletes)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        sync_one(account_id, app, policy, semaphore, not args.no_streams) for account_id in account_ids
+    ])
+    elapsed = time.perf_counter() - started
+
+    per_provider = {p: {'accounts': 0, 'failed': 0, 'created': 0, 'seconds': 0.0} for p in providers}
+    for provider, summary, seconds, error in results:
+        row = per_provider[provider]
+        row['accounts'] += 1
+        if error is not None:
+            row['failed'] += 1
+            print(f"  {provider} sync failed: {error}")
+            continue
+        row['created'] += summary['created']
+        row['seconds'] += seconds
+
+    db = SessionLocal()
+    try:
+        stored = db.query(Activity).count()
+    finally:
+        db.close()
+
+    served = app.state.providers.stats()
+    breakers = resilience.metrics_snapshot()
+    total = sum(row['created'] for row in per_provider.values())
+
+    print(f"\n{len(account_ids)} accounts, {total} activities in {elapsed:.2f}s "
+          f"({total / elapsed:.1f} activities/s, concurrency {args.concurrency})")
+    print(f"{stored} activities in the database\n")
+    print(f"{'provider':<8} {'accts':>5} {'failed':>6} {'created':>7} {'act/s':>7} "
+          f"{'requests':>8} {'503s':>5} {'429s':>5} {'retries':>7} {'breaker':>9}")
+    for provider, row in per_provider.items():
+        breaker = breakers.get(provider, {})
+        rate = row['created'] / row['seconds'] if row['seconds'] else 0.0
+        print(f"{provider:<8} {row['accounts']:>5} {row['failed']:>6} {row['created']:>7} {rate:>7.1f} "
+              f"{served[provider]['requests']:>8} {served[provider]['errors']:>5} "
+              f"{served[provider]['throttled']:>5} {breaker.get('retries', 0):>7} "
+              f"{breaker.get('state', '-'):>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--providers', default=','.join(PROVIDERS), help="Comma-separated providers")
+    parser.add_argument('--athletes', type=int, default=2, help="Users, each connected to every provider")
+    parser.add_argument('--activities', type=int, default=50, help="Activities per athlete and provider")
+    parser.add_argument('--samples', type=int, default=3600, help="Stream samples per activity")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Mean added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Latency standard deviation")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--quota', type=int, default=0, help="Requests per token and window (0 = unlimited)")
+    parser.add_argument('--quota-window', type=float, default=900.0, help="Quota window in seconds")
+    parser.add_argument('--concurrency', type=int, default=8, help="Accounts synced at once")
+    parser.add_argument('--max-attempts', type=int, default=4, help="Connector attempts per request")
+    parser.add_argument('--retry-base', type=float, default=0.05, help="Retry base delay in seconds")
+    parser.add_argument('--retry-max', type=float, default=2.0, help="Retry delay cap in seconds")
+    parser.add_argument('--no-streams', action='store_true', help="Skip stream download and analytics")
+    parser.add_argument('--seed', type=int, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()